@@ -1,8 +1,37 @@
 """Build script to bundle src/ into main.py with AST-based analysis."""
+import argparse
 import ast
-from pathlib import Path
-from typing import List, Tuple
+import hashlib
+import importlib.util
+import json
+import os
+import py_compile
 import re
+import shutil
+import sys
+import tempfile
+import time
+import zipapp
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# キャッシュ形式やモジュール解析の仕様を変えたら上げる（古いキャッシュを無効化する）
+CACHE_VERSION = 1
+CACHE_FILENAME = ".build_cache.json"
+
+# 内部モジュール（src、functions、agent）からのimportはバンドル時に不要
+# "agent"モジュール（1ファイル）と"agents"パッケージ（外部ライブラリ）を区別
+INTERNAL_MODULE_PREFIXES = ("src.", "functions.", ".functions", ".agent")
+INTERNAL_MODULES = ("agent",)
+
+# zipapp の出力先とアーカイブ内のパッケージ名
+DIST_DIRNAME = "dist"
+ZIPAPP_FILENAME = "agent.pyz"
+ZIPAPP_PACKAGE = "app"
+
+PEP723_PATTERN = re.compile(r"# /// script\n.*?\n# ///", flags=re.DOTALL)
+IDENTIFIER_PATTERN = re.compile(r"[^\W\d]\w*")
 
 
 def generate_pep723_from_pyproject(pyproject_path: Path) -> str:
@@ -50,184 +79,644 @@ def generate_pep723_from_pyproject(pyproject_path: Path) -> str:
     return "\n".join(lines)
 
 
-def collect_imports(file_path: Path) -> Tuple[List[str], List[str]]:
-    """ファイルからimport文を収集（順序保持）
+@dataclass
+class ModuleInfo:
+    """1ファイル分の解析結果（キャッシュの単位）
+
+    Attributes:
+        digest: ソースの SHA-256
+        imports: `import x [as y]` の (モジュール名, 別名) リスト
+        from_imports: `from m import n [as a]` の (モジュール名, 名前, 別名) リスト
+        used_names: コード中で参照している名前（未使用importの判定に使う）
+        code: import文とPEP 723メタデータを除いたコード
+    """
+
+    digest: str
+    imports: List[Tuple[str, Optional[str]]] = field(default_factory=list)
+    from_imports: List[Tuple[str, str, Optional[str]]] = field(default_factory=list)
+    used_names: List[str] = field(default_factory=list)
+    code: str = ""
+
+    def to_json(self) -> dict:
+        return {
+            "digest": self.digest,
+            "imports": self.imports,
+            "from_imports": self.from_imports,
+            "used_names": self.used_names,
+            "code": self.code,
+        }
+
+    @classmethod
+    def from_json(cls, data: dict) -> "ModuleInfo":
+        return cls(
+            digest=data["digest"],
+            imports=[tuple(i) for i in data["imports"]],
+            from_imports=[tuple(i) for i in data["from_imports"]],
+            used_names=data["used_names"],
+            code=data["code"],
+        )
+
+
+def _is_internal(module: Optional[str]) -> bool:
+    return not module or module in INTERNAL_MODULES or module.startswith(INTERNAL_MODULE_PREFIXES)
+
+
+def analyze_source(content: str) -> ModuleInfo:
+    """ソースを1回だけ AST 解析し、import文・参照している識別子・import を除いたコードを得る
 
     Args:
-        file_path: Pythonファイルへのパス
+        content: Pythonソース
 
     Returns:
-        (standard_imports, from_imports): import文とfrom文のリスト
+        解析結果
     """
-    with open(file_path) as f:
-        content = f.read()
-        tree = ast.parse(content)
+    digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
 
-    standard_imports = []
-    from_imports = []
+    # PEP 723メタデータを削除
+    content = PEP723_PATTERN.sub("", content)
+    tree = ast.parse(content)
+    lines = content.split("\n")
 
-    for node in ast.iter_child_nodes(tree):
+    info = ModuleInfo(digest=digest)
+    import_lines = set()
+    for node in tree.body:
         if isinstance(node, ast.Import):
-            for alias in node.names:
-                import_str = f"import {alias.name}"
-                if alias.asname:
-                    import_str += f" as {alias.asname}"
-                if import_str not in standard_imports:
-                    standard_imports.append(import_str)
+            info.imports.extend((alias.name, alias.asname) for alias in node.names)
         elif isinstance(node, ast.ImportFrom):
-            # 内部モジュール（src、functions、agent）からのimportを除外
-            # "agent"モジュール（1ファイル）と"agents"パッケージ（外部ライブラリ）を区別
-            internal_modules = ("src.", "functions.", ".functions", ".agent")
-            if node.module and not any(node.module.startswith(m) or node.module in ("agent",) for m in internal_modules):
-                names = ", ".join([
-                    f"{n.name}" + (f" as {n.asname}" if n.asname else "")
-                    for n in node.names
-                ])
-                from_str = f"from {node.module} import {names}"
-                if from_str not in from_imports:
-                    from_imports.append(from_str)
+            if node.level == 0 and not _is_internal(node.module):
+                info.from_imports.extend(
+                    (node.module, alias.name, alias.asname) for alias in node.names
+                )
+        else:
+            continue
+        # 複数行にまたがるimport文も丸ごと除く
+        import_lines.update(range(node.lineno - 1, node.end_lineno))
+
+    info.code = "\n".join(
+        line for i, line in enumerate(lines) if i not in import_lines
+    ).strip()
+    # 識別子は字句で拾う。文字列やコメント中の同名語も使用扱いになるが、必要なimportを
+    # 落とすことはなく、@function_tool が実行時に評価する文字列の型注釈も拾える
+    info.used_names = sorted(set(IDENTIFIER_PATTERN.findall(info.code)))
+    return info
+
 
-    return standard_imports, from_imports
+def _bound_name(module: str, asname: Optional[str]) -> str:
+    """`import a.b` は `a` を、`import a.b as c` は `c` を束縛する"""
+    return asname or module.split(".")[0]
 
 
-def extract_code_without_imports(file_path: Path) -> str:
-    """import文とPEP 723メタデータを除いたコードを抽出
+def merge_imports(
+    modules: List[ModuleInfo], prune_unused: bool = True
+) -> Tuple[List[str], List[str]]:
+    """全ファイルのimportを重複排除・統合する（出現順を保持）
+
+    同じモジュールからの from import は1行にまとめ、バンドル内のどこからも
+    参照されない名前は prune_unused=True のとき落とす。
 
     Args:
-        file_path: Pythonファイルへのパス
+        modules: バンドル対象ファイルの解析結果
+        prune_unused: 未使用importを削除するか
 
     Returns:
-        import文とPEP 723メタデータを除いたコード
+        (standard_imports, from_imports): import文とfrom文のリスト
+    """
+    used = set()
+    for module in modules:
+        used.update(module.used_names)
+
+    def keep(name: str) -> bool:
+        return not prune_unused or name == "*" or name in used
+
+    # dict を順序付き集合として使う（重複判定は O(1)）
+    standard: Dict[Tuple[str, Optional[str]], None] = {}
+    from_groups: Dict[str, Dict[Tuple[str, Optional[str]], None]] = {}
+    for module in modules:
+        for name, asname in module.imports:
+            if keep(_bound_name(name, asname)):
+                standard.setdefault((name, asname), None)
+        for source, name, asname in module.from_imports:
+            if source == "__future__" or keep(asname or name):
+                from_groups.setdefault(source, {}).setdefault((name, asname), None)
+
+    standard_lines = [
+        f"import {name}" + (f" as {asname}" if asname else "") for name, asname in standard
+    ]
+    from_lines = [
+        f"from {source} import "
+        + ", ".join(name + (f" as {asname}" if asname else "") for name, asname in names)
+        for source, names in from_groups.items()
+        if names
+    ]
+    # from __future__ はファイル先頭に置く必要がある
+    from_lines.sort(key=lambda line: not line.startswith("from __future__ "))
+    return standard_lines, from_lines
+
+
+class Bundler:
+    """src/ を main.py に統合する（ファイル単位の解析結果をキャッシュ）
+
+    解析結果はソースの SHA-256 をキーに cache_path へ保存し、次回以降は内容が
+    変わったファイルだけを解析し直す。mtime とサイズが前回と同じファイルは
+    読み込み自体を省く。出力が既存の main.py と同一なら書き込まない。
     """
-    with open(file_path) as f:
-        content = f.read()
 
-    # PEP 723メタデータを削除
-    content = re.sub(r'# /// script\n.*?\n# ///', '', content, flags=re.DOTALL)
+    def __init__(self, src_dir: Path, output_file: Path, cache_path: Optional[Path] = None):
+        self.src_dir = src_dir
+        self.output_file = output_file
+        self.cache_path = cache_path
+        # 相対パス -> {"stat": [mtime_ns, size], "module": ModuleInfo}
+        self._entries: Dict[str, dict] = {}
+        self.analyzed: List[str] = []
+        self._dirty = False
+        self._load_cache()
+
+    def _load_cache(self) -> None:
+        if self.cache_path is None or not self.cache_path.exists():
+            return
+        try:
+            data = json.loads(self.cache_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if data.get("version") != CACHE_VERSION:
+            return
+        for key, entry in data.get("files", {}).items():
+            self._entries[key] = {
+                "stat": entry["stat"],
+                "module": ModuleInfo.from_json(entry["module"]),
+            }
+
+    def _save_cache(self) -> None:
+        if self.cache_path is None or not self._dirty:
+            return
+        data = {
+            "version": CACHE_VERSION,
+            "files": {
+                key: {"stat": entry["stat"], "module": entry["module"].to_json()}
+                for key, entry in self._entries.items()
+            },
+        }
+        tmp = self.cache_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.cache_path)
+        self._dirty = False
+
+    def source_files(self) -> Tuple[List[Path], Path, Path]:
+        """依存順のファイル一覧 (functions, agent.py, main_template.py)"""
+        function_files = sorted(
+            (f for f in (self.src_dir / "functions").glob("*.py") if f.name != "__init__.py"),
+            key=lambda p: p.name,
+        )
+        return function_files, self.src_dir / "agent.py", self.src_dir / "main_template.py"
+
+    def watched_paths(self) -> List[Path]:
+        """watch モードで変更を監視するファイル"""
+        function_files, agent_file, main_template = self.source_files()
+        return [*function_files, agent_file, main_template, self.src_dir.parent / "pyproject.toml"]
+
+    def module(self, path: Path) -> ModuleInfo:
+        """ファイルの解析結果（キャッシュが有効ならそれを返す）"""
+        key = path.relative_to(self.src_dir).as_posix()
+        st = path.stat()
+        stat = [st.st_mtime_ns, st.st_size]
+        entry = self._entries.get(key)
+        if entry is not None and entry["stat"] == stat:
+            return entry["module"]
+
+        content = path.read_text(encoding="utf-8")
+        digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+        if entry is not None and entry["module"].digest == digest:
+            # touch されただけ
+            entry["stat"] = stat
+            self._dirty = True
+            return entry["module"]
 
-    # import文を削除（AST使用）
-    try:
-        tree = ast.parse(content)
-        lines = content.split("\n")
-
-        # import文の行番号を収集
-        import_lines = set()
-        for node in ast.iter_child_nodes(tree):
-            if isinstance(node, (ast.Import, ast.ImportFrom)):
-                import_lines.add(node.lineno - 1)  # 0-indexed
-
-        # import文以外の行を抽出
-        filtered_lines = [
-            line for i, line in enumerate(lines)
-            if i not in import_lines
-        ]
+        try:
+            module = analyze_source(content)
+        except SyntaxError as e:
+            raise SyntaxError(f"{path}: {e}") from e
+        self._entries[key] = {"stat": stat, "module": module}
+        self.analyzed.append(key)
+        self._dirty = True
+        return module
+
+    def render(self) -> str:
+        """バンドル後の main.py の内容を組み立てる"""
+        function_files, agent_file, main_template = self.source_files()
+        functions = [self.module(f) for f in function_files]
+        agent = self.module(agent_file) if agent_file.exists() else None
+        main = self.module(main_template) if main_template.exists() else None
+        modules = [m for m in (*functions, agent, main) if m is not None]
+
+        # 削除されたファイルのキャッシュは捨てる
+        live = {
+            p.relative_to(self.src_dir).as_posix()
+            for p in (*function_files, agent_file, main_template)
+            if p.exists()
+        }
+        for key in set(self._entries) - live:
+            del self._entries[key]
+            self._dirty = True
+
+        output_lines = []
+
+        # PEP 723メタデータを追加（pyproject.tomlから生成）
+        pep723 = generate_pep723_from_pyproject(self.src_dir.parent / "pyproject.toml")
+        if pep723:
+            output_lines.append(pep723)
+            output_lines.append("")
 
-        return "\n".join(filtered_lines).strip()
-    except SyntaxError:
-        # Fallback: 正規表現ベース
-        lines = [
-            line for line in content.split("\n")
-            if not line.strip().startswith(("import ", "from "))
-        ]
-        return "\n".join(lines).strip()
+        # Docstring
+        output_lines.append('"""OpenAI Agents SDK-based agent (bundled)."""')
+        output_lines.append("")
+
+        # Import文を追加（重複排除・統合・未使用削除済み）
+        standard_imports, from_imports = merge_imports(modules)
+        if standard_imports:
+            output_lines.extend(standard_imports)
+            output_lines.append("")
+        if from_imports:
+            output_lines.extend(from_imports)
+            output_lines.append("")
+
+        output_lines.append("# ========== Functions ==========")
+        for module in functions:
+            if module.code:
+                output_lines.append(module.code)
+                output_lines.append("")
+
+        output_lines.append("# ========== Agent ==========")
+        if agent is not None and agent.code:
+            output_lines.append(agent.code)
+            output_lines.append("")
+
+        output_lines.append("# ========== Main ==========")
+        if main is not None and main.code:
+            output_lines.append(main.code)
+
+        return "\n".join(output_lines)
 
+    def build(self) -> bool:
+        """ビルドする
 
-def bundle_files(src_dir: Path, output_file: Path):
+        Returns:
+            main.py を書き換えた場合 True（内容が同じなら書き込まない）
+        """
+        self.analyzed = []
+        content = self.render()
+        self._save_cache()
+        if self.output_file.exists() and self.output_file.read_text(encoding="utf-8") == content:
+            return False
+        self.output_file.write_text(content, encoding="utf-8")
+        return True
+
+
+def bundle_files(src_dir: Path, output_file: Path, cache_path: Optional[Path] = None) -> bool:
     """src/を単一ファイルに統合（AST解析ベース）
 
     Args:
         src_dir: src/ディレクトリへのパス
         output_file: 出力ファイル（main.py）へのパス
+        cache_path: ファイル単位の解析結果キャッシュ（None ならキャッシュしない）
+
+    Returns:
+        main.py を書き換えた場合 True
     """
-    # 1. 依存順にファイル収集
-    function_files = sorted(
-        (src_dir / "functions").glob("*.py"),
-        key=lambda p: p.name
-    )
-    function_files = [f for f in function_files if f.name != "__init__.py"]
-    agent_file = src_dir / "agent.py"
-    main_template = src_dir / "main_template.py"
+    return Bundler(src_dir, output_file, cache_path).build()
 
-    output_lines = []
 
-    # 2. PEP 723メタデータを追加（pyproject.tomlから生成）
-    pyproject_path = src_dir.parent / "pyproject.toml"
-    pep723 = generate_pep723_from_pyproject(pyproject_path)
-    if pep723:
-        output_lines.append(pep723)
-        output_lines.append("")
+# ========== Zipapp ==========
 
-    # 3. Docstring
-    output_lines.append('"""OpenAI Agents SDK-based agent (bundled)."""')
-    output_lines.append("")
+ZIPAPP_MAIN = f"""\
+\"\"\"Zipapp entry point (generated by build.py).\"\"\"
+import os
+import runpy
+import sys
 
-    # 4. 全ファイルからimport文を収集
-    all_standard_imports = []
-    all_from_imports = []
+# アーカイブと同じディレクトリの site-packages（requirements.txt を --target で導入）を使う
+_site_packages = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "site-packages"
+)
+if os.path.isdir(_site_packages):
+    sys.path.insert(1, _site_packages)
 
-    for file in [*function_files, agent_file, main_template]:
-        if not file.exists():
-            continue
-        std_imports, from_imports = collect_imports(file)
-        all_standard_imports.extend(std_imports)
-        all_from_imports.extend(from_imports)
+runpy.run_module("{ZIPAPP_PACKAGE}.main_template", run_name="__main__", alter_sys=True)
+"""
 
-    # 5. 重複排除（順序保持）
-    unique_standard = []
-    unique_from = []
+ZIPAPP_LAZY = """\
+\"\"\"Lazy tool stubs for the zipapp (generated by build.py).\"\"\"
+import importlib
+from agents import FunctionTool
 
-    for imp in all_standard_imports:
-        if imp not in unique_standard:
-            unique_standard.append(imp)
 
-    for imp in all_from_imports:
-        if imp not in unique_from:
-            unique_from.append(imp)
+def lazy_tool(module: str, attr: str, spec: dict) -> FunctionTool:
+    \"\"\"スキーマだけ先に持ち、初回呼び出し時に実装モジュールを import するツール\"\"\"
+    async def on_invoke_tool(ctx, args):
+        tool = getattr(importlib.import_module(module), attr)
+        return await tool.on_invoke_tool(ctx, args)
 
-    # 6. Import文を追加
-    if unique_standard:
-        output_lines.extend(unique_standard)
-        output_lines.append("")
-    if unique_from:
-        output_lines.extend(unique_from)
-        output_lines.append("")
+    return FunctionTool(on_invoke_tool=on_invoke_tool, **spec)
+
+
+def forward_getattr(module: str):
+    \"\"\"ツール以外の属性は実装モジュールから取る（PEP 562）\"\"\"
+    def __getattr__(name):
+        # import 機構が調べる __path__ などで実装を読み込まない
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(importlib.import_module(module), name)
+
+    return __getattr__
+"""
+
+
+def _normalize_name(name: str) -> str:
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def _and_marker(a: str, b: str) -> str:
+    if not a or not b:
+        return a or b
+    return f"({a}) and ({b})"
+
+
+def locked_requirements(lock_path: Path, project_name: str) -> List[str]:
+    """uv.lock からプロジェクトの実行時依存（dev などの extras を除く）を固定版で列挙
+
+    依存グラフを辿り、経路上の環境マーカーは and で、複数経路は or でまとめる。
+    各行には sdist/wheel のハッシュを付ける（pip/uv pip の --require-hashes 形式）。
+
+    Args:
+        lock_path: uv.lockへのパス
+        project_name: pyproject.toml の project.name
+
+    Returns:
+        requirements.txt の行（継続行を含む）
+    """
+    import tomllib
+
+    with open(lock_path, "rb") as f:
+        lock = tomllib.load(f)
+
+    packages: Dict[Tuple[str, str], dict] = {}
+    latest: Dict[str, dict] = {}
+    for package in lock.get("package", []):
+        packages[(package["name"], package["version"])] = package
+        latest.setdefault(package["name"], package)
+
+    def resolve(edge: dict) -> dict:
+        if "version" in edge:
+            return packages[(edge["name"], edge["version"])]
+        return latest[edge["name"]]
+
+    # パッケージ -> 到達した経路のマーカー（"" は無条件）
+    markers: Dict[Tuple[str, str], set] = {}
+    seen: set = set()
+
+    def visit(package: dict, marker: str, extras: Tuple[str, ...]) -> None:
+        key = (package["name"], package["version"])
+        if (key, marker, extras) in seen or "" in markers.get(key, ()):
+            return
+        seen.add((key, marker, extras))
+        markers.setdefault(key, set()).add(marker)
+        edges = list(package.get("dependencies", []))
+        for extra in extras:
+            edges.extend(package.get("optional-dependencies", {}).get(extra, []))
+        for edge in edges:
+            visit(
+                resolve(edge),
+                _and_marker(marker, edge.get("marker", "")),
+                tuple(edge.get("extra", ())),
+            )
+
+    root = latest[_normalize_name(project_name)]
+    for edge in root.get("dependencies", []):
+        visit(resolve(edge), edge.get("marker", ""), tuple(edge.get("extra", ())))
+
+    lines = []
+    for name, version in sorted(markers):
+        package = packages[(name, version)]
+        paths = markers[(name, version)]
+        requirement = f"{name}=={version}"
+        if "" not in paths:
+            requirement += " ; " + " or ".join(f"({m})" for m in sorted(paths))
+        hashes = [
+            artifact["hash"]
+            for artifact in [package.get("sdist"), *package.get("wheels", [])]
+            if artifact and "hash" in artifact
+        ]
+        lines.append(requirement + (" \\" if hashes else ""))
+        for i, digest in enumerate(hashes):
+            lines.append(f"    --hash={digest}" + (" \\" if i < len(hashes) - 1 else ""))
+    return lines
+
+
+def _function_tools(path: Path) -> Optional[Dict[str, dict]]:
+    """ツールモジュールを読み込み、遅延化できるツールのスキーマを返す
 
-    # 7. Functions追加
-    output_lines.append("# ========== Functions ==========")
-    for file in function_files:
-        if not file.exists():
+    @function_tool の既定以外の設定（ガードレールや承認など）を持つツールがあれば、
+    スキーマだけでは再現できないため None（遅延化しない）を返す。
+    """
+    from agents import FunctionTool
+
+    spec = importlib.util.spec_from_file_location(f"_zipapp_manifest_{path.stem}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    tools = {}
+    for attr, value in vars(module).items():
+        if not isinstance(value, FunctionTool):
             continue
-        code = extract_code_without_imports(file)
-        if code:
-            output_lines.append(code)
-            output_lines.append("")
+        if (
+            getattr(value, "is_enabled", True) is not True
+            or getattr(value, "tool_input_guardrails", None)
+            or getattr(value, "tool_output_guardrails", None)
+            or getattr(value, "needs_approval", False)
+            or getattr(value, "timeout_seconds", None) is not None
+        ):
+            return None
+        tools[attr] = {
+            "name": value.name,
+            "description": value.description,
+            "params_json_schema": value.params_json_schema,
+            "strict_json_schema": value.strict_json_schema,
+        }
+    return tools or None
+
+
+def _lazy_stub(path: Path, tools: Dict[str, dict]) -> str:
+    impl = f"{ZIPAPP_PACKAGE}._tools.{path.stem}"
+    lines = [
+        f'"""Lazy stub for functions/{path.name} (generated by build.py)."""',
+        "from .._lazy import forward_getattr, lazy_tool",
+        "",
+        f'_IMPL = "{impl}"',
+        "",
+    ]
+    for attr, spec in tools.items():
+        lines.append(f"{attr} = lazy_tool(_IMPL, {attr!r}, {spec!r})")
+    lines.append("__getattr__ = forward_getattr(_IMPL)")
+    return "\n".join(lines) + "\n"
+
+
+def build_zipapp(src_dir: Path, dist_dir: Path, lazy_tools: bool = True) -> Path:
+    """src/ をプリコンパイル済みの zipapp と固定版の requirements.txt にする
+
+    アーカイブには src/ をパッケージのまま入れ、各 .py の隣に unchecked-hash 形式の
+    .pyc を置く（起動時にソースをコンパイルしない。Python のバージョンが異なる場合は
+    zipimport がソースにフォールバックする）。lazy_tools=True のとき functions/ の各
+    モジュールはスキーマだけを持つスタブに置き換え、実装はツールが初めて呼ばれた
+    ときに import する。stdin/stdout の仕様は main.py と同じ。
 
-    # 8. Agent追加
-    output_lines.append("# ========== Agent ==========")
-    if agent_file.exists():
-        code = extract_code_without_imports(agent_file)
-        if code:
-            output_lines.append(code)
-            output_lines.append("")
+    Args:
+        src_dir: src/ディレクトリへのパス
+        dist_dir: 出力ディレクトリ（agent.pyz と requirements.txt を書く）
+        lazy_tools: ツールモジュールを遅延 import にするか
+
+    Returns:
+        生成した zipapp のパス
+    """
+    import tomllib
+
+    root = src_dir.parent
+    with open(root / "pyproject.toml", "rb") as f:
+        project_name = tomllib.load(f)["project"]["name"]
+
+    dist_dir.mkdir(parents=True, exist_ok=True)
+    target = dist_dir / ZIPAPP_FILENAME
+
+    with tempfile.TemporaryDirectory() as tmp:
+        staging = Path(tmp)
+        package = staging / ZIPAPP_PACKAGE
+        (package / "functions").mkdir(parents=True)
+        (package / "__init__.py").write_text("", encoding="utf-8")
+        (package / "functions" / "__init__.py").write_text("", encoding="utf-8")
+        (staging / "__main__.py").write_text(ZIPAPP_MAIN, encoding="utf-8")
+
+        function_files = sorted(
+            f for f in (src_dir / "functions").glob("*.py") if f.name != "__init__.py"
+        )
+        stubs = 0
+        for path in function_files:
+            tools = _function_tools(path) if lazy_tools else None
+            if tools is None:
+                shutil.copy(path, package / "functions" / path.name)
+                continue
+            (package / "_tools").mkdir(exist_ok=True)
+            (package / "_tools" / "__init__.py").touch()
+            shutil.copy(path, package / "_tools" / path.name)
+            (package / "functions" / path.name).write_text(
+                _lazy_stub(path, tools), encoding="utf-8"
+            )
+            stubs += 1
+        if stubs:
+            (package / "_lazy.py").write_text(ZIPAPP_LAZY, encoding="utf-8")
+        for name in ("agent.py", "main_template.py"):
+            shutil.copy(src_dir / name, package / name)
+
+        for path in staging.rglob("*.py"):
+            relative = path.relative_to(staging).as_posix()
+            py_compile.compile(
+                str(path),
+                cfile=str(path.with_suffix(".pyc")),
+                dfile=f"{target.name}/{relative}",
+                doraise=True,
+                invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH,
+            )
+
+        # 起動時の展開コストを避けるため無圧縮で格納する
+        zipapp.create_archive(staging, target, interpreter="/usr/bin/env python3")
+
+    lock_path = root / "uv.lock"
+    if lock_path.exists():
+        header = [
+            "# uv.lock から生成（python build.py --zipapp）。手で編集しないこと",
+            f"# uv pip install --target {dist_dir.name}/site-packages "
+            f"-r {dist_dir.name}/requirements.txt",
+        ]
+        (dist_dir / "requirements.txt").write_text(
+            "\n".join(header + locked_requirements(lock_path, project_name)) + "\n",
+            encoding="utf-8",
+        )
+    else:
+        print("Warning: uv.lock not found, skipping requirements.txt")
 
-    # 9. Main追加
-    output_lines.append("# ========== Main ==========")
-    if main_template.exists():
-        code = extract_code_without_imports(main_template)
-        if code:
-            output_lines.append(code)
+    print(f"  precompiled for Python {sys.version_info.major}.{sys.version_info.minor}, "
+          f"{stubs}/{len(function_files)} tool modules lazy")
+    return target
 
-    # 10. 出力
-    output_file.write_text("\n".join(output_lines), encoding="utf-8")
+
+def _snapshot(paths: List[Path]) -> Dict[Path, Tuple[int, int]]:
+    stamps = {}
+    for path in paths:
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            continue
+        stamps[path] = (st.st_mtime_ns, st.st_size)
+    return stamps
+
+
+def watch(bundler: Bundler, interval: float = 0.5) -> None:
+    """src/ を監視し、変更があれば変わったファイルだけ解析し直して再ビルドする"""
+    print(f"Watching {bundler.src_dir} (Ctrl+C to stop)")
+    stamps: Dict[Path, Tuple[int, int]] = {}
+    while True:
+        current = _snapshot(bundler.watched_paths())
+        if current != stamps:
+            stamps = current
+            started = time.perf_counter()
+            try:
+                written = bundler.build()
+            except SyntaxError as e:
+                print(f"✗ {e}")
+            else:
+                elapsed = (time.perf_counter() - started) * 1000
+                analyzed = ", ".join(bundler.analyzed) or "none"
+                status = "Built" if written else "Up to date"
+                print(f"✓ {status}: {bundler.output_file} "
+                      f"({elapsed:.0f}ms, analyzed: {analyzed})")
+        time.sleep(interval)
 
 
 if __name__ == "__main__":
-    src_dir = Path(__file__).parent / "src"
-    output_file = Path(__file__).parent / "main.py"
+    root = Path(__file__).parent
+    parser = argparse.ArgumentParser(description="Bundle src/ into main.py")
+    parser.add_argument("--watch", action="store_true", help="src/ の変更を監視して再ビルドする")
+    parser.add_argument("--no-cache", action="store_true", help="解析キャッシュを使わない")
+    parser.add_argument("--interval", type=float, default=0.5, help="watch の監視間隔（秒）")
+    parser.add_argument(
+        "--zipapp", action="store_true",
+        help="プリコンパイル済みの dist/agent.pyz と固定版の dist/requirements.txt を生成する",
+    )
+    parser.add_argument(
+        "--eager-tools", action="store_true", help="zipapp でツールモジュールを遅延 import しない"
+    )
+    args = parser.parse_args()
+
+    src_dir = root / "src"
+    output_file = root / "main.py"
 
     if not src_dir.exists():
         print("✗ Error: src/ directory not found")
         exit(1)
 
-    bundle_files(src_dir, output_file)
-    print(f"✓ Built: {output_file}")
+    if args.zipapp:
+        target = build_zipapp(src_dir, root / DIST_DIRNAME, lazy_tools=not args.eager_tools)
+        print(f"✓ Built: {target}")
+        exit(0)
+
+    bundler = Bundler(src_dir, output_file, None if args.no_cache else root / CACHE_FILENAME)
+    if args.watch:
+        try:
+            watch(bundler, args.interval)
+        except KeyboardInterrupt:
+            pass
+        exit(0)
+
+    try:
+        written = bundler.build()
+    except SyntaxError as e:
+        print(f"✗ Error: {e}")
+        exit(1)
+    print(f"✓ Built: {output_file}" if written else f"✓ Up to date: {output_file}")
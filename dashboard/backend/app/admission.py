@@ -0,0 +1,180 @@
+import json
+import math
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from .config import get_admission_api_keys, get_admission_limits, get_trusted_proxy_hops
+
+# トークンバケットを保持するクライアント数の上限（超えたら古いものから捨てる）
+MAX_TRACKED_CLIENTS = 10_000
+
+# 流入制御の対象外（ヘルスチェックと統計）
+EXEMPT_PATHS = ("/health", "/ready", "/api/admission")
+
+
+class RouteLimit:
+    """1ルート分の同時実行数・レート制限と、その統計カウンタ。"""
+
+    def __init__(self, route: str, max_concurrency: float, rate: float, burst: float):
+        self.route = route
+        self.max_concurrency = int(max_concurrency)
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected_rate = 0
+        self.rejected_concurrency = 0
+        # client -> (tokens, ts)
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def take_token(self, client: str, now: float) -> float:
+        """トークンを1つ消費する。成功時は 0、不足時は次のトークンまでの秒数を返す。"""
+        tokens, last = self._buckets.pop(client, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - last) * self.rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / self.rate if self.rate > 0 else math.inf
+        self._buckets[client] = (tokens, now)
+        if len(self._buckets) > MAX_TRACKED_CLIENTS:
+            self._buckets.popitem(last=False)
+        return wait
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "rate": self.rate,
+            "burst": self.burst,
+            "in_flight": self.in_flight,
+            "admitted": self.admitted,
+            "rejected_rate": self.rejected_rate,
+            "rejected_concurrency": self.rejected_concurrency,
+        }
+
+
+class AdmissionController:
+    """ルート単位の同時実行数上限とクライアント単位のトークンバケットの状態。
+
+    設定は最初に使われたときに読み込む（import 時に環境変数を読まないため）。
+    """
+
+    def __init__(
+        self,
+        limits: Optional[dict[str, dict[str, float]]] = None,
+        api_keys: Optional[frozenset[str]] = None,
+        proxy_hops: Optional[int] = None,
+    ):
+        self._limits = limits
+        self._routes: Optional[list[RouteLimit]] = None
+        self._api_keys = api_keys
+        self._proxy_hops = proxy_hops
+
+    def _configure(self) -> None:
+        limits = self._limits if self._limits is not None else get_admission_limits()
+        # 最長一致を優先するため長いプレフィックスから並べる
+        self._routes = [
+            RouteLimit(route, **limit)
+            for route, limit in sorted(limits.items(), key=lambda item: -len(item[0]))
+        ]
+        if self._api_keys is None:
+            self._api_keys = get_admission_api_keys()
+        if self._proxy_hops is None:
+            self._proxy_hops = get_trusted_proxy_hops()
+
+    @property
+    def routes(self) -> list[RouteLimit]:
+        if self._routes is None:
+            self._configure()
+        return self._routes
+
+    def match(self, path: str) -> Optional[RouteLimit]:
+        for route in self.routes:
+            if path.startswith(route.route):
+                return route
+        return None
+
+    def client_key(self, scope) -> str:
+        """トークンバケットのキー。既知の API キーならキー単位、それ以外は IP 単位。"""
+        if self._routes is None:
+            self._configure()
+        api_key = ""
+        forwarded: list[str] = []
+        for name, value in scope.get("headers") or []:
+            if name == b"x-api-key":
+                api_key = value.decode("latin-1")
+            elif name == b"x-forwarded-for":
+                forwarded.extend(ip.strip() for ip in value.decode("latin-1").split(","))
+        if api_key in self._api_keys:
+            return "key:" + api_key
+        # 左側の値はクライアントが自由に書けるため、信頼済みプロキシが追記した右端から数える。
+        # 段数より短いヘッダはプロキシを経由していないので使わない
+        if self._proxy_hops and len(forwarded) >= self._proxy_hops:
+            return "ip:" + forwarded[-self._proxy_hops]
+        client = scope.get("client")
+        return "ip:" + (client[0] if client else "unknown")
+
+    def stats(self) -> dict[str, dict]:
+        return {route.route: route.stats() for route in self.routes}
+
+
+controller = AdmissionController()
+
+
+class AdmissionControlMiddleware:
+    """流入制御の ASGI ミドルウェア。
+
+    上限超過のリクエストは待たせずに即座に 503（同時実行数）/ 429（レート）で返す。
+    イベントループ上の単一スレッドで動くためロックは不要。
+    """
+
+    def __init__(self, app, controller: AdmissionController = controller):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] == "OPTIONS"
+            or scope["path"].startswith(EXEMPT_PATHS)
+        ):
+            await self.app(scope, receive, send)
+            return
+        route = self.controller.match(scope["path"])
+        if route is None:
+            await self.app(scope, receive, send)
+            return
+
+        if route.in_flight >= route.max_concurrency:
+            route.rejected_concurrency += 1
+            await _reject(
+                send, 503, "サーバーが混雑しています。しばらくしてから再試行してください。", 1
+            )
+            return
+        wait = route.take_token(self.controller.client_key(scope), time.monotonic())
+        if wait > 0:
+            route.rejected_rate += 1
+            await _reject(send, 429, "リクエストが多すぎます。", wait)
+            return
+
+        route.admitted += 1
+        route.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            route.in_flight -= 1
+
+
+async def _reject(send, status: int, detail: str, retry_after: float) -> None:
+    body = json.dumps({"detail": detail}, ensure_ascii=False).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(1, math.ceil(min(retry_after, 3600)))).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
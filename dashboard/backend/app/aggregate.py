@@ -0,0 +1,225 @@
+import re
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from itertools import accumulate
+from typing import NamedTuple, Optional
+
+from .config import get_fiscal_year_start_month
+from .models import FunnelStage, KpiCard, PeriodAggregateResponse
+from .parser import (
+    FUNNEL_DEFINITIONS,
+    JST,
+    KPI_DEFINITIONS,
+    ROW_ANKENJIKA_ACTUAL,
+    ROW_APO_ACTUAL,
+    ROW_APO_JISSHI,
+    ROW_TSUUDEN_COUNT,
+    ROW_TSUUDEN_RATE,
+    _get_cell,
+    index_sheet,
+)
+
+# 架電数はシートに行がないため、月ごとに 通電数 / 通電率 から逆算した値を使う
+ROW_IMPLIED_DIALS = "架電数（通電数 / 通電率 から推定）"
+
+# 期間集計の率定義: (funnel label, 分子の行, 分母の行)
+# 月ごとの率を平均するのではなく Σ分子 / Σ分母 で重み付けする
+RATE_DEFINITIONS = [
+    ("案件化率", ROW_ANKENJIKA_ACTUAL, ROW_APO_JISSHI),
+    ("アポ獲得率", ROW_APO_ACTUAL, ROW_TSUUDEN_COUNT),
+    ("通電率", ROW_TSUUDEN_COUNT, ROW_IMPLIED_DIALS),
+]
+
+FUNNEL_BENCHMARKS: dict[str, float] = {
+    label: fallback for label, _, _, fallback in FUNNEL_DEFINITIONS
+}
+
+_TRAILING_PERIOD = re.compile(r"t(\d{1,3})m")
+
+
+# ── 月キー ⇔ 通し月番号 ───────────────────────────────────────────────────────
+
+def _month_ordinal(month_key: str) -> int:
+    year, month = month_key.split("/")
+    return int(year) * 12 + int(month) - 1
+
+
+def _month_key(ordinal: int) -> str:
+    return f"{ordinal // 12:04d}/{ordinal % 12 + 1:02d}"
+
+
+def _validate_month_key(month_key: str) -> str:
+    if not re.fullmatch(r"\d{4}/(0[1-9]|1[0-2])", month_key):
+        raise ValueError(f"月は YYYY/MM 形式で指定してください: {month_key!r}")
+    return month_key
+
+
+# ── 累積和インデックス ─────────────────────────────────────────────────────────
+
+class _Series(NamedTuple):
+    sums: list[float]  # sums[i] = 先頭 i か月の合計（None は 0 扱い）
+    counts: list[int]  # counts[i] = 先頭 i か月のうち値が存在する月数
+
+
+def _prefix_sums(values: list[Optional[float]]) -> _Series:
+    return _Series(
+        sums=list(accumulate((v or 0.0 for v in values), initial=0.0)),
+        counts=list(accumulate((v is not None for v in values), initial=0)),
+    )
+
+
+class AggregateIndex:
+    """月列ごとの値を行単位の累積和に変換したもの。
+
+    スナップショットごとに一度だけ構築し、任意の月範囲の合計を
+    bisect 2回と引き算だけで求める（月数に依存しない）。
+
+    率（達成率・ファネルの率）は分子と分母の両方に値がある月だけで合計する。
+    片方だけの月を含めると、例えば分母が空の月の分子だけが加算されて 100% を超える。
+    そのため (分子, 分母) の組ごとに、両方そろった月以外を空とみなした累積和を別に持つ。
+    """
+
+    def __init__(self, raw: list[list[str]]):
+        month_cols, available_months, row_map = index_sheet(raw)
+        self.months = available_months
+
+        metrics = {ROW_APO_JISSHI}
+        for _, target_row, actual_row, _ in KPI_DEFINITIONS:
+            metrics.update(r for r in (target_row, actual_row) if r)
+        for _, numerator_row, denominator_row in RATE_DEFINITIONS:
+            metrics.update((numerator_row, denominator_row))
+        metrics.discard(ROW_IMPLIED_DIALS)
+
+        values: dict[str, list[Optional[float]]] = {
+            metric: [_get_cell(raw, row_map, metric, month_cols[m]) for m in self.months]
+            for metric in metrics
+        }
+        tsuuden_rates = [
+            _get_cell(raw, row_map, ROW_TSUUDEN_RATE, month_cols[m]) for m in self.months
+        ]
+        values[ROW_IMPLIED_DIALS] = [
+            (count / rate) if (count is not None and rate) else None
+            for count, rate in zip(values[ROW_TSUUDEN_COUNT], tsuuden_rates)
+        ]
+
+        self._series: dict[str, _Series] = {
+            metric: _prefix_sums(vals) for metric, vals in values.items()
+        }
+
+        pairs = {(actual_row, target_row) for _, target_row, actual_row, _ in KPI_DEFINITIONS}
+        pairs.update((numerator, denominator) for _, numerator, denominator in RATE_DEFINITIONS)
+        self._pairs: dict[tuple[str, str], tuple[_Series, _Series]] = {}
+        for numerator, denominator in pairs:
+            if not numerator or not denominator:
+                continue
+            both = [
+                n is not None and d is not None
+                for n, d in zip(values[numerator], values[denominator])
+            ]
+            self._pairs[(numerator, denominator)] = (
+                _prefix_sums([v if ok else None for v, ok in zip(values[numerator], both)]),
+                _prefix_sums([v if ok else None for v, ok in zip(values[denominator], both)]),
+            )
+
+    def _bounds(self, start_month: str, end_month: str) -> tuple[int, int]:
+        return bisect_left(self.months, start_month), bisect_right(self.months, end_month)
+
+    def total(self, metric: Optional[str], lo: int, hi: int) -> Optional[float]:
+        """[lo, hi) か月の合計。期間内に値が1つもなければ None。"""
+        series = self._series.get(metric) if metric else None
+        if series is None or series.counts[hi] - series.counts[lo] == 0:
+            return None
+        return series.sums[hi] - series.sums[lo]
+
+    def ratio(
+        self, numerator: Optional[str], denominator: Optional[str], lo: int, hi: int
+    ) -> Optional[float]:
+        """[lo, hi) か月のうち分子・分母の両方に値がある月での Σ分子 / Σ分母。"""
+        pair = self._pairs.get((numerator, denominator)) if numerator and denominator else None
+        if pair is None:
+            return None
+        numerators, denominators = pair
+        if denominators.counts[hi] - denominators.counts[lo] == 0:
+            return None
+        denominator_total = denominators.sums[hi] - denominators.sums[lo]
+        if not denominator_total:
+            return None
+        return (numerators.sums[hi] - numerators.sums[lo]) / denominator_total
+
+    def aggregate(self, period: str, start_month: str, end_month: str) -> PeriodAggregateResponse:
+        lo, hi = self._bounds(start_month, end_month)
+
+        kpi_cards: list[KpiCard] = []
+        for label, target_row, actual_row, unit in KPI_DEFINITIONS:
+            kpi_cards.append(KpiCard(
+                label=label,
+                target=self.total(target_row, lo, hi),
+                actual=self.total(actual_row, lo, hi),
+                achievement_rate=self.ratio(actual_row, target_row, lo, hi),
+                unit=unit,
+            ))
+
+        funnel_stages: list[FunnelStage] = []
+        for label, numerator_row, denominator_row in RATE_DEFINITIONS:
+            actual = self.ratio(numerator_row, denominator_row, lo, hi)
+            benchmark = FUNNEL_BENCHMARKS[label]
+            funnel_stages.append(FunnelStage(
+                label=label,
+                actual=actual,
+                benchmark=benchmark,
+                achievement_rate=(actual / benchmark) if actual is not None else None,
+            ))
+
+        return PeriodAggregateResponse(
+            period=period,
+            start_month=start_month,
+            end_month=end_month,
+            months=self.months[lo:hi],
+            kpi_cards=kpi_cards,
+            funnel_stages=funnel_stages,
+            last_updated=datetime.now(JST).isoformat(),
+        )
+
+
+# ── 期間の解決 ────────────────────────────────────────────────────────────────
+
+def resolve_period(
+    period: str,
+    available_months: list[str],
+    month: str = "",
+    start: str = "",
+    end: str = "",
+) -> tuple[str, str]:
+    """期間指定を (開始月, 終了月) の YYYY/MM に解決する（両端を含む）。
+
+    period:
+        custom  start〜end を指定
+        qtd     基準月を含む四半期の期首〜基準月
+        fytd    基準月を含む会計年度の期首〜基準月
+        fy      基準月を含む会計年度の12か月
+        tNm     基準月までの直近 N か月（例: t3m）
+    基準月は month。省略時はシート上の最新月。
+    """
+    if period == "custom":
+        if not start or not end:
+            raise ValueError("period=custom には start と end が必要です")
+        start, end = _validate_month_key(start), _validate_month_key(end)
+        if start > end:
+            raise ValueError("start は end 以前の月を指定してください")
+        return start, end
+
+    anchor = _month_ordinal(_validate_month_key(month) if month else available_months[-1])
+    fiscal_offset = get_fiscal_year_start_month() - 1
+    months_into_fy = (anchor % 12 - fiscal_offset) % 12
+
+    if period == "qtd":
+        return _month_key(anchor - months_into_fy % 3), _month_key(anchor)
+    if period == "fytd":
+        return _month_key(anchor - months_into_fy), _month_key(anchor)
+    if period == "fy":
+        fy_start = anchor - months_into_fy
+        return _month_key(fy_start), _month_key(fy_start + 11)
+    trailing = _TRAILING_PERIOD.fullmatch(period)
+    if trailing and int(trailing.group(1)) > 0:
+        return _month_key(anchor - int(trailing.group(1)) + 1), _month_key(anchor)
+    raise ValueError(f"不明な期間指定: {period!r}（custom / qtd / fytd / fy / tNm）")
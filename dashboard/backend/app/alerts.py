@@ -0,0 +1,276 @@
+import json
+import logging
+import operator
+import os
+import threading
+import urllib.request
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Optional
+
+from .models import AlertEvent, AlertRule, AlertRuleStatus, AlertsResponse
+from .parser import FUNNEL_DEFINITIONS, JST, KPI_DEFINITIONS, index_sheet, parse_dashboard
+from .snapshot import Snapshot
+
+logger = logging.getLogger(__name__)
+
+AlertSink = Callable[[list[AlertEvent]], None]
+
+_OPS: dict[str, Callable[[float, float], bool]] = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+# ルールの metric → 値の計算に使うシート行
+_INPUT_ROWS: dict[str, tuple[str, ...]] = {
+    **{
+        label: tuple(r for r in (target_row, actual_row) if r)
+        for label, target_row, actual_row, _ in KPI_DEFINITIONS
+    },
+    **{
+        label: tuple(r for r in (actual_row, benchmark_row) if r)
+        for label, actual_row, benchmark_row, _ in FUNNEL_DEFINITIONS
+    },
+}
+
+RECENT_EVENTS_SIZE = 100
+
+
+def load_rules(path: Path) -> list[AlertRule]:
+    rules = [AlertRule.model_validate(r) for r in json.loads(path.read_text(encoding="utf-8"))]
+    for rule in rules:
+        if rule.metric not in _INPUT_ROWS:
+            raise ValueError(f"アラートルール {rule.id}: 不明な指標 {rule.metric!r}")
+    ids = [rule.id for rule in rules]
+    if len(ids) != len(set(ids)):
+        raise ValueError("アラートルールの id が重複しています")
+    return rules
+
+
+class WebhookSink:
+    """発火したアラートを JSON で webhook に POST する（送信は別スレッド）。"""
+
+    def __init__(self, url: str, timeout: float = 5.0):
+        self.url = url
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="alert-webhook")
+
+    def __call__(self, events: list[AlertEvent]) -> None:
+        self._executor.submit(self._post, events)
+
+    def _post(self, events: list[AlertEvent]) -> None:
+        body = json.dumps(
+            {"events": [e.model_dump(mode="json") for e in events]}, ensure_ascii=False
+        ).encode("utf-8")
+        request = urllib.request.Request(
+            self.url, data=body, headers={"Content-Type": "application/json"}, method="POST"
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout):
+                pass
+        except Exception:
+            logger.exception("alert webhook delivery failed: %s", self.url)
+
+
+class _RuleState:
+    __slots__ = ("firing", "last_value", "last_fired_at", "last_fired_iso")
+
+    def __init__(self):
+        self.firing = False
+        self.last_value: Optional[float] = None
+        self.last_fired_at: Optional[float] = None  # UNIX 時刻（再起動をまたいで比較する）
+        self.last_fired_iso: Optional[str] = None
+
+    def to_json(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_json(cls, data: dict) -> "_RuleState":
+        state = cls()
+        for name in cls.__slots__:
+            setattr(state, name, data.get(name, getattr(state, name)))
+        return state
+
+
+class AlertEngine:
+    """スナップショット差分で入力セルが変わったルールだけを再評価するアラートエンジン。
+
+    ルールは入力行ラベルで索引しておき、差分に含まれる (行, 最新月) から
+    対象ルールを引く。after_day で保留中のルールはシートが変わらなくても
+    check_deferred()（定期実行）で日付条件を満たした時点で評価する。
+
+    発火状態（debounce の基準時刻を含む）は state_path に保存し、起動時に読み込む。
+    再起動直後の全件評価で、発火中のアラートを再通知しないため。
+
+    起動後に最初に取得したスナップショットでは差分に関係なく全ルールを評価する。
+    保存済みのスナップショットで起動し、取得した内容が同じだった場合は on_snapshot() が
+    呼ばれないため、check_deferred() が取得済み（live）のスナップショットで評価する。
+    """
+
+    def __init__(
+        self,
+        rules: list[AlertRule],
+        sink: Optional[AlertSink] = None,
+        clock: Callable[[], datetime] = lambda: datetime.now(JST),
+        state_path: Optional[Path] = None,
+    ):
+        self.rules = {rule.id: rule for rule in rules}
+        self.sink = sink
+        self._clock = clock
+        self._state_path = state_path
+        self._state = {rule.id: _RuleState() for rule in rules}
+        self._load_state()
+        self._by_row: dict[str, list[str]] = defaultdict(list)
+        for rule in rules:
+            for row in _INPUT_ROWS[rule.metric]:
+                self._by_row[row].append(rule.id)
+        self._deferred: set[str] = set()  # after_day 前で評価を見送ったルール
+        self._primed = False  # 全ルールを一度評価したか
+        self._recent: deque[AlertEvent] = deque(maxlen=RECENT_EVENTS_SIZE)
+        self._lock = threading.Lock()
+
+    def _load_state(self) -> None:
+        if self._state_path is None:
+            return
+        try:
+            saved = json.loads(self._state_path.read_text(encoding="utf-8"))
+            for rule_id, data in saved.items():
+                if rule_id in self._state:
+                    self._state[rule_id] = _RuleState.from_json(data)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, AttributeError, TypeError):
+            logger.exception("failed to load alert state: %s", self._state_path)
+
+    def _save_state(self) -> None:
+        if self._state_path is None:
+            return
+        tmp = self._state_path.with_name(self._state_path.name + ".tmp")
+        try:
+            tmp.write_text(
+                json.dumps({rule_id: s.to_json() for rule_id, s in self._state.items()}),
+                encoding="utf-8",
+            )
+            os.replace(tmp, self._state_path)
+        except OSError:
+            logger.exception("failed to save alert state: %s", self._state_path)
+
+    def _notify(self, events: list[AlertEvent]) -> None:
+        if events and self.sink is not None:
+            self.sink(events)
+
+    def on_snapshot(self, prev: Optional[Snapshot], snapshot: Snapshot) -> list[AlertEvent]:
+        """SnapshotStore.subscribe 用。発火したイベントを返す（sink にも送る）。"""
+        changed = snapshot.changed_cells(prev)
+        latest_month = index_sheet(snapshot.raw).available_months[-1]
+        with self._lock:
+            if changed is None or not self._primed:
+                candidates = set(self.rules)
+            else:
+                candidates = {
+                    rule_id
+                    for row, month in changed
+                    if month == latest_month
+                    for rule_id in self._by_row.get(row, ())
+                }
+            candidates |= self._deferred
+            self._primed = True
+            events = self._evaluate(candidates, snapshot)
+        self._notify(events)
+        return events
+
+    def check_deferred(self, snapshot: Snapshot) -> list[AlertEvent]:
+        """after_day で保留中のルールのうち、日付条件を満たしたものを評価する。
+
+        シートが変わらない間は on_snapshot() が呼ばれないため、定期的に呼び出す。
+        まだ全ルールを評価していなければ、取得済みのスナップショットで全ルールを評価する。
+        """
+        with self._lock:
+            if not self._primed:
+                if not snapshot.live:
+                    return []
+                self._primed = True
+                due = set(self.rules)
+            elif not self._deferred:
+                return []
+            else:
+                day = self._clock().day
+                due = {
+                    rule_id for rule_id in self._deferred if day >= self.rules[rule_id].after_day
+                }
+            events = self._evaluate(due, snapshot)
+        self._notify(events)
+        return events
+
+    def _evaluate(self, rule_ids: set[str], snapshot: Snapshot) -> list[AlertEvent]:
+        if not rule_ids:
+            return []
+        # KPI / ファネルはスナップショットごとに1回だけ計算する
+        response = snapshot.memo(
+            ("alerts_values",),
+            lambda: parse_dashboard(snapshot.raw, fields=("kpi_cards", "funnel_stages")),
+        )
+        values = {card.label: card for card in response.kpi_cards}
+        values.update({stage.label: stage for stage in response.funnel_stages})
+
+        now = self._clock()
+        timestamp = now.timestamp()
+        events: list[AlertEvent] = []
+        for rule_id in sorted(rule_ids):
+            rule = self.rules[rule_id]
+            if rule.after_day is not None and now.day < rule.after_day:
+                self._deferred.add(rule_id)
+                continue
+            self._deferred.discard(rule_id)
+
+            state = self._state[rule_id]
+            value = getattr(values[rule.metric], rule.field, None)
+            state.last_value = value
+            if value is None or not _OPS[rule.op](value, rule.threshold):
+                state.firing = False
+                continue
+
+            debounced = (
+                state.firing
+                and state.last_fired_at is not None
+                and timestamp - state.last_fired_at < rule.debounce_seconds
+            )
+            state.firing = True
+            if debounced:
+                continue
+            state.last_fired_at = timestamp
+            state.last_fired_iso = now.isoformat()
+            event = AlertEvent(
+                rule_id=rule.id,
+                metric=rule.metric,
+                field=rule.field,
+                op=rule.op,
+                threshold=rule.threshold,
+                value=value,
+                month=response.selected_month,
+                snapshot_version=snapshot.version,
+                fired_at=state.last_fired_iso,
+            )
+            events.append(event)
+            self._recent.append(event)
+        self._save_state()
+        return events
+
+    def status(self) -> AlertsResponse:
+        with self._lock:
+            return AlertsResponse(
+                rules=[
+                    AlertRuleStatus(
+                        rule=rule,
+                        firing=self._state[rule_id].firing,
+                        last_value=self._state[rule_id].last_value,
+                        last_fired_at=self._state[rule_id].last_fired_iso,
+                    )
+                    for rule_id, rule in self.rules.items()
+                ],
+                recent_events=list(self._recent),
+            )
@@ -1,18 +1,149 @@
 import json
 import os
 from pathlib import Path
+from typing import Optional
 
 from dotenv import load_dotenv
 
 # Load .env from project root (3 levels up: app/ -> backend/ -> dashboard/ -> my-agent-05/)
 load_dotenv(Path(__file__).parent.parent.parent.parent / ".env")
 
-SPREADSHEET_ID_2: str = os.environ["SPREADSHEET_ID_2"]
 DASHBOARD_SHEET_NAME: str = "全体ダッシュボード"
 
 
+def get_spreadsheet_id() -> str:
+    value = os.environ.get("SPREADSHEET_ID_2")
+    if not value:
+        raise ValueError("SPREADSHEET_ID_2 is not set")
+    return value
+
+
 def get_service_account_info() -> dict:
     raw = os.environ.get("GOOGLE_SERVICE_ACCOUNT_JSON")
     if not raw:
         raise ValueError("GOOGLE_SERVICE_ACCOUNT_JSON is not set")
     return json.loads(raw)
+
+
+def get_dashboard_source() -> str:
+    """ダッシュボードのデータソース。"sheets"（既定）または "activity_logs"。"""
+    source = os.environ.get("DASHBOARD_SOURCE", "sheets")
+    if source not in ("sheets", "activity_logs"):
+        raise ValueError("DASHBOARD_SOURCE must be 'sheets' or 'activity_logs'")
+    return source
+
+
+def get_activity_state_path() -> Path:
+    """架電ログ取り込み（app.ingest）の集計状態ファイル。"""
+    return Path(os.environ.get("ACTIVITY_STATE_PATH", "activity_state.json"))
+
+
+def validate_config() -> None:
+    """必須の環境変数を検証する。import 時ではなく起動時（lifespan）に呼ぶ。"""
+    if get_dashboard_source() == "sheets":
+        get_spreadsheet_id()
+        get_service_account_info()
+    elif not get_activity_state_path().exists():
+        raise ValueError(f"ACTIVITY_STATE_PATH not found: {get_activity_state_path()}")
+    get_fiscal_year_start_month()
+    get_admission_limits()
+
+
+def get_snapshot_ttl_seconds() -> float:
+    """シートの再取得間隔（秒）。この間は取得済みスナップショットを使い回す。"""
+    return float(os.environ.get("SNAPSHOT_TTL_SECONDS", "30"))
+
+
+def get_fiscal_year_start_month() -> int:
+    """会計年度の開始月（1-12）。期間集計の四半期・年度の区切りに使う。"""
+    month = int(os.environ.get("FISCAL_YEAR_START_MONTH", "4"))
+    if not 1 <= month <= 12:
+        raise ValueError("FISCAL_YEAR_START_MONTH must be between 1 and 12")
+    return month
+
+
+def get_snapshot_history_size() -> int:
+    """差分配信（?since=）のために保持する過去スナップショット数。"""
+    return max(1, int(os.environ.get("SNAPSHOT_HISTORY_SIZE", "16")))
+
+
+def get_snapshot_cache_path() -> Optional[Path]:
+    """取得に成功したスナップショットの保存先。起動時に取得できない場合のフォールバックに使う。
+
+    空文字を指定すると保存しない。
+    """
+    value = os.environ.get("SNAPSHOT_CACHE_PATH", "snapshot_cache.json")
+    return Path(value) if value else None
+
+
+def get_warmup_timeout_seconds() -> float:
+    """起動時ウォームアップを待つ上限（秒）。超えたら保存済みスナップショットで /ready にする。"""
+    return float(os.environ.get("WARMUP_TIMEOUT_SECONDS", "20"))
+
+
+def get_alert_rules_path() -> Optional[Path]:
+    """アラートルール定義（AlertRule の JSON 配列）のパス。未設定ならアラートは無効。"""
+    value = os.environ.get("ALERT_RULES_PATH")
+    return Path(value) if value else None
+
+
+def get_alert_webhook_url() -> Optional[str]:
+    return os.environ.get("ALERT_WEBHOOK_URL") or None
+
+
+def get_alert_state_path() -> Optional[Path]:
+    """アラートの発火状態の保存先。再起動後に発火中のアラートを再通知しないために使う。
+
+    空文字を指定すると保存しない。
+    """
+    value = os.environ.get("ALERT_STATE_PATH", "alert_state.json")
+    return Path(value) if value else None
+
+
+# ルートごとの流入制御の既定値（パスの前方一致、最長一致を優先）
+#   max_concurrency: 同時処理数の上限（超過分は即座に 503）
+#   rate / burst:    クライアント（既知の API キーまたは IP）ごとのトークンバケット（超過分は 429）
+DEFAULT_ADMISSION_LIMITS: dict[str, dict[str, float]] = {
+    "/api/dashboard": {"max_concurrency": 16, "rate": 1.0, "burst": 10},
+    "/api/export": {"max_concurrency": 2, "rate": 0.1, "burst": 2},
+    "/api/": {"max_concurrency": 32, "rate": 2.0, "burst": 20},
+}
+
+
+def get_admission_limits() -> dict[str, dict[str, float]]:
+    """ADMISSION_LIMITS（JSON）で既定値をルート単位に上書きする。
+
+    既定に無いルートで省略した項目は "/api/" の既定値を使う。
+    """
+    limits = {route: dict(limit) for route, limit in DEFAULT_ADMISSION_LIMITS.items()}
+    raw = os.environ.get("ADMISSION_LIMITS")
+    if raw:
+        for route, limit in json.loads(raw).items():
+            limits.setdefault(route, dict(DEFAULT_ADMISSION_LIMITS["/api/"])).update(limit)
+    return limits
+
+
+def get_admission_api_keys() -> frozenset[str]:
+    """API キー単位でトークンバケットを分ける既知のキー（ADMISSION_API_KEYS、カンマ区切り）。
+
+    ここに無いキーはクライアントが自由に作れるため、IP 単位で数える。
+    """
+    raw = os.environ.get("ADMISSION_API_KEYS", "")
+    return frozenset(key.strip() for key in raw.split(",") if key.strip())
+
+
+def get_trusted_proxy_hops() -> int:
+    """X-Forwarded-For を追記する信頼済みリバースプロキシの段数（TRUSTED_PROXY_HOPS）。
+
+    0 なら X-Forwarded-For を無視して接続元 IP を使う。未指定時は TRUST_FORWARDED_FOR が
+    真なら 1（Render のロードバランサ1段）とする。
+    """
+    raw = os.environ.get("TRUSTED_PROXY_HOPS")
+    if raw:
+        return max(0, int(raw))
+    return int(os.environ.get("TRUST_FORWARDED_FOR", "").lower() in ("1", "true", "yes"))
+
+
+def get_allowed_origins() -> list[str]:
+    raw = os.environ.get("ALLOWED_ORIGINS", "*")
+    return [origin.strip() for origin in raw.split(",") if origin.strip()]
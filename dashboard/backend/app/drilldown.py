@@ -0,0 +1,184 @@
+import threading
+from bisect import bisect_left, insort
+from collections import defaultdict
+from typing import Optional
+
+from .ingest import COUNTER_ROWS, N_COUNTERS, RATE_ROWS, ActivityAggregate
+from .models import DrilldownEntry, DrilldownResponse, FunnelStage, KpiCard, LeaderboardEntry
+from .parser import FUNNEL_DEFINITIONS, KPI_DEFINITIONS
+
+_COUNTER_POS = {label: pos for pos, label in enumerate(COUNTER_ROWS)}
+_RATE_POS = {label: (numerator, denominator) for label, numerator, denominator in RATE_ROWS}
+
+# 架電ログから計算できる KPI / ファネルだけを対象にする
+DRILLDOWN_KPIS = [
+    (label, _COUNTER_POS[actual_row], unit)
+    for label, _, actual_row, unit in KPI_DEFINITIONS
+    if actual_row in _COUNTER_POS
+]
+DRILLDOWN_FUNNEL = [
+    (label, *_RATE_POS[actual_row], fallback)
+    for label, actual_row, _, fallback in FUNNEL_DEFINITIONS
+    if actual_row in _RATE_POS
+]
+LEADERBOARD_METRICS = [label for label, _, _ in DRILLDOWN_KPIS] + [
+    label for label, *_ in DRILLDOWN_FUNNEL
+]
+
+RepKey = tuple[str, str]  # (team, rep)
+
+
+def _metric_values(counters: tuple[int, ...]) -> dict[str, Optional[float]]:
+    values: dict[str, Optional[float]] = {
+        label: float(counters[pos]) for label, pos, _ in DRILLDOWN_KPIS
+    }
+    for label, numerator, denominator, _ in DRILLDOWN_FUNNEL:
+        denominator_value = counters[denominator]
+        values[label] = (counters[numerator] / denominator_value) if denominator_value else None
+    return values
+
+
+class Leaderboard:
+    """(値, キー) の昇順リスト。1件の更新は bisect による削除・挿入で済ませる。"""
+
+    def __init__(self):
+        self._sorted: list[tuple[float, RepKey]] = []
+        self._values: dict[RepKey, float] = {}
+
+    def copy(self) -> "Leaderboard":
+        board = Leaderboard()
+        board._sorted = list(self._sorted)
+        board._values = dict(self._values)
+        return board
+
+    def update(self, key: RepKey, value: Optional[float]) -> None:
+        old = self._values.pop(key, None)
+        if old is not None:
+            del self._sorted[bisect_left(self._sorted, (old, key))]
+        if value is not None:
+            self._values[key] = value
+            insort(self._sorted, (value, key))
+
+    def top(self, n: int) -> list[tuple[float, RepKey]]:
+        return self._sorted[::-1][:n]
+
+    def bottom(self, n: int) -> list[tuple[float, RepKey]]:
+        return self._sorted[:n]
+
+
+class DrilldownIndex:
+    """(チーム, 担当者, 月) 単位の事前計算インデックス。スナップショットごとに1回構築する。
+
+    prev を渡した場合、カウンタが変わったキーだけをリーダーボードに反映し、
+    変化のない月のリーダーボードは prev のものをそのまま共有する。
+    """
+
+    def __init__(self, aggregate: ActivityAggregate, prev: Optional["DrilldownIndex"] = None):
+        self.counts: dict[tuple[str, str, str], tuple[int, ...]] = {
+            key: tuple(counters) for key, counters in aggregate.counts.items()
+        }
+        self.months = sorted({month for month, _, _ in self.counts})
+
+        self.reps: dict[tuple[str, str], list[str]] = defaultdict(list)  # (month, team) -> reps
+        team_totals: dict[tuple[str, str], list[int]] = {}
+        for (month, team, rep), counters in sorted(self.counts.items()):
+            self.reps[(month, team)].append(rep)
+            total = team_totals.setdefault((month, team), [0] * N_COUNTERS)
+            for pos in range(N_COUNTERS):
+                total[pos] += counters[pos]
+        self.team_totals = {key: tuple(total) for key, total in team_totals.items()}
+
+        # ── リーダーボード（差分更新）──────────────────────────────────────────
+        prev_counts = prev.counts if prev is not None else {}
+        self.leaderboards: dict[tuple[str, str], Leaderboard] = (
+            dict(prev.leaderboards) if prev is not None else {}
+        )
+        changed = {k for k, v in self.counts.items() if prev_counts.get(k) != v}
+        changed |= prev_counts.keys() - self.counts.keys()
+        copied: set[tuple[str, str]] = set()
+        for key in changed:
+            month, team, rep = key
+            counters = self.counts.get(key)
+            values = _metric_values(counters) if counters is not None else {}
+            for metric in LEADERBOARD_METRICS:
+                board_key = (month, metric)
+                if board_key not in copied:
+                    old = self.leaderboards.get(board_key)
+                    self.leaderboards[board_key] = old.copy() if old is not None else Leaderboard()
+                    copied.add(board_key)
+                self.leaderboards[board_key].update((team, rep), values.get(metric))
+
+    def resolve_month(self, month: str) -> str:
+        if not self.months:
+            raise ValueError("架電ログが取り込まれていません")
+        return month if month in self.months else self.months[-1]
+
+    def _entry(self, team: str, rep: Optional[str], counters: tuple[int, ...]) -> DrilldownEntry:
+        values = _metric_values(counters)
+        return DrilldownEntry(
+            team=team,
+            rep=rep,
+            kpi_cards=[
+                KpiCard(label=label, actual=values[label], unit=unit)
+                for label, _, unit in DRILLDOWN_KPIS
+            ],
+            funnel_stages=[
+                FunnelStage(
+                    label=label,
+                    actual=values[label],
+                    benchmark=benchmark,
+                    achievement_rate=(
+                        (values[label] / benchmark) if values[label] is not None else None
+                    ),
+                )
+                for label, _, _, benchmark in DRILLDOWN_FUNNEL
+            ],
+        )
+
+    def drilldown(self, month: str, team: Optional[str] = None) -> DrilldownResponse:
+        month = self.resolve_month(month)
+        if team is None:
+            entries = [
+                self._entry(t, None, counters)
+                for (m, t), counters in sorted(self.team_totals.items())
+                if m == month
+            ]
+        else:
+            entries = [
+                self._entry(team, rep, self.counts[(month, team, rep)])
+                for rep in self.reps.get((month, team), [])
+            ]
+            if entries:
+                entries.insert(0, self._entry(team, None, self.team_totals[(month, team)]))
+        return DrilldownResponse(
+            available_months=self.months,
+            selected_month=month,
+            team=team,
+            entries=entries,
+        )
+
+    def leaderboard(self, month: str, metric: str, order: str, n: int) -> list[LeaderboardEntry]:
+        board = self.leaderboards.get((month, metric))
+        if board is None:
+            return []
+        ranked = board.top(n) if order == "top" else board.bottom(n)
+        return [
+            LeaderboardEntry(rank=i, team=team, rep=rep, value=value)
+            for i, (value, (team, rep)) in enumerate(ranked, start=1)
+        ]
+
+
+class DrilldownIndexer:
+    """直前に構築したインデックスを保持し、次の構築を差分更新にする。"""
+
+    def __init__(self):
+        self._last: Optional[DrilldownIndex] = None
+        self._lock = threading.Lock()
+
+    def build(self, aggregate: ActivityAggregate) -> DrilldownIndex:
+        with self._lock:
+            self._last = DrilldownIndex(aggregate, prev=self._last)
+            return self._last
+
+
+indexer = DrilldownIndexer()
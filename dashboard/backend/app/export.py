@@ -0,0 +1,177 @@
+import csv
+import io
+from typing import Iterator, Optional
+
+from .aggregate import _validate_month_key
+from .parser import _clean, _to_float, index_sheet
+from .snapshot import Snapshot
+
+# 1 チャンク（CSV の書き出し単位 / Arrow のレコードバッチ）あたりの行数
+EXPORT_CHUNK_ROWS = 2000
+
+EXPORT_COLUMNS = ("snapshot_version", "metric", "month", "value")
+
+# format= の値 → Content-Type
+EXPORT_MEDIA_TYPES: dict[str, str] = {
+    "csv": "text/csv; charset=utf-8",
+    "arrow": "application/vnd.apache.arrow.stream",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# Accept ヘッダーで受け付ける MIME → format
+_ACCEPT_FORMATS: dict[str, str] = {
+    "text/csv": "csv",
+    "application/vnd.apache.arrow.stream": "arrow",
+    "application/vnd.apache.parquet": "parquet",
+    "application/x-parquet": "parquet",
+}
+
+
+class ExportUnavailableError(RuntimeError):
+    """要求された形式の書き出しに必要な依存（pyarrow）が無い。"""
+
+
+def negotiate_format(format: str, accept: str) -> str:
+    """format= を優先し、無ければ Accept ヘッダーから形式を決める（既定は CSV）。"""
+    if format:
+        if format not in EXPORT_MEDIA_TYPES:
+            raise ValueError(f"不明な形式: {format!r}（{' / '.join(EXPORT_MEDIA_TYPES)}）")
+        return format
+    for part in accept.split(","):
+        media_type = part.split(";")[0].strip().lower()
+        if media_type in _ACCEPT_FORMATS:
+            return _ACCEPT_FORMATS[media_type]
+    return "csv"
+
+
+def validate_month_range(start: str, end: str) -> None:
+    """start / end（省略可）が YYYY/MM 形式で start <= end であることを確かめる。"""
+    for month in (start, end):
+        if month:
+            _validate_month_key(month)
+    if start and end and start > end:
+        raise ValueError("start は end 以前の月を指定してください")
+
+
+def iter_metric_cells(
+    snapshot: Snapshot, start: str = "", end: str = ""
+) -> Iterator[tuple[str, str, Optional[float]]]:
+    """ラベル付きの全行 × 月列を (metric, month, value) の縦持ちで順に返す。
+
+    start / end（YYYY/MM, 両端を含む）で月を絞り込める。全月が空の行は出力しない。
+    """
+    month_cols, available_months, row_map = index_sheet(snapshot.raw)
+    months = [m for m in available_months if (not start or m >= start) and (not end or m <= end)]
+    for metric, row_idx in row_map.items():
+        if metric == "指標":
+            continue
+        row = snapshot.raw[row_idx]
+        values = [
+            _to_float(row[month_cols[m]]) if month_cols[m] < len(row) else None
+            for m in months
+        ]
+        if all(v is None for v in values):
+            continue
+        label = _clean(metric)
+        for month, value in zip(months, values):
+            yield label, month, value
+
+
+def _chunks(
+    cells: Iterator[tuple[str, str, Optional[float]]]
+) -> Iterator[list[tuple[str, str, Optional[float]]]]:
+    chunk: list[tuple[str, str, Optional[float]]] = []
+    for cell in cells:
+        chunk.append(cell)
+        if len(chunk) >= EXPORT_CHUNK_ROWS:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def stream_csv(snapshot: Snapshot, start: str = "", end: str = "") -> Iterator[bytes]:
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    writer.writerow(EXPORT_COLUMNS)
+    for chunk in _chunks(iter_metric_cells(snapshot, start, end)):
+        writer.writerows(
+            (snapshot.version, metric, month, "" if value is None else value)
+            for metric, month, value in chunk
+        )
+        yield buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """pyarrow の書き込み先。書かれたバイト列を溜め、drain() で取り出す。"""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ExportUnavailableError(
+            "Arrow / Parquet 出力には pyarrow が必要です（pip install '.[export]'）"
+        ) from e
+    return pyarrow
+
+
+def stream_arrow(
+    snapshot: Snapshot, start: str = "", end: str = "", parquet: bool = False
+) -> Iterator[bytes]:
+    """Arrow IPC ストリーム（parquet=True なら Parquet）をチャンクごとに返す。
+
+    pyarrow が無い場合は最初のチャンクを返す前に ExportUnavailableError を送出する。
+    """
+    pa = _import_pyarrow()
+    schema = pa.schema([
+        ("snapshot_version", pa.string()),
+        ("metric", pa.string()),
+        ("month", pa.string()),
+        ("value", pa.float64()),
+    ])
+
+    def generate() -> Iterator[bytes]:
+        sink = _ChunkSink()
+        if parquet:
+            import pyarrow.parquet as pq
+            writer = pq.ParquetWriter(sink, schema)
+        else:
+            writer = pa.ipc.new_stream(sink, schema)
+        with writer:
+            for chunk in _chunks(iter_metric_cells(snapshot, start, end)):
+                metrics, months, values = zip(*chunk)
+                writer.write_batch(pa.record_batch(
+                    [[snapshot.version] * len(chunk), list(metrics), list(months), list(values)],
+                    schema=schema,
+                ))
+                data = sink.drain()
+                if data:
+                    yield data
+        yield sink.drain()
+
+    return generate()
@@ -0,0 +1,301 @@
+"""架電ログ CSV の取り込み。
+
+大量の架電・活動ログ（1行 = 1架電）を逐次読み込みで集計し、
+(月, チーム, 担当者) 単位のカウンタとして状態ファイルに保存する。
+集計結果は parse_dashboard がそのまま読める「全体ダッシュボード」形式の
+2次元リストに変換できる。
+
+使い方（dashboard/backend で実行）:
+    uv run python -m app.ingest logs/2025-*.csv
+同じファイルを再度渡した場合は前回読んだ位置から追記分だけを取り込む。
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import re
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Iterable, Iterator, Optional
+
+from .config import get_activity_state_path
+from .parser import (
+    JST,
+    ROW_ANKENJIKA_ACTUAL,
+    ROW_ANKENJIKA_RATE_ACTUAL,
+    ROW_APO_ACTUAL,
+    ROW_APO_JISSHI,
+    ROW_APO_RATE_TSUUDEN,
+    ROW_TSUUDEN_COUNT,
+    ROW_TSUUDEN_RATE,
+)
+
+logger = logging.getLogger(__name__)
+
+# ── ログ CSV の列 ────────────────────────────────────────────────────────────
+# ISO 8601 の日付または日時。月は JST で決める（タイムゾーン付きは JST に変換し、
+# タイムゾーンなしは JST とみなす）。解析できない行は取り込まずに数だけ記録する
+COL_CALLED_AT = "called_at"
+COL_TEAM = "team"
+COL_REP = "rep"
+# 架電の結果フラグ（1 / true / yes を真とみなす）
+FLAG_COLUMNS = ("connected", "appointment", "appointment_held", "deal")
+
+_TRUTHY = frozenset(("1", "true", "yes", "y", "t"))
+
+ROW_DIALS = "実績：架電数"
+
+# カウンタの並び: 架電, 通電, アポ獲得, アポ実施, 案件化
+COUNTER_ROWS = (
+    ROW_DIALS, ROW_TSUUDEN_COUNT, ROW_APO_ACTUAL, ROW_APO_JISSHI, ROW_ANKENJIKA_ACTUAL
+)
+N_COUNTERS = len(COUNTER_ROWS)
+
+# 率の行: (行ラベル, 分子のカウンタ位置, 分母のカウンタ位置)
+RATE_ROWS = (
+    (ROW_TSUUDEN_RATE, 1, 0),
+    (ROW_APO_RATE_TSUUDEN, 2, 1),
+    (ROW_ANKENJIKA_RATE_ACTUAL, 4, 3),
+)
+
+# 1回の集計で読み込む行数（メモリ使用量はこの行数 + 集計キー数で頭打ち）
+INGEST_CHUNK_ROWS = 50_000
+
+Key = tuple[str, str, str]  # (YYYY/MM, team, rep)
+
+_MONTH_KEY = re.compile(r"\d{4}/(0[1-9]|1[0-2])")
+
+
+def month_of(called_at: str) -> Optional[str]:
+    """called_at を JST の月 YYYY/MM にする。解析できなければ None。"""
+    try:
+        dt = datetime.fromisoformat(called_at.strip())
+    except ValueError:
+        return None
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(JST)
+    return f"{dt.year:04d}/{dt.month:02d}"
+
+
+class ActivityAggregate:
+    """(月, チーム, 担当者) ごとの架電カウンタと、取り込み済みファイルの読み込み位置。"""
+
+    def __init__(self):
+        self.counts: dict[Key, list[int]] = {}
+        # path -> {"offset": int, "header": list[str], "rows": int, "skipped": int}
+        self.files: dict[str, dict] = {}
+
+    # ── 永続化 ──────────────────────────────────────────────────────────────
+
+    @classmethod
+    def load(cls, path: Path) -> "ActivityAggregate":
+        agg = cls()
+        if not path.exists():
+            return agg
+        data = json.loads(path.read_text(encoding="utf-8"))
+        agg.files = data.get("files", {})
+        dropped = 0
+        for month, team, rep, *counters in data.get("counts", []):
+            # 日時を検証していなかった頃の状態ファイルに残る不正な月は捨てる
+            if not _MONTH_KEY.fullmatch(month):
+                dropped += 1
+                continue
+            agg.counts[(month, team, rep)] = counters
+        if dropped:
+            logger.warning("%s: dropped %d keys with an invalid month", path, dropped)
+        return agg
+
+    def save(self, path: Path) -> None:
+        data = {
+            "files": self.files,
+            "counts": [[*key, *counters] for key, counters in sorted(self.counts.items())],
+        }
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+
+    # ── 取り込み ────────────────────────────────────────────────────────────
+
+    def ingest_file(self, path: Path) -> tuple[int, int]:
+        """ログファイルを前回の続きから取り込み、(取り込んだ行数, 読み飛ばした行数) を返す。
+
+        called_at が解析できない行と列が足りない行は読み飛ばす。
+        """
+        key = str(path.resolve())
+        state = self.files.get(key)
+        size = path.stat().st_size
+        if state is not None and size < state["offset"]:
+            raise ValueError(
+                f"{path}: 前回取り込み時より小さくなっています（ログのローテーション？）"
+            )
+
+        with path.open("rb") as f:
+            if state is None:
+                header_line = f.readline()
+                header = next(csv.reader([header_line.decode("utf-8-sig")]))
+                state = {"offset": f.tell(), "header": header, "rows": 0}
+            else:
+                f.seek(state["offset"])
+            header = state["header"]
+            missing = {COL_CALLED_AT, COL_TEAM, COL_REP} - set(header)
+            if missing:
+                raise ValueError(f"{path}: 必須列がありません: {', '.join(sorted(missing))}")
+
+            ingested = skipped = 0
+            lines = _LineReader(f, state["offset"])
+            for chunk in _chunked(csv.reader(lines), INGEST_CHUNK_ROWS):
+                chunk_skipped = self._aggregate(header, chunk)
+                ingested += len(chunk) - chunk_skipped
+                skipped += chunk_skipped
+            state["offset"] = lines.offset
+
+        state["rows"] += ingested
+        state["skipped"] = state.get("skipped", 0) + skipped
+        self.files[key] = state
+        return ingested, skipped
+
+    def _aggregate(self, header: list[str], rows: list[list[str]]) -> int:
+        """rows を集計に加え、読み飛ばした行数を返す。"""
+        i_called_at = header.index(COL_CALLED_AT)
+        i_team = header.index(COL_TEAM)
+        i_rep = header.index(COL_REP)
+        flag_idx = [header.index(c) if c in header else None for c in FLAG_COLUMNS]
+
+        # チャンク内でまずキーごとに集計してから状態にまとめて加算する
+        local: dict[Key, list[int]] = {}
+        skipped = 0
+        width = max(i_called_at, i_team, i_rep) + 1
+        for row in rows:
+            month = month_of(row[i_called_at]) if len(row) >= width else None
+            if month is None:
+                skipped += 1
+                continue
+            key = (month, row[i_team], row[i_rep])
+            counters = local.get(key)
+            if counters is None:
+                counters = local[key] = [0] * N_COUNTERS
+            counters[0] += 1
+            for pos, idx in enumerate(flag_idx, start=1):
+                if idx is not None and idx < len(row) and row[idx].strip().lower() in _TRUTHY:
+                    counters[pos] += 1
+
+        for key, counters in local.items():
+            total = self.counts.get(key)
+            if total is None:
+                self.counts[key] = counters
+            else:
+                for pos in range(N_COUNTERS):
+                    total[pos] += counters[pos]
+        return skipped
+
+    # ── 出力 ────────────────────────────────────────────────────────────────
+
+    def months(self) -> list[str]:
+        return sorted({month for month, _, _ in self.counts})
+
+    def totals_by_month(self) -> dict[str, list[int]]:
+        totals: dict[str, list[int]] = {}
+        for (month, _, _), counters in self.counts.items():
+            total = totals.setdefault(month, [0] * N_COUNTERS)
+            for pos in range(N_COUNTERS):
+                total[pos] += counters[pos]
+        return totals
+
+    def to_sheet_rows(self) -> list[list[str]]:
+        """「全体ダッシュボード」シートと同じ形（A列=指標, 'YYYY年MM月' 列）の2次元リスト。"""
+        months = self.months()
+        totals = self.totals_by_month()
+        raw = [["指標", *(f"{m[:4]}年{int(m[5:])}月" for m in months)]]
+        for pos, label in enumerate(COUNTER_ROWS):
+            raw.append([label, *(str(totals[m][pos]) for m in months)])
+        for label, numerator, denominator in RATE_ROWS:
+            raw.append([label, *(
+                f"{totals[m][numerator] / totals[m][denominator]:.6f}"
+                if totals[m][denominator]
+                else ""
+                for m in months
+            )])
+        return raw
+
+
+class _LineReader:
+    """バイナリファイルを改行で終わる行単位で読み、読んだ位置を offset に記録するイテレータ。
+
+    書き込み途中の最終行（改行なし）は読まずに残し、次回の取り込みに回す。
+    """
+
+    def __init__(self, f: IO[bytes], offset: int):
+        self._f = f
+        self.offset = offset
+
+    def __iter__(self) -> Iterator[str]:
+        for line in self._f:
+            if not line.endswith(b"\n"):
+                return
+            self.offset += len(line)
+            yield line.decode("utf-8")
+
+
+def _chunked(rows: Iterable[list[str]], size: int) -> Iterator[list[list[str]]]:
+    chunk: list[list[str]] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class ActivityLogSource:
+    """状態ファイルから集計を読み込むダッシュボードのデータソース。
+
+    状態ファイルが更新されたときだけ読み直す。
+    """
+
+    def __init__(self, state_path: Optional[Path] = None):
+        self._state_path = state_path
+        self._cached: Optional[tuple[tuple[int, int], ActivityAggregate]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def state_path(self) -> Path:
+        return self._state_path or get_activity_state_path()
+
+    def load(self) -> ActivityAggregate:
+        path = self.state_path
+        stat = path.stat()
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if self._cached is None or self._cached[0] != stamp:
+                self._cached = (stamp, ActivityAggregate.load(path))
+            return self._cached[1]
+
+    def fetch_raw(self) -> list[list[str]]:
+        return self.load().to_sheet_rows()
+
+
+activity_source = ActivityLogSource()
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="架電ログ CSV を集計状態ファイルに取り込む")
+    parser.add_argument("files", nargs="+", type=Path)
+    parser.add_argument(
+        "--state", type=Path, default=None, help="状態ファイル（既定: ACTIVITY_STATE_PATH）"
+    )
+    args = parser.parse_args(argv)
+
+    state_path = args.state or get_activity_state_path()
+    agg = ActivityAggregate.load(state_path)
+    for path in args.files:
+        ingested, skipped = agg.ingest_file(path)
+        print(f"{path}: {ingested} rows" + (f" ({skipped} skipped)" if skipped else ""))
+    agg.save(state_path)
+    print(f"✓ Saved: {state_path} ({len(agg.counts)} keys, {len(agg.months())} months)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,99 @@
-from fastapi import FastAPI
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
-from .routers.dashboard import router
+from .admission import AdmissionControlMiddleware, controller
+from .alerts import AlertEngine, WebhookSink, load_rules
+from .config import (
+    get_alert_rules_path,
+    get_alert_state_path,
+    get_alert_webhook_url,
+    get_allowed_origins,
+    get_snapshot_cache_path,
+    get_snapshot_ttl_seconds,
+    validate_config,
+)
+from .routers import aggregate, alerts, dashboard, drilldown, export
+from .snapshot import save_snapshot, store
+from .warmup import Warmup
+
+logger = logging.getLogger(__name__)
+
+
+async def _poll_snapshots(engine: AlertEngine) -> None:
+    # アラートはスナップショット更新時に評価されるため、リクエストが無くても定期的に取得する。
+    # after_day で保留中のルールはシートが変わらなくても日付を見て評価する
+    while True:
+        try:
+            snapshot = await asyncio.to_thread(store.current)
+            await asyncio.to_thread(engine.check_deferred, snapshot)
+        except Exception:
+            logger.exception("snapshot poll failed")
+        await asyncio.sleep(max(get_snapshot_ttl_seconds(), 1.0))
+
 
-app = FastAPI(title="Inside Sales Dashboard API", version="0.1.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 設定不備は最初のリクエストではなく起動時に失敗させる
+    validate_config()
+    rules_path = get_alert_rules_path()
+    if rules_path is not None:
+        webhook_url = get_alert_webhook_url()
+        app.state.alert_engine = AlertEngine(
+            load_rules(rules_path),
+            sink=WebhookSink(webhook_url) if webhook_url else None,
+            state_path=get_alert_state_path(),
+        )
+        store.subscribe(app.state.alert_engine.on_snapshot)
+        app.state.poll_task = asyncio.create_task(_poll_snapshots(app.state.alert_engine))
+    cache_path = get_snapshot_cache_path()
+    if cache_path is not None:
+        # 次回起動時に取得できなかった場合のフォールバックとして、取得のたびに保存する
+        store.subscribe(lambda prev, snapshot: save_snapshot(snapshot, cache_path))
+    app.state.warmup = Warmup()
+    app.state.warmup_task = asyncio.create_task(app.state.warmup.run())
+    yield
+    app.state.warmup_task.cancel()
+    if rules_path is not None:
+        app.state.poll_task.cancel()
 
+
+app = FastAPI(title="Inside Sales Dashboard API", version="0.1.0", lifespan=lifespan)
+
+# 後から追加したものが外側になる。429/503 にも CORS ヘッダーを付けるため CORS を外側に置く
+app.add_middleware(AdmissionControlMiddleware)
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=get_allowed_origins(),
     allow_methods=["GET"],
     allow_headers=["*"],
 )
 
-app.include_router(router)
+app.include_router(dashboard.router)
+app.include_router(aggregate.router)
+app.include_router(export.router)
+app.include_router(alerts.router)
+app.include_router(drilldown.router)
 
 
 @app.get("/health")
 async def health():
     return {"status": "ok"}
+
+
+@app.get("/ready")
+async def ready(response: Response):
+    """ウォームアップが済むまで 503 を返す。デプロイ先のヘルスチェックに使う。"""
+    warmup: Warmup = app.state.warmup
+    if not warmup.ready:
+        response.status_code = 503
+    return warmup.state()
+
+
+@app.get("/api/admission")
+async def admission_stats():
+    """ルートごとの流入制御の設定・処理中件数・拒否件数。"""
+    return controller.stats()
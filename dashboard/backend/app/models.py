@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Any, Literal, Optional
 
 from pydantic import BaseModel
 
@@ -26,9 +26,99 @@ class MonthlyRow(BaseModel):
 class DashboardResponse(BaseModel):
     available_months: list[str]
     selected_month: str
+    # fields= で選択されなかったものは未設定のままレスポンスから除外される
+    kpi_cards: Optional[list[KpiCard]] = None
+    funnel_stages: Optional[list[FunnelStage]] = None
+    section_ankenjika: Optional[list[MonthlyRow]] = None
+    section_apo_kakutoku: Optional[list[MonthlyRow]] = None
+    section_lead_kakutoku: Optional[list[MonthlyRow]] = None
+    last_updated: str
+    version: Optional[str] = None  # スナップショットのバージョン（?since= に渡す）
+
+
+class JsonPatchOperation(BaseModel):
+    op: Literal["add", "remove", "replace"]
+    path: str
+    value: Any = None
+
+
+class DashboardPatchResponse(BaseModel):
+    """?since=<version> への応答。
+
+    base_version のレスポンスに patch を適用すると version のものになる。
+    """
+    version: str
+    base_version: str
+    patch: list[JsonPatchOperation]
+
+
+class PeriodAggregateResponse(BaseModel):
+    period: str  # "custom" / "qtd" / "fytd" / "fy" / "t3m" など
+    start_month: str
+    end_month: str
+    months: list[str]  # 期間内でシートに存在する月
     kpi_cards: list[KpiCard]
     funnel_stages: list[FunnelStage]
-    section_ankenjika: list[MonthlyRow]
-    section_apo_kakutoku: list[MonthlyRow]
-    section_lead_kakutoku: list[MonthlyRow]
     last_updated: str
+
+
+class AlertRule(BaseModel):
+    id: str
+    metric: str  # KPI カード / ファネル段階のラベル（例: "アポ獲得", "通電率"）
+    field: Literal["actual", "target", "benchmark", "achievement_rate"] = "achievement_rate"
+    op: Literal["<", "<=", ">", ">="]
+    threshold: float
+    after_day: Optional[int] = None  # 月のこの日以降のみ評価する（例: 20）
+    debounce_seconds: float = 3600  # 発火中の同一ルールを再通知するまでの最短間隔
+
+
+class AlertEvent(BaseModel):
+    rule_id: str
+    metric: str
+    field: str
+    op: str
+    threshold: float
+    value: float
+    month: str
+    snapshot_version: str
+    fired_at: str
+
+
+class AlertRuleStatus(BaseModel):
+    rule: AlertRule
+    firing: bool
+    last_value: Optional[float] = None
+    last_fired_at: Optional[str] = None
+
+
+class AlertsResponse(BaseModel):
+    rules: list[AlertRuleStatus]
+    recent_events: list[AlertEvent]
+
+
+class DrilldownEntry(BaseModel):
+    team: str
+    rep: Optional[str] = None  # None はチーム合計
+    kpi_cards: list[KpiCard]
+    funnel_stages: list[FunnelStage]
+
+
+class DrilldownResponse(BaseModel):
+    available_months: list[str]
+    selected_month: str
+    team: Optional[str] = None  # 指定時はそのチームの担当者別、未指定時はチーム別
+    entries: list[DrilldownEntry]
+
+
+class LeaderboardEntry(BaseModel):
+    rank: int
+    team: str
+    rep: str
+    value: float
+
+
+class LeaderboardResponse(BaseModel):
+    selected_month: str
+    metric: str
+    order: Literal["top", "bottom"]
+    entries: list[LeaderboardEntry]
@@ -1,6 +1,6 @@
 import re
 from datetime import datetime, timezone, timedelta
-from typing import Optional
+from typing import Iterable, NamedTuple, Optional
 
 from .models import DashboardResponse, FunnelStage, KpiCard, MonthlyRow
 
@@ -89,6 +89,16 @@ LABEL_OVERRIDES: dict[str, str] = {
 }
 
 
+# DashboardResponse のうち fields= で選択できる（遅延構築される）フィールド
+DASHBOARD_FIELDS = (
+    "kpi_cards",
+    "funnel_stages",
+    "section_ankenjika",
+    "section_apo_kakutoku",
+    "section_lead_kakutoku",
+)
+
+
 # ── ヘルパー ─────────────────────────────────────────────────────────────────
 
 def _clean(val: str) -> str:
@@ -161,9 +171,14 @@ def _get_cell(
     return _to_float(row[col_idx])
 
 
-# ── メイン解析関数 ─────────────────────────────────────────────────────────────
+class SheetIndex(NamedTuple):
+    month_cols: dict[str, int]
+    available_months: list[str]
+    row_map: dict[str, int]
+
 
-def parse_dashboard(raw: list[list[str]], selected_month: str = "") -> DashboardResponse:
+def index_sheet(raw: list[list[str]]) -> SheetIndex:
+    """ヘッダー行・月列・行ラベルを解析し、セル参照用のインデックスを返す。"""
     if not raw:
         raise ValueError("シートデータが空です")
 
@@ -179,40 +194,73 @@ def parse_dashboard(raw: list[list[str]], selected_month: str = "") -> Dashboard
     if not available_months:
         raise ValueError("月列が見つかりません（'YYYY年MM月' 形式の列ヘッダーが必要）")
 
+    return SheetIndex(month_cols, available_months, _build_row_index(raw))
+
+
+# ── メイン解析関数 ─────────────────────────────────────────────────────────────
+
+def parse_dashboard(
+    raw: list[list[str]],
+    selected_month: str = "",
+    fields: Optional[Iterable[str]] = None,
+) -> DashboardResponse:
+    """シートを DashboardResponse に変換する。
+
+    fields を指定した場合は DASHBOARD_FIELDS のうち指定されたものだけを構築する
+    （未指定のフィールドは未設定のまま残り、レスポンスから除外される）。
+    """
+    month_cols, available_months, row_map = index_sheet(raw)
+
+    include = set(DASHBOARD_FIELDS) if fields is None else set(fields)
+    unknown = include - set(DASHBOARD_FIELDS)
+    if unknown:
+        raise ValueError(f"不明なフィールド: {', '.join(sorted(unknown))}")
+
     # selected_month が未指定 or 不正な場合は最新月を使用
     if not selected_month or selected_month not in month_cols:
         selected_month = available_months[-1]
 
     sel_col = month_cols[selected_month]
-    row_map = _build_row_index(raw)
 
     # ── KPI cards ─────────────────────────────────────────────────────────────
-    kpi_cards: list[KpiCard] = []
-    for label, target_row, actual_row, unit in KPI_DEFINITIONS:
-        target = _get_cell(raw, row_map, target_row, sel_col) if target_row else None
-        actual = _get_cell(raw, row_map, actual_row, sel_col) if actual_row else None
-        achievement = (actual / target) if (actual is not None and target and target != 0) else None
-        kpi_cards.append(KpiCard(
-            label=label,
-            target=target,
-            actual=actual,
-            achievement_rate=achievement,
-            unit=unit,
-        ))
+    def build_kpi_cards() -> list[KpiCard]:
+        kpi_cards: list[KpiCard] = []
+        for label, target_row, actual_row, unit in KPI_DEFINITIONS:
+            target = _get_cell(raw, row_map, target_row, sel_col) if target_row else None
+            actual = _get_cell(raw, row_map, actual_row, sel_col) if actual_row else None
+            achievement = (
+                (actual / target) if (actual is not None and target and target != 0) else None
+            )
+            kpi_cards.append(KpiCard(
+                label=label,
+                target=target,
+                actual=actual,
+                achievement_rate=achievement,
+                unit=unit,
+            ))
+        return kpi_cards
 
     # ── Funnel stages ──────────────────────────────────────────────────────────
-    funnel_stages: list[FunnelStage] = []
-    for label, actual_row, benchmark_row, fallback_benchmark in FUNNEL_DEFINITIONS:
-        actual = _get_cell(raw, row_map, actual_row, sel_col)
-        benchmark_val = _get_cell(raw, row_map, benchmark_row, sel_col) if benchmark_row else None
-        benchmark = benchmark_val if (benchmark_val is not None and benchmark_val != 0) else fallback_benchmark
-        achievement = (actual / benchmark) if (actual is not None and benchmark != 0) else None
-        funnel_stages.append(FunnelStage(
-            label=label,
-            actual=actual,
-            benchmark=benchmark,
-            achievement_rate=achievement,
-        ))
+    def build_funnel_stages() -> list[FunnelStage]:
+        funnel_stages: list[FunnelStage] = []
+        for label, actual_row, benchmark_row, fallback_benchmark in FUNNEL_DEFINITIONS:
+            actual = _get_cell(raw, row_map, actual_row, sel_col)
+            benchmark_val = (
+                _get_cell(raw, row_map, benchmark_row, sel_col) if benchmark_row else None
+            )
+            benchmark = (
+                benchmark_val
+                if (benchmark_val is not None and benchmark_val != 0)
+                else fallback_benchmark
+            )
+            achievement = (actual / benchmark) if (actual is not None and benchmark != 0) else None
+            funnel_stages.append(FunnelStage(
+                label=label,
+                actual=actual,
+                benchmark=benchmark,
+                achievement_rate=achievement,
+            ))
+        return funnel_stages
 
     # ── 月別明細セクション ────────────────────────────────────────────────────
     def build_section(metric_labels: list[str]) -> list[MonthlyRow]:
@@ -230,15 +278,20 @@ def parse_dashboard(raw: list[list[str]], selected_month: str = "") -> Dashboard
             rows.append(MonthlyRow(metric=display_label, columns=cols))
         return rows
 
+    builders = {
+        "kpi_cards": build_kpi_cards,
+        "funnel_stages": build_funnel_stages,
+        "section_ankenjika": lambda: build_section(SECTION_ANKENJIKA_ROWS),
+        "section_apo_kakutoku": lambda: build_section(SECTION_APO_ROWS),
+        "section_lead_kakutoku": lambda: build_section(SECTION_LEAD_ROWS),
+    }
+    parts = {name: builders[name]() for name in DASHBOARD_FIELDS if name in include}
+
     now_jst = datetime.now(JST).isoformat()
 
     return DashboardResponse(
         available_months=available_months,
         selected_month=selected_month,
-        kpi_cards=kpi_cards,
-        funnel_stages=funnel_stages,
-        section_ankenjika=build_section(SECTION_ANKENJIKA_ROWS),
-        section_apo_kakutoku=build_section(SECTION_APO_ROWS),
-        section_lead_kakutoku=build_section(SECTION_LEAD_ROWS),
         last_updated=now_jst,
+        **parts,
     )
@@ -0,0 +1,41 @@
+from typing import Any
+
+
+def _escape(token: str) -> str:
+    """JSON Pointer (RFC 6901) のトークンをエスケープする。月キー 'YYYY/MM' の '/' 対策。"""
+    return token.replace("~", "~0").replace("/", "~1")
+
+
+def make_patch(old: Any, new: Any, path: str = "") -> list[dict[str, Any]]:
+    """old を new に変換する JSON Patch (RFC 6902) の操作列を返す。
+
+    dict はキー単位、list は位置単位で比較する（行の並びは固定のため move は使わない）。
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops: list[dict[str, Any]] = []
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in new.items():
+            child = f"{path}/{_escape(key)}"
+            if key not in old:
+                ops.append({"op": "add", "path": child, "value": value})
+            else:
+                ops.extend(make_patch(old[key], value, child))
+        return ops
+
+    if isinstance(old, list) and isinstance(new, list):
+        ops = []
+        common = min(len(old), len(new))
+        for i in range(common):
+            ops.extend(make_patch(old[i], new[i], f"{path}/{i}"))
+        # 末尾から削除しないと後続のインデックスがずれる
+        for i in range(len(old) - 1, common - 1, -1):
+            ops.append({"op": "remove", "path": f"{path}/{i}"})
+        for i in range(common, len(new)):
+            ops.append({"op": "add", "path": f"{path}/{i}", "value": new[i]})
+        return ops
+
+    if old != new or type(old) is not type(new):
+        return [{"op": "replace", "path": path, "value": new}]
+    return []
@@ -0,0 +1,33 @@
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Query
+
+from ..aggregate import AggregateIndex, resolve_period
+from ..models import PeriodAggregateResponse
+from ..snapshot import store
+
+router = APIRouter()
+
+
+@router.get("/api/aggregate", response_model=PeriodAggregateResponse)
+async def get_aggregate(
+    period: str = Query(default="qtd", description="custom / qtd / fytd / fy / tNm（例: t3m）"),
+    month: str = Query(default="", description="基準月 YYYY/MM 形式。省略時は最新月。"),
+    start: str = Query(default="", description="period=custom の開始月 YYYY/MM"),
+    end: str = Query(default="", description="period=custom の終了月 YYYY/MM"),
+):
+    try:
+        snapshot = await asyncio.to_thread(store.current)
+        index: AggregateIndex = snapshot.memo(
+            "aggregate_index", lambda: AggregateIndex(snapshot.raw)
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    try:
+        start_month, end_month = resolve_period(period, index.months, month, start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # custom は任意の月の組を受け付けるためキャッシュしない（集計は累積和の引き算のみ）
+    return index.aggregate(period, start_month, end_month)
@@ -0,0 +1,15 @@
+from fastapi import APIRouter, HTTPException, Request
+
+from ..models import AlertsResponse
+
+router = APIRouter()
+
+
+@router.get("/api/alerts", response_model=AlertsResponse)
+async def get_alerts(request: Request):
+    engine = getattr(request.app.state, "alert_engine", None)
+    if engine is None:
+        raise HTTPException(
+            status_code=404, detail="アラートは設定されていません（ALERT_RULES_PATH）"
+        )
+    return engine.status()
@@ -1,18 +1,116 @@
-from fastapi import APIRouter, HTTPException, Query
+import asyncio
+from typing import Optional, Union
 
-from ..models import DashboardResponse
-from ..parser import parse_dashboard
-from ..sheets_client import fetch_dashboard_raw
+from fastapi import APIRouter, HTTPException, Query, Response
+
+from ..models import DashboardPatchResponse, DashboardResponse
+from ..parser import DASHBOARD_FIELDS, index_sheet, parse_dashboard
+from ..patch import make_patch
+from ..snapshot import Snapshot, store
 
 router = APIRouter()
 
 
-@router.get("/api/dashboard", response_model=DashboardResponse)
+def _parse_fields(fields: str) -> frozenset[str]:
+    if not fields:
+        return frozenset(DASHBOARD_FIELDS)
+    selected = frozenset(f.strip() for f in fields.split(",") if f.strip())
+    unknown = selected - set(DASHBOARD_FIELDS)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"不明なフィールド: {', '.join(sorted(unknown))}"
+            f"（指定可能: {', '.join(DASHBOARD_FIELDS)}）",
+        )
+    return selected
+
+
+def _resolve_month(snapshot: Snapshot, month: str) -> str:
+    """month をシートに存在する月に解決する（未指定・不明な値は最新月）。
+
+    memo のキーには解決後の月を使う。任意の文字列をキーにすると、スナップショットが
+    変わらない間キャッシュが際限なく増えるため。
+    """
+    months = snapshot.memo("sheet_index", lambda: index_sheet(snapshot.raw)).available_months
+    return month if month in months else months[-1]
+
+
+def _dashboard(snapshot: Snapshot, month: str, selected: frozenset[str]) -> DashboardResponse:
+    return snapshot.memo(
+        ("dashboard", month, selected),
+        lambda: parse_dashboard(snapshot.raw, selected_month=month, fields=selected).model_copy(
+            update={"version": snapshot.version}
+        ),
+    )
+
+
+def _encoded_dashboard(snapshot: Snapshot, month: str, selected: frozenset[str]) -> bytes:
+    """_dashboard() を JSON にエンコードした結果（スナップショット単位でキャッシュ）。"""
+    return snapshot.memo(
+        ("dashboard_json", month, selected),
+        lambda: _dashboard(snapshot, month, selected)
+        .model_dump_json(exclude_unset=True)
+        .encode("utf-8"),
+    )
+
+
+def prewarm(snapshot: Snapshot) -> int:
+    """全項目のレスポンスを各月について事前にエンコードする（month 省略時は最新月のもの）。
+
+    Returns:
+        エンコードしたレスポンス数
+    """
+    selected = frozenset(DASHBOARD_FIELDS)
+    months = snapshot.memo("sheet_index", lambda: index_sheet(snapshot.raw)).available_months
+    for month in months:
+        _encoded_dashboard(snapshot, month, selected)
+    return len(months)
+
+
+def _dashboard_patch(
+    base: Snapshot, snapshot: Snapshot, month: str, selected: frozenset[str]
+) -> DashboardPatchResponse:
+    def build() -> DashboardPatchResponse:
+        old = _dashboard(base, month, selected).model_dump(mode="json", exclude_unset=True)
+        new = _dashboard(snapshot, month, selected).model_dump(mode="json", exclude_unset=True)
+        return DashboardPatchResponse(
+            version=snapshot.version,
+            base_version=base.version,
+            patch=make_patch(old, new),
+        )
+
+    return snapshot.memo(("dashboard_patch", base.version, month, selected), build)
+
+
+@router.get(
+    "/api/dashboard",
+    response_model=Union[DashboardPatchResponse, DashboardResponse],
+    response_model_exclude_unset=True,
+)
 async def get_dashboard(
     month: str = Query(default="", description="対象月 YYYY/MM 形式。省略時は最新月。"),
+    fields: str = Query(
+        default="",
+        description="取得するフィールドのカンマ区切り"
+        f"（{', '.join(DASHBOARD_FIELDS)}）。省略時は全て。",
+    ),
+    since: Optional[str] = Query(
+        default=None,
+        description="クライアントが保持しているバージョン。指定時は差分（JSON Patch）を返す。"
+        "バージョンが古すぎる場合は通常のレスポンスを返す。",
+    ),
 ):
+    selected = _parse_fields(fields)
     try:
-        raw = fetch_dashboard_raw()
-        return parse_dashboard(raw, selected_month=month)
+        snapshot = await asyncio.to_thread(store.current)
+        month = _resolve_month(snapshot, month)
+        if since is not None:
+            base = snapshot if since == snapshot.version else store.get(since)
+            if base is not None:
+                return _dashboard_patch(base, snapshot, month, selected)
+        # エンコード済みの JSON をそのまま返す（リクエストごとの検証・シリアライズを省く）
+        return Response(
+            content=_encoded_dashboard(snapshot, month, selected), media_type="application/json"
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,66 @@
+import asyncio
+from typing import Literal, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+
+from ..config import get_dashboard_source
+from ..drilldown import LEADERBOARD_METRICS, DrilldownIndex, indexer
+from ..ingest import activity_source
+from ..models import DrilldownResponse, LeaderboardResponse
+from ..snapshot import store
+
+router = APIRouter()
+
+
+async def _index() -> tuple[object, DrilldownIndex]:
+    if get_dashboard_source() != "activity_logs":
+        raise HTTPException(
+            status_code=404,
+            detail="担当者別データは DASHBOARD_SOURCE=activity_logs のときのみ利用できます",
+        )
+    try:
+        snapshot = await asyncio.to_thread(store.current)
+        index = snapshot.memo("drilldown_index", lambda: indexer.build(activity_source.load()))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return snapshot, index
+
+
+@router.get("/api/drilldown", response_model=DrilldownResponse)
+async def get_drilldown(
+    month: str = Query(default="", description="対象月 YYYY/MM 形式。省略時は最新月。"),
+    team: Optional[str] = Query(
+        default=None, description="指定時はチーム内の担当者別。省略時はチーム別。"
+    ),
+):
+    snapshot, index = await _index()
+    try:
+        month = index.resolve_month(month)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    # team は任意文字列のため、その月に存在するチームだけをキャッシュする
+    if team is not None and (month, team) not in index.reps:
+        return index.drilldown(month, team)
+    return snapshot.memo(("drilldown", month, team), lambda: index.drilldown(month, team))
+
+
+@router.get("/api/leaderboard", response_model=LeaderboardResponse)
+async def get_leaderboard(
+    metric: str = Query(description=f"指標（{' / '.join(LEADERBOARD_METRICS)}）"),
+    month: str = Query(default="", description="対象月 YYYY/MM 形式。省略時は最新月。"),
+    order: Literal["top", "bottom"] = Query(default="top"),
+    n: int = Query(default=10, ge=1, le=500),
+):
+    if metric not in LEADERBOARD_METRICS:
+        raise HTTPException(status_code=400, detail=f"不明な指標: {metric!r}")
+    snapshot, index = await _index()
+    try:
+        month = index.resolve_month(month)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return LeaderboardResponse(
+        selected_month=month,
+        metric=metric,
+        order=order,
+        entries=index.leaderboard(month, metric, order, n),
+    )
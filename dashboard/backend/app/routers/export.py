@@ -0,0 +1,69 @@
+import asyncio
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from ..export import (
+    EXPORT_MEDIA_TYPES,
+    ExportUnavailableError,
+    negotiate_format,
+    stream_arrow,
+    stream_csv,
+    validate_month_range,
+)
+from ..snapshot import store
+
+router = APIRouter()
+
+_EXTENSIONS = {"csv": "csv", "arrow": "arrows", "parquet": "parquet"}
+
+
+@router.get("/api/export")
+async def export_metrics(
+    format: str = Query(
+        default="",
+        description="csv / arrow / parquet。省略時は Accept ヘッダーで判定（既定 csv）。",
+    ),
+    start: str = Query(default="", description="開始月 YYYY/MM（含む）。省略時は最古の月。"),
+    end: str = Query(default="", description="終了月 YYYY/MM（含む）。省略時は最新月。"),
+    version: Optional[str] = Query(
+        default=None, description="過去スナップショットのバージョン。省略時は最新。"
+    ),
+    accept: str = Header(default=""),
+):
+    """全ラベル行 × 全月列を (snapshot_version, metric, month, value) の縦持ちで出力する。
+
+    レスポンスはチャンクごとにストリーミングする。
+    """
+    try:
+        fmt = negotiate_format(format, accept)
+        validate_month_range(start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        snapshot = await asyncio.to_thread(store.current)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if version is not None and version != snapshot.version:
+        snapshot = store.get(version)
+        if snapshot is None:
+            raise HTTPException(
+                status_code=404, detail=f"スナップショット v{version} は保持されていません"
+            )
+
+    try:
+        if fmt == "csv":
+            body = stream_csv(snapshot, start, end)
+        else:
+            body = stream_arrow(snapshot, start, end, parquet=(fmt == "parquet"))
+    except ExportUnavailableError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+
+    filename = f"dashboard_v{snapshot.version}.{_EXTENSIONS[fmt]}"
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
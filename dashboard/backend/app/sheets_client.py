@@ -1,28 +1,59 @@
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
+import threading
 
-from .config import DASHBOARD_SHEET_NAME, SPREADSHEET_ID_2, get_service_account_info
+from .config import DASHBOARD_SHEET_NAME, get_service_account_info, get_spreadsheet_id
 
 SHEETS_SCOPES = ["https://www.googleapis.com/auth/spreadsheets.readonly"]
 
+# 認証情報と discovery クライアントは作成コストが高いため、プロセス内で使い回す
+_credentials = None
+_service = None
+_service_lock = threading.Lock()
+# discovery クライアント（httplib2）はスレッドセーフでないため、API 呼び出しを直列化する
+_request_lock = threading.Lock()
+
 
 def _get_service():
-    creds = service_account.Credentials.from_service_account_info(
-        get_service_account_info(), scopes=SHEETS_SCOPES
-    )
-    return build("sheets", "v4", credentials=creds)
+    global _credentials, _service
+    with _service_lock:
+        if _service is None:
+            from google.oauth2 import service_account
+            from googleapiclient.discovery import build
+
+            _credentials = service_account.Credentials.from_service_account_info(
+                get_service_account_info(), scopes=SHEETS_SCOPES
+            )
+            _service = build("sheets", "v4", credentials=_credentials)
+        return _service
+
+
+def warm() -> None:
+    """discovery クライアントを作り、アクセストークンを取得しておく。
+
+    googleapiclient / google.oauth2 の import は重いため app.main の import 時には読み込まず、
+    起動後のウォームアップ（スレッド）でこの関数から読み込む。起動直後の最初の
+    リクエストでトークン発行の往復が発生しないようにする。
+    トークンの期限切れ後は通常どおり API 呼び出し時に更新される。
+    """
+    _get_service()
+    if not _credentials.valid:
+        import google_auth_httplib2
+        import httplib2
+
+        with _request_lock:
+            _credentials.refresh(google_auth_httplib2.Request(httplib2.Http()))
 
 
 def fetch_dashboard_raw() -> list[list[str]]:
     """全体ダッシュボードシートの全データを2次元リストで返す。"""
     service = _get_service()
-    result = (
-        service.spreadsheets()
-        .values()
-        .get(
-            spreadsheetId=SPREADSHEET_ID_2,
-            range=f"{DASHBOARD_SHEET_NAME}!A:Z",
+    with _request_lock:
+        result = (
+            service.spreadsheets()
+            .values()
+            .get(
+                spreadsheetId=get_spreadsheet_id(),
+                range=f"{DASHBOARD_SHEET_NAME}!A:Z",
+            )
+            .execute()
         )
-        .execute()
-    )
     return result.get("values", [])
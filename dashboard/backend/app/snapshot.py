@@ -0,0 +1,210 @@
+import hashlib
+import itertools
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Hashable, Optional
+
+from .config import get_dashboard_source, get_snapshot_history_size, get_snapshot_ttl_seconds
+from .ingest import activity_source
+from .parser import index_sheet
+from .sheets_client import fetch_dashboard_raw
+
+logger = logging.getLogger(__name__)
+
+SnapshotListener = Callable[[Optional["Snapshot"], "Snapshot"], None]
+
+
+def fetch_raw() -> list[list[str]]:
+    """DASHBOARD_SOURCE に応じてシートまたは架電ログ集計から2次元リストを取得する。"""
+    if get_dashboard_source() == "activity_logs":
+        return activity_source.fetch_raw()
+    return fetch_dashboard_raw()
+
+
+def _digest(raw: list[list[str]]) -> str:
+    return hashlib.sha256(json.dumps(raw, ensure_ascii=False).encode()).hexdigest()
+
+
+class Snapshot:
+    """ある時点で取得したシートデータと、そこから派生した計算結果のキャッシュ。
+
+    version はシート内容が変わったときだけ進む。派生結果は memo() で
+    スナップショット単位にキャッシュされ、新しいスナップショットに切り替わると
+    まとめて捨てられる。
+    """
+
+    def __init__(self, version: str, raw: list[list[str]], digest: str):
+        self.version = version
+        self.raw = raw
+        self.digest = digest
+        self.fetched_at = time.monotonic()
+        # 保存済みデータから復元したもの（seed）は、取得して内容を確かめるまで False
+        self.live = True
+        self._memo: dict[Hashable, Any] = {}
+        self._lock = threading.Lock()
+
+    def memo(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """key に対応する派生結果を返す。未計算なら factory() で計算して保存する。"""
+        with self._lock:
+            if key in self._memo:
+                return self._memo[key]
+        value = factory()
+        with self._lock:
+            return self._memo.setdefault(key, value)
+
+    def changed_cells(self, prev: Optional["Snapshot"]) -> Optional[set[tuple[str, str]]]:
+        """prev から値が変わったセルを (行ラベル, YYYY/MM) の集合で返す。
+
+        prev が無い、または月列の構成が変わった場合は全セルが変わったものとして None を返す。
+        """
+        if prev is None:
+            return None
+
+        def build() -> Optional[set[tuple[str, str]]]:
+            old_months, _, old_rows = index_sheet(prev.raw)
+            new_months, _, new_rows = index_sheet(self.raw)
+            if old_months != new_months:
+                return None
+            changed: set[tuple[str, str]] = set()
+            for label in old_rows.keys() | new_rows.keys():
+                old_row = prev.raw[old_rows[label]] if label in old_rows else []
+                new_row = self.raw[new_rows[label]] if label in new_rows else []
+                for month, col in new_months.items():
+                    old_val = old_row[col] if col < len(old_row) else ""
+                    new_val = new_row[col] if col < len(new_row) else ""
+                    if old_val != new_val:
+                        changed.add((label, month))
+            return changed
+
+        return self.memo(("changed_cells", prev.version), build)
+
+
+class SnapshotStore:
+    """シートの最新スナップショットを TTL 付きで保持する。
+
+    差分配信のため、直近のスナップショットをリングバッファに残しておく。
+
+    バージョンは "<起動ID>-<連番>"。起動 ID はストアを作るたびに（= プロセスごとに）
+    ランダムに決めるため、再起動や再デプロイの後に前のプロセスと同じバージョンが
+    別の内容に付くことはない。前のプロセスのバージョンを ?since= に渡したクライアントは
+    履歴に見つからず、全体のレスポンスを受け取る。
+    """
+
+    def __init__(
+        self,
+        fetcher: Callable[[], list[list[str]]] = fetch_raw,
+        ttl_seconds: Optional[float] = None,
+        history_size: Optional[int] = None,
+    ):
+        self._fetcher = fetcher
+        self._ttl_seconds = ttl_seconds
+        self._current: Optional[Snapshot] = None
+        self._history: deque[Snapshot] = deque(maxlen=history_size or get_snapshot_history_size())
+        self._listeners: list[SnapshotListener] = []
+        self._lock = threading.Lock()
+        self._boot_id = secrets.token_hex(4)
+        self._sequence = itertools.count(1)
+
+    def _new_snapshot(self, raw: list[list[str]], digest: str) -> Snapshot:
+        return Snapshot(f"{self._boot_id}-{next(self._sequence)}", raw, digest)
+
+    def subscribe(self, listener: SnapshotListener) -> None:
+        """新しいバージョンのスナップショットができるたびに listener(prev, new) を呼ぶ。"""
+        self._listeners.append(listener)
+
+    @property
+    def ttl_seconds(self) -> float:
+        if self._ttl_seconds is None:
+            return get_snapshot_ttl_seconds()
+        return self._ttl_seconds
+
+    def current(self) -> Snapshot:
+        """最新のスナップショットを返す。TTL 切れなら再取得する。"""
+        snap = self._current
+        if snap is not None and time.monotonic() - snap.fetched_at < self.ttl_seconds:
+            return snap
+        with self._lock:
+            # 待っている間に他のリクエストが再取得済みならそれを使う
+            snap = self._current
+            if snap is not None and time.monotonic() - snap.fetched_at < self.ttl_seconds:
+                return snap
+            return self._refresh_locked()
+
+    def get(self, version: str) -> Optional[Snapshot]:
+        """指定バージョンのスナップショット。リングバッファから外れていれば None。"""
+        for snap in reversed(self._history):
+            if snap.version == version:
+                return snap
+        return None
+
+    def refresh(self) -> Snapshot:
+        """TTL に関係なくシートを再取得する。"""
+        with self._lock:
+            return self._refresh_locked()
+
+    def seed(self, raw: list[list[str]]) -> Optional[Snapshot]:
+        """まだスナップショットが無ければ、保存済みのデータを最新として使い始める。
+
+        起動時にシートを取得できない場合のフォールバック用。取得中のスレッドがロックを
+        握っていても待たずに差し込めるよう、ロックは取らない。リスナーは呼ばない
+        （古いデータでアラートを評価しないため）。次に取得に成功すると通常どおり置き換わる。
+        """
+        if self._current is not None:
+            return None
+        snap = self._new_snapshot(raw, _digest(raw))
+        snap.live = False
+        self._current = snap
+        self._history.append(snap)
+        return snap
+
+    def _refresh_locked(self) -> Snapshot:
+        raw = self._fetcher()
+        digest = _digest(raw)
+        prev = self._current
+        if prev is not None and prev.digest == digest:
+            # 内容が同じなら派生キャッシュごと使い回し、鮮度だけ更新する
+            prev.fetched_at = time.monotonic()
+            prev.live = True
+            return prev
+        self._current = self._new_snapshot(raw, digest)
+        self._history.append(self._current)
+        for listener in self._listeners:
+            try:
+                listener(prev, self._current)
+            except Exception:
+                logger.exception("snapshot listener failed")
+        return self._current
+
+
+def save_snapshot(snapshot: Snapshot, path: Path) -> None:
+    """スナップショットをファイルに保存する（一時ファイル経由で置き換え）。"""
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(
+        json.dumps({"raw": snapshot.raw}, ensure_ascii=False),
+        encoding="utf-8",
+    )
+    os.replace(tmp, path)
+
+
+def load_snapshot(path: Path) -> Optional[list[list[str]]]:
+    """save_snapshot() で保存したシートデータ。無いか読めなければ None。
+
+    バージョンは保存しない（読み込んだプロセスの起動 ID で振り直す）。
+    """
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        return data["raw"]
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError):
+        logger.exception("failed to load snapshot cache: %s", path)
+        return None
+
+
+store = SnapshotStore()
@@ -0,0 +1,101 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from . import sheets_client
+from .config import (
+    get_dashboard_source,
+    get_snapshot_cache_path,
+    get_warmup_timeout_seconds,
+)
+from .routers.dashboard import prewarm
+from .snapshot import Snapshot, load_snapshot, store
+
+logger = logging.getLogger(__name__)
+
+
+class Warmup:
+    """起動直後のウォームアップと、その進み具合（/ready の応答）を管理する。
+
+    認証情報の作成とトークン取得、シートの取得・解析、全月分のレスポンスの事前
+    エンコードを済ませてから ready になる。timeout 秒以内に終わらなければ保存済みの
+    スナップショットで ready にし、取得はバックグラウンドで続ける。保存済みの
+    スナップショットも無ければ degraded として ready を返す（デプロイを止めない）。
+    """
+
+    def __init__(self, timeout: Optional[float] = None):
+        self.timeout = get_warmup_timeout_seconds() if timeout is None else timeout
+        # warming → ready（source: live / persisted）または degraded
+        self.status = "warming"
+        self.source: Optional[str] = None
+        self.error: Optional[str] = None
+        self.version: Optional[str] = None
+        self.duration_ms: Optional[float] = None
+        self._started = time.monotonic()
+
+    @property
+    def ready(self) -> bool:
+        return self.status != "warming"
+
+    def state(self) -> dict:
+        return {
+            "status": self.status,
+            "source": self.source,
+            "version": self.version,
+            "duration_ms": self.duration_ms,
+            "error": self.error,
+        }
+
+    def _warm_sync(self) -> Snapshot:
+        if get_dashboard_source() == "sheets":
+            sheets_client.warm()
+        snapshot = store.refresh()
+        prewarm(snapshot)
+        return snapshot
+
+    def _finish(self, status: str, source: Optional[str], snapshot: Optional[Snapshot]) -> None:
+        self.status = status
+        self.source = source
+        self.version = snapshot.version if snapshot is not None else None
+        self.duration_ms = round((time.monotonic() - self._started) * 1000, 1)
+        logger.info("warmup %s (source=%s, %.0fms)", status, source, self.duration_ms)
+
+    def _on_late_completion(self, task: "asyncio.Future[Snapshot]") -> None:
+        # タイムアウト後に取得が終わったら live に切り替える
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            logger.error("warmup failed after timeout: %s", task.exception())
+            return
+        self.error = None
+        self._finish("ready", "live", task.result())
+
+    def _fall_back(self) -> None:
+        path = get_snapshot_cache_path()
+        saved = load_snapshot(path) if path is not None else None
+        snapshot = store.seed(saved) if saved is not None else None
+        if snapshot is not None:
+            prewarm(snapshot)
+            self._finish("ready", "persisted", snapshot)
+        else:
+            self._finish("degraded", None, None)
+
+    async def run(self) -> None:
+        # ポート bind を先に済ませるため、1 tick 譲ってからスレッドで実行する
+        await asyncio.sleep(0)
+        task = asyncio.ensure_future(asyncio.to_thread(self._warm_sync))
+        try:
+            snapshot = await asyncio.wait_for(asyncio.shield(task), self.timeout)
+        except asyncio.TimeoutError:
+            self.error = f"warmup timed out after {self.timeout}s"
+            logger.warning(self.error)
+            await asyncio.to_thread(self._fall_back)
+            # フォールバックの後に登録する（既に終わっていればすぐ呼ばれ、live で上書きされる）
+            task.add_done_callback(self._on_late_completion)
+        except Exception as e:
+            self.error = str(e)
+            logger.exception("warmup failed")
+            await asyncio.to_thread(self._fall_back)
+        else:
+            self._finish("ready", "live", snapshot)
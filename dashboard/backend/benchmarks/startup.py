@@ -0,0 +1,109 @@
+"""バックエンドの起動時間ベンチマーク。
+
+1. `python -X importtime -c "import app.main"` の結果から累積 import 時間の上位を表示
+2. uvicorn をサブプロセスで起動し、プロセス開始から /health が 200 を返すまでの時間を計測
+
+使い方（dashboard/backend で実行）:
+    uv run python benchmarks/startup.py [--runs 5] [--top 15]
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# validate_config() を通すためのダミー値（実際の Sheets API は呼ばない）
+DUMMY_ENV = {
+    "SPREADSHEET_ID_2": "benchmark-dummy",
+    "GOOGLE_SERVICE_ACCOUNT_JSON": "{}",
+}
+
+
+def _env() -> dict[str, str]:
+    env = dict(os.environ)
+    for key, value in DUMMY_ENV.items():
+        env.setdefault(key, value)
+    return env
+
+
+def measure_importtime(top: int) -> list[tuple[int, str]]:
+    """-X importtime の出力を解析し、(累積μs, モジュール名) を降順で返す。"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR,
+        env=_env(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    entries: list[tuple[int, str]] = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        entries.append((int(cumulative.strip()), name.strip()))
+    entries.sort(reverse=True)
+    return entries[:top]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure_health_latency(timeout: float = 30.0) -> float:
+    """uvicorn 起動から /health が応答するまでの秒数を返す。"""
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/health"
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port)],
+        cwd=BACKEND_DIR,
+        env=_env(),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(url, timeout=1) as res:
+                    if res.status == 200:
+                        return time.perf_counter() - start
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.005)
+        raise TimeoutError(f"/health did not respond within {timeout}s")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    print("== import time (cumulative) ==")
+    for cumulative_us, name in measure_importtime(args.top):
+        print(f"{cumulative_us / 1000:9.1f} ms  {name}")
+
+    print("\n== process start -> /health 200 ==")
+    samples = [measure_health_latency() for _ in range(args.runs)]
+    print(
+        f"runs={len(samples)} "
+        f"min={min(samples) * 1000:.0f}ms "
+        f"median={statistics.median(samples) * 1000:.0f}ms "
+        f"max={max(samples) * 1000:.0f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
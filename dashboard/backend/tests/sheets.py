@@ -0,0 +1,53 @@
+"""テスト用のシートデータと、任意のデータを返す SnapshotStore。"""
+from typing import Optional
+
+from app.snapshot import SnapshotStore
+
+MONTHS = ["2025/04", "2025/05", "2025/06"]
+
+
+def build_sheet(
+    rows: dict[str, list[str]], months: Optional[list[str]] = None
+) -> list[list[str]]:
+    """{行ラベル: 月ごとの値} からシート形式の2次元リストを作る（months は YYYY/MM）。"""
+    months = MONTHS if months is None else months
+    header = ["指標", *(f"{m[:4]}年{int(m[5:])}月" for m in months)]
+    return [["IS ダッシュボード"], header, *([label, *values] for label, values in rows.items())]
+
+
+SHEET_ROWS = {
+    "目標：案件化数": ["20", "20", "25"],
+    "実績：案件化数": ["18", "22", "10"],
+    "実績：案件化率": ["36.0%", "44.0%", "25.0%"],
+    "目標：アポ数": ["50", "50", "60"],
+    "実績：アポ数": ["45", "52", "30"],
+    "実績：アポ化率（新規アポ数 / 通電数）": ["15.0%", "16.0%", "12.0%"],
+    "実績：通電率": ["50.0%", "52.0%", "48.0%"],
+    "実績：通電数": ["300", "325", "250"],
+    "目標：有効リード数": ["120", "120", "130"],
+    "実績：有効リード数": ["110", "125", "90"],
+    "新規リード数": ["200", "210", "150"],
+}
+
+
+class FakeSheet:
+    """raw を書き換えると、次の取得から新しい内容を返すシート。"""
+
+    def __init__(self, raw: Optional[list[list[str]]] = None):
+        self.raw = build_sheet(SHEET_ROWS) if raw is None else raw
+
+    def store(self, history_size: int = 16) -> SnapshotStore:
+        # TTL 0: current() のたびに取得し直す（内容が同じならバージョンは進まない）
+        return SnapshotStore(fetcher=lambda: self.raw, ttl_seconds=0, history_size=history_size)
+
+    def set(self, label: str, month: str, value: str) -> None:
+        """label 行の month（YYYY/MM）列を value にする。取得済みのスナップショットは変えない。"""
+        col = self.raw[1].index(f"{month[:4]}年{int(month[5:])}月")
+        raw = [list(row) for row in self.raw]
+        for row in raw:
+            if row and row[0] == label:
+                row.extend([""] * (col + 1 - len(row)))
+                row[col] = value
+                self.raw = raw
+                return
+        raise KeyError(label)
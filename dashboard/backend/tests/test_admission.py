@@ -0,0 +1,180 @@
+import math
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app import admission
+from app.admission import AdmissionController, AdmissionControlMiddleware, RouteLimit
+from app.config import get_trusted_proxy_hops
+
+
+class TestTokenBucket:
+    def test_burst_then_rate(self):
+        route = RouteLimit("/api/", max_concurrency=1, rate=2.0, burst=2)
+
+        assert route.take_token("a", 0.0) == 0
+        assert route.take_token("a", 0.0) == 0
+        assert route.take_token("a", 0.0) == pytest.approx(0.5)
+        # 0.25 秒で 0.5 トークン回復
+        assert route.take_token("a", 0.25) == pytest.approx(0.25)
+        assert route.take_token("a", 0.5) == 0
+        # 別クライアントは別のバケット
+        assert route.take_token("b", 0.5) == 0
+
+    def test_refill_is_capped_at_burst(self):
+        route = RouteLimit("/api/", max_concurrency=1, rate=1.0, burst=2)
+        route.take_token("a", 0.0)
+
+        waits = [route.take_token("a", 100.0) for _ in range(3)]
+        assert waits[:2] == [0, 0]
+        assert waits[2] > 0
+
+    def test_zero_rate(self):
+        route = RouteLimit("/api/", max_concurrency=1, rate=0, burst=1)
+
+        assert route.take_token("a", 0.0) == 0
+        assert route.take_token("a", 10.0) == math.inf
+
+    def test_oldest_clients_are_evicted(self, monkeypatch):
+        monkeypatch.setattr(admission, "MAX_TRACKED_CLIENTS", 2)
+        route = RouteLimit("/api/", max_concurrency=1, rate=0, burst=1)
+        for client in ("a", "b", "c"):
+            route.take_token(client, 0.0)
+
+        # "a" のバケットは捨てられて満タンから数え直す
+        assert route.take_token("a", 0.0) == 0
+        assert route.take_token("c", 0.0) == math.inf
+
+
+def _scope(*headers: tuple[str, str], client: str = "10.0.0.1") -> dict:
+    return {
+        "headers": [(name.encode(), value.encode()) for name, value in headers],
+        "client": (client, 50000),
+    }
+
+
+class TestClientKey:
+    def test_only_known_api_keys_get_their_own_bucket(self):
+        controller = AdmissionController(limits={}, api_keys=frozenset({"k1"}), proxy_hops=0)
+
+        assert controller.client_key(_scope(("x-api-key", "k1"))) == "key:k1"
+        assert controller.client_key(_scope(("x-api-key", "random"))) == "ip:10.0.0.1"
+
+    def test_forwarded_for_is_ignored_without_trusted_proxy(self):
+        controller = AdmissionController(limits={}, api_keys=frozenset(), proxy_hops=0)
+
+        assert controller.client_key(_scope(("x-forwarded-for", "1.1.1.1"))) == "ip:10.0.0.1"
+
+    @pytest.mark.parametrize(
+        "hops, headers, expected",
+        [
+            # クライアントが先頭に書いた値ではなく、プロキシが追記した右端を使う
+            (1, [("x-forwarded-for", "6.6.6.6, 1.1.1.1")], "ip:1.1.1.1"),
+            (2, [("x-forwarded-for", "6.6.6.6, 1.1.1.1, 2.2.2.2")], "ip:1.1.1.1"),
+            (1, [("x-forwarded-for", "6.6.6.6"), ("x-forwarded-for", "1.1.1.1")], "ip:1.1.1.1"),
+            # 段数より短い場合はプロキシを経由していない
+            (2, [("x-forwarded-for", "1.1.1.1")], "ip:10.0.0.1"),
+            (1, [], "ip:10.0.0.1"),
+        ],
+    )
+    def test_trusted_proxy_hops(self, hops, headers, expected):
+        controller = AdmissionController(limits={}, api_keys=frozenset(), proxy_hops=hops)
+
+        assert controller.client_key(_scope(*headers)) == expected
+
+    @pytest.mark.parametrize(
+        "env, hops",
+        [
+            ({}, 0),
+            ({"TRUST_FORWARDED_FOR": "true"}, 1),
+            ({"TRUST_FORWARDED_FOR": "true", "TRUSTED_PROXY_HOPS": "2"}, 2),
+            ({"TRUSTED_PROXY_HOPS": "0"}, 0),
+        ],
+    )
+    def test_proxy_hops_config(self, monkeypatch, env, hops):
+        monkeypatch.delenv("TRUST_FORWARDED_FOR", raising=False)
+        monkeypatch.delenv("TRUSTED_PROXY_HOPS", raising=False)
+        for name, value in env.items():
+            monkeypatch.setenv(name, value)
+
+        assert get_trusted_proxy_hops() == hops
+
+
+def _client(controller: AdmissionController, observed: list[int]) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/api/data")
+    async def data():
+        return {"ok": True}
+
+    @app.get("/api/stream")
+    async def stream():
+        async def chunks():
+            for i in range(3):
+                observed.append(controller.match("/api/stream").in_flight)
+                yield f"{i}\n"
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    @app.get("/api/fail")
+    async def fail():
+        raise RuntimeError("boom")
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    app.add_middleware(AdmissionControlMiddleware, controller=controller)
+    return TestClient(app, raise_server_exceptions=False)
+
+
+@pytest.fixture
+def controller():
+    return AdmissionController(
+        limits={"/api/": {"max_concurrency": 1, "rate": 0.5, "burst": 2}},
+        api_keys=frozenset(),
+        proxy_hops=0,
+    )
+
+
+def test_rate_limited_requests_get_429(controller):
+    client = _client(controller, [])
+
+    assert [client.get("/api/data").status_code for _ in range(2)] == [200, 200]
+    res = client.get("/api/data")
+    assert res.status_code == 429
+    assert res.headers["retry-after"] == "2"
+    assert "detail" in res.json()
+    # 除外パスは制限しない
+    assert client.get("/health").status_code == 200
+    assert controller.stats()["/api/"]["rejected_rate"] == 1
+
+
+def test_over_concurrency_gets_503(controller):
+    client = _client(controller, [])
+    route = controller.match("/api/data")
+    route.in_flight = route.max_concurrency
+
+    res = client.get("/api/data")
+    assert res.status_code == 503
+    assert res.headers["retry-after"] == "1"
+    assert route.rejected_concurrency == 1
+    assert route.in_flight == route.max_concurrency
+
+
+def test_in_flight_is_held_while_streaming_and_released_after(controller):
+    observed: list[int] = []
+    client = _client(controller, observed)
+
+    assert client.get("/api/stream").text == "0\n1\n2\n"
+    assert observed == [1, 1, 1]
+    assert controller.match("/api/stream").in_flight == 0
+
+
+def test_in_flight_is_released_on_error(controller):
+    client = _client(controller, [])
+
+    assert client.get("/api/fail").status_code == 500
+    assert controller.match("/api/fail").in_flight == 0
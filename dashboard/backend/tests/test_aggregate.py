@@ -0,0 +1,175 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.aggregate import AggregateIndex, resolve_period
+from app.routers import aggregate as aggregate_router
+from tests.sheets import FakeSheet, build_sheet
+
+MONTHS = ["2024/12", "2025/01", "2025/02", "2025/03", "2025/04", "2025/05"]
+
+
+@pytest.fixture(autouse=True)
+def fiscal_year_from_april(monkeypatch):
+    monkeypatch.setenv("FISCAL_YEAR_START_MONTH", "4")
+
+
+class TestResolvePeriod:
+    @pytest.mark.parametrize(
+        "period, month, expected",
+        [
+            ("qtd", "2025/04", ("2025/04", "2025/04")),
+            ("qtd", "2025/06", ("2025/04", "2025/06")),
+            ("qtd", "2025/07", ("2025/07", "2025/07")),
+            ("qtd", "2025/03", ("2025/01", "2025/03")),
+            ("fytd", "2025/03", ("2024/04", "2025/03")),
+            ("fytd", "2025/04", ("2025/04", "2025/04")),
+            ("fy", "2025/01", ("2024/04", "2025/03")),
+            ("fy", "2025/04", ("2025/04", "2026/03")),
+            ("t3m", "2025/02", ("2024/12", "2025/02")),
+            ("t1m", "2025/02", ("2025/02", "2025/02")),
+        ],
+    )
+    def test_periods(self, period, month, expected):
+        assert resolve_period(period, MONTHS, month) == expected
+
+    def test_calendar_fiscal_year(self, monkeypatch):
+        monkeypatch.setenv("FISCAL_YEAR_START_MONTH", "1")
+
+        assert resolve_period("fy", MONTHS, "2025/06") == ("2025/01", "2025/12")
+        assert resolve_period("qtd", MONTHS, "2025/03") == ("2025/01", "2025/03")
+
+    def test_anchor_defaults_to_latest_month(self):
+        assert resolve_period("qtd", MONTHS) == ("2025/04", "2025/05")
+
+    def test_custom(self):
+        assert resolve_period("custom", MONTHS, start="2025/01", end="2025/02") == (
+            "2025/01",
+            "2025/02",
+        )
+
+    @pytest.mark.parametrize(
+        "period, kwargs",
+        [
+            ("custom", {"start": "2025/01"}),
+            ("custom", {"start": "2025/03", "end": "2025/01"}),
+            ("custom", {"start": "2025/1", "end": "2025/02"}),
+            ("qtd", {"month": "2025/13"}),
+            ("t0m", {}),
+            ("ytd", {}),
+        ],
+    )
+    def test_invalid(self, period, kwargs):
+        with pytest.raises(ValueError):
+            resolve_period(period, MONTHS, **kwargs)
+
+
+def _aggregate(rows: dict[str, list[str]], months: list[str]):
+    index = AggregateIndex(build_sheet(rows, months))
+    response = index.aggregate("custom", months[0], months[-1])
+    return (
+        {card.label: card for card in response.kpi_cards},
+        {stage.label: stage for stage in response.funnel_stages},
+    )
+
+
+def test_rates_are_weighted_by_volume():
+    _, funnel = _aggregate(
+        {
+            "実績：アポ数": ["10", "30"],
+            "実績：通電数": ["100", "200"],
+        },
+        ["2025/04", "2025/05"],
+    )
+
+    assert funnel["アポ獲得率"].actual == pytest.approx(40 / 300)
+
+
+def test_rate_ignores_months_without_denominator():
+    # 5月は通電率が空で架電数を推定できない。通電数 60 を分子に含めると 110/100 = 110% になる
+    _, funnel = _aggregate(
+        {
+            "実績：通電数": ["50", "60"],
+            "実績：通電率": ["50.0%", ""],
+        },
+        ["2025/04", "2025/05"],
+    )
+
+    assert funnel["通電率"].actual == pytest.approx(0.5)
+
+
+def test_achievement_ignores_months_without_target():
+    kpis, _ = _aggregate(
+        {
+            "目標：アポ数": ["100", ""],
+            "実績：アポ数": ["80", "90"],
+        },
+        ["2025/04", "2025/05"],
+    )
+
+    card = kpis["アポ獲得"]
+    assert card.target == 100
+    assert card.actual == 170
+    assert card.achievement_rate == pytest.approx(0.8)
+
+
+def test_rate_without_any_complete_month_is_none():
+    kpis, funnel = _aggregate(
+        {
+            "目標：アポ数": ["100", ""],
+            "実績：アポ数": ["", "90"],
+        },
+        ["2025/04", "2025/05"],
+    )
+
+    assert kpis["アポ獲得"].achievement_rate is None
+    assert funnel["案件化率"].actual is None
+
+
+def test_range_outside_sheet_months():
+    index = AggregateIndex(build_sheet({"実績：アポ数": ["10", "20"]}, ["2025/04", "2025/05"]))
+
+    response = index.aggregate("fy", "2025/04", "2026/03")
+    assert response.months == ["2025/04", "2025/05"]
+    assert {card.label: card for card in response.kpi_cards}["アポ獲得"].actual == 30
+
+    response = index.aggregate("custom", "2024/01", "2024/03")
+    assert response.months == []
+    assert all(card.actual is None for card in response.kpi_cards)
+
+
+@pytest.fixture
+def store():
+    return FakeSheet().store()
+
+
+@pytest.fixture
+def client(store, monkeypatch):
+    monkeypatch.setattr(aggregate_router, "store", store)
+    app = FastAPI()
+    app.include_router(aggregate_router.router)
+    return TestClient(app)
+
+
+def test_aggregate_endpoint(client):
+    body = client.get(
+        "/api/aggregate", params={"period": "custom", "start": "2025/05", "end": "2025/06"}
+    ).json()
+
+    assert body["months"] == ["2025/05", "2025/06"]
+    assert {card["label"]: card for card in body["kpi_cards"]}["アポ獲得"]["actual"] == 82
+    assert client.get("/api/aggregate", params={"period": "custom"}).status_code == 400
+
+
+def test_memo_size_under_bogus_months(client, store):
+    client.get("/api/aggregate")
+    snapshot = store.current()
+    cached = len(snapshot._memo)
+
+    for year in range(1000, 1020):
+        params = {"period": "custom", "start": f"{year}/01", "end": "9999/12"}
+        body = client.get("/api/aggregate", params=params).json()
+        assert body["start_month"] == f"{year}/01"
+        assert body["months"] == ["2025/04", "2025/05", "2025/06"]
+
+    assert len(snapshot._memo) == cached
@@ -0,0 +1,185 @@
+import json
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.alerts import AlertEngine, WebhookSink
+from app.models import AlertEvent, AlertRule
+from app.parser import JST
+from tests.sheets import FakeSheet
+
+# 最新月（2025/06）: アポ獲得 30 / 60 = 50%、通電率 48%
+APO_RULE = {"id": "apo", "metric": "アポ獲得", "op": "<", "threshold": 0.6}
+TSUUDEN_RULE = {"id": "tsuuden", "metric": "通電率", "field": "actual", "op": "<", "threshold": 0.5}
+
+
+class Clock:
+    def __init__(self, day: int = 10):
+        self.now = datetime(2025, 6, day, 9, 0, tzinfo=JST)
+
+    def __call__(self) -> datetime:
+        return self.now
+
+    def advance(self, **kwargs) -> None:
+        self.now += timedelta(**kwargs)
+
+
+@pytest.fixture
+def sheet():
+    return FakeSheet()
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+def _engine(clock, *rules, **kwargs) -> AlertEngine:
+    return AlertEngine([AlertRule(**rule) for rule in rules], clock=clock, **kwargs)
+
+
+def _fired(events: list[AlertEvent]) -> list[str]:
+    return [event.rule_id for event in events]
+
+
+def test_first_snapshot_evaluates_every_rule(sheet, clock):
+    engine = _engine(clock, APO_RULE, TSUUDEN_RULE)
+    store = sheet.store()
+
+    events = engine.on_snapshot(None, store.current())
+
+    assert _fired(events) == ["apo", "tsuuden"]
+    assert events[0].value == pytest.approx(0.5)
+    assert events[0].month == "2025/06"
+
+
+def test_only_rules_whose_inputs_changed_are_evaluated(sheet, clock):
+    engine = _engine(
+        clock, {**APO_RULE, "debounce_seconds": 0}, {**TSUUDEN_RULE, "debounce_seconds": 0}
+    )
+    store = sheet.store()
+    first = store.current()
+    engine.on_snapshot(None, first)
+
+    sheet.set("実績：アポ数", "2025/06", "31")
+    second = store.current()
+    assert _fired(engine.on_snapshot(first, second)) == ["apo"]
+
+    # 最新月以外の変更ではどのルールも評価しない
+    sheet.set("実績：通電率", "2025/05", "10.0%")
+    assert engine.on_snapshot(second, store.current()) == []
+
+
+def test_debounce(sheet, clock):
+    engine = _engine(clock, {**APO_RULE, "debounce_seconds": 3600})
+    store = sheet.store()
+    prev = store.current()
+    assert _fired(engine.on_snapshot(None, prev)) == ["apo"]
+
+    # 発火中のまま値だけ変わる
+    for minutes, value, expected in ((30, "31", []), (31, "32", ["apo"])):
+        clock.advance(minutes=minutes)
+        sheet.set("実績：アポ数", "2025/06", value)
+        snapshot = store.current()
+        assert _fired(engine.on_snapshot(prev, snapshot)) == expected
+        prev = snapshot
+
+
+def test_recovered_rule_fires_again_without_waiting(sheet, clock):
+    engine = _engine(clock, {**APO_RULE, "debounce_seconds": 3600})
+    store = sheet.store()
+    prev = store.current()
+    engine.on_snapshot(None, prev)
+
+    for value, expected in (("50", []), ("30", ["apo"])):
+        sheet.set("実績：アポ数", "2025/06", value)
+        snapshot = store.current()
+        assert _fired(engine.on_snapshot(prev, snapshot)) == expected
+        prev = snapshot
+
+
+def test_after_day_fires_on_the_day_without_sheet_changes(sheet, clock):
+    engine = _engine(clock, {**APO_RULE, "after_day": 20})
+    snapshot = sheet.store().current()
+
+    assert engine.on_snapshot(None, snapshot) == []
+    assert engine.check_deferred(snapshot) == []
+
+    clock.advance(days=15)
+    assert _fired(engine.check_deferred(snapshot)) == ["apo"]
+    assert engine.check_deferred(snapshot) == []
+
+
+def test_rules_are_evaluated_after_starting_from_a_seeded_snapshot(sheet, clock):
+    # 保存済みのスナップショットで起動し、取得した内容が同じだとリスナーは呼ばれない
+    engine = _engine(clock, {**APO_RULE, "after_day": 20})
+    store = sheet.store()
+    store.subscribe(engine.on_snapshot)
+    seeded = store.seed(sheet.raw)
+    clock.advance(days=15)
+
+    # 取得で確かめるまでは保存済みのデータで評価しない
+    assert engine.check_deferred(seeded) == []
+    assert store.refresh() is seeded
+    assert _fired(engine.check_deferred(store.current())) == ["apo"]
+    assert engine.check_deferred(store.current()) == []
+
+
+def test_first_live_snapshot_after_seed_evaluates_every_rule(sheet, clock):
+    engine = _engine(clock, APO_RULE, TSUUDEN_RULE)
+    store = sheet.store()
+    store.subscribe(engine.on_snapshot)
+    store.seed(sheet.raw)
+
+    # どちらのルールの入力セルも変わっていないが、起動後最初の評価なので全件評価する
+    sheet.set("新規リード数", "2025/06", "151")
+    store.refresh()
+
+    assert _fired(engine.status().recent_events) == ["apo", "tsuuden"]
+
+
+def test_firing_state_survives_restart(sheet, clock, tmp_path):
+    state_path = tmp_path / "alert_state.json"
+    snapshot = sheet.store().current()
+    assert _fired(_engine(clock, APO_RULE, state_path=state_path).on_snapshot(None, snapshot))
+
+    # 再起動後の全件評価では発火中のアラートを再通知しない
+    restarted = _engine(clock, APO_RULE, state_path=state_path)
+    assert restarted.on_snapshot(None, snapshot) == []
+    assert restarted.status().rules[0].firing
+
+    clock.advance(hours=2)
+    assert _fired(_engine(clock, APO_RULE, state_path=state_path).on_snapshot(None, snapshot))
+
+
+def test_webhook_delivery(sheet, clock):
+    received: list[dict] = []
+    delivered = threading.Event()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            received.append(json.loads(self.rfile.read(int(self.headers["Content-Length"]))))
+            self.send_response(204)
+            self.end_headers()
+            delivered.set()
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        sink = WebhookSink(f"http://127.0.0.1:{server.server_port}/hook")
+        engine = _engine(clock, APO_RULE, sink=sink)
+        engine.on_snapshot(None, sheet.store().current())
+        assert delivered.wait(timeout=5)
+    finally:
+        server.shutdown()
+
+    [body] = received
+    [event] = body["events"]
+    assert event["rule_id"] == "apo"
+    assert event["metric"] == "アポ獲得"
+    assert event["value"] == pytest.approx(0.5)
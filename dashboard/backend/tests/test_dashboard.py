@@ -0,0 +1,105 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routers import dashboard as dashboard_router
+from tests.sheets import FakeSheet
+from tests.test_patch import apply_patch
+
+
+@pytest.fixture
+def sheet():
+    return FakeSheet()
+
+
+@pytest.fixture
+def store(sheet):
+    return sheet.store()
+
+
+@pytest.fixture
+def client(store, monkeypatch):
+    monkeypatch.setattr(dashboard_router, "store", store)
+    app = FastAPI()
+    app.include_router(dashboard_router.router)
+    return TestClient(app)
+
+
+def test_fields_selection(client):
+    body = client.get("/api/dashboard", params={"fields": "kpi_cards"}).json()
+
+    assert "kpi_cards" in body
+    assert "funnel_stages" not in body
+    assert "section_ankenjika" not in body
+    assert body["selected_month"] == "2025/06"
+
+
+def test_unknown_field_is_400(client):
+    assert client.get("/api/dashboard", params={"fields": "kpi_cards,nope"}).status_code == 400
+
+
+def test_month(client):
+    body = client.get("/api/dashboard", params={"month": "2025/05"}).json()
+
+    assert body["selected_month"] == "2025/05"
+    cards = {card["label"]: card for card in body["kpi_cards"]}
+    assert cards["アポ獲得"]["actual"] == 52
+
+
+def test_unknown_months_share_the_latest_month_cache(client, store):
+    latest = client.get("/api/dashboard").content
+    snapshot = store.current()
+    cached = len(snapshot._memo)
+
+    for i in range(20):
+        res = client.get("/api/dashboard", params={"month": f"x{i}"})
+        assert res.content == latest
+
+    assert len(snapshot._memo) == cached
+
+
+def test_prewarm_encodes_every_month(store):
+    snapshot = store.current()
+
+    assert dashboard_router.prewarm(snapshot) == 3
+    cached = len(snapshot._memo)
+    dashboard_router._encoded_dashboard(
+        snapshot,
+        dashboard_router._resolve_month(snapshot, ""),
+        frozenset(dashboard_router.DASHBOARD_FIELDS),
+    )
+    assert len(snapshot._memo) == cached
+
+
+def test_since_current_version_is_empty_patch(client, store):
+    version = client.get("/api/dashboard").json()["version"]
+
+    body = client.get("/api/dashboard", params={"since": version}).json()
+
+    assert body == {"version": version, "base_version": version, "patch": []}
+
+
+def test_since_older_version_patches_to_latest(client, sheet):
+    old = client.get("/api/dashboard").json()
+    sheet.set("実績：アポ数", "2025/06", "31")
+
+    body = client.get("/api/dashboard", params={"since": old["version"]}).json()
+    new = client.get("/api/dashboard").json()
+
+    assert body["base_version"] == old["version"]
+    assert body["version"] == new["version"] != old["version"]
+    assert apply_patch(old, body["patch"]) == new
+
+
+def test_versions_do_not_repeat_after_restart(client, sheet, monkeypatch):
+    # 再起動前のプロセスで取得したバージョン
+    old = client.get("/api/dashboard").json()
+
+    # 再起動後は別の内容に同じ連番が付いても、前のバージョンとは一致しない
+    sheet.set("実績：アポ数", "2025/06", "31")
+    monkeypatch.setattr(dashboard_router, "store", sheet.store())
+    body = client.get("/api/dashboard", params={"since": old["version"]}).json()
+
+    assert "patch" not in body
+    assert body["version"] != old["version"]
+    assert {card["label"]: card for card in body["kpi_cards"]}["アポ獲得"]["actual"] == 31
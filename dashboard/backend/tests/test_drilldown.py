@@ -0,0 +1,117 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.drilldown import DrilldownIndex, DrilldownIndexer
+from app.ingest import ActivityAggregate, ActivityLogSource
+from app.routers import drilldown as drilldown_router
+from app.snapshot import SnapshotStore
+
+# (月, チーム, 担当者) -> [架電, 通電, アポ, アポ実施, 案件化]
+COUNTS = {
+    ("2025/04", "A", "r1"): [10, 5, 1, 1, 0],
+    ("2025/04", "A", "r2"): [20, 12, 4, 2, 1],
+    ("2025/04", "B", "r3"): [30, 3, 0, 0, 0],
+    ("2025/05", "A", "r1"): [10, 8, 2, 0, 0],
+}
+
+
+def _aggregate(counts: dict) -> ActivityAggregate:
+    agg = ActivityAggregate()
+    agg.counts = {key: list(counters) for key, counters in counts.items()}
+    return agg
+
+
+@pytest.fixture
+def source(tmp_path):
+    source = ActivityLogSource(tmp_path / "state.json")
+    _aggregate(COUNTS).save(source.state_path)
+    return source
+
+
+@pytest.fixture
+def store(source):
+    return SnapshotStore(fetcher=source.fetch_raw, ttl_seconds=0)
+
+
+@pytest.fixture
+def client(source, store, monkeypatch):
+    monkeypatch.setenv("DASHBOARD_SOURCE", "activity_logs")
+    monkeypatch.setattr(drilldown_router, "activity_source", source)
+    monkeypatch.setattr(drilldown_router, "store", store)
+    monkeypatch.setattr(drilldown_router, "indexer", DrilldownIndexer())
+    app = FastAPI()
+    app.include_router(drilldown_router.router)
+    return TestClient(app)
+
+
+def test_teams(client):
+    body = client.get("/api/drilldown", params={"month": "2025/04"}).json()
+
+    assert body["available_months"] == ["2025/04", "2025/05"]
+    assert [(entry["team"], entry["rep"]) for entry in body["entries"]] == [
+        ("A", None),
+        ("B", None),
+    ]
+
+
+def test_reps_within_team(client):
+    body = client.get("/api/drilldown", params={"month": "2025/04", "team": "A"}).json()
+
+    assert [entry["rep"] for entry in body["entries"]] == [None, "r1", "r2"]
+    funnel = {stage["label"]: stage for stage in body["entries"][0]["funnel_stages"]}
+    assert funnel["通電率"]["actual"] == pytest.approx(17 / 30)
+
+
+def test_unknown_teams_are_not_cached(client, store):
+    client.get("/api/drilldown", params={"team": "A"})
+    snapshot = store.current()
+    cached = len(snapshot._memo)
+
+    for i in range(20):
+        body = client.get("/api/drilldown", params={"team": f"x{i}"}).json()
+        assert body["team"] == f"x{i}"
+        assert body["entries"] == []
+
+    assert len(snapshot._memo) == cached
+    # 別の月のチームも、その月に存在しなければキャッシュしない
+    client.get("/api/drilldown", params={"month": "2025/05", "team": "B"})
+    assert len(snapshot._memo) == cached
+
+
+def test_not_available_without_activity_logs(client, monkeypatch):
+    monkeypatch.setenv("DASHBOARD_SOURCE", "sheets")
+
+    assert client.get("/api/drilldown").status_code == 404
+
+
+def test_leaderboard(client):
+    body = client.get(
+        "/api/leaderboard", params={"metric": "通電率", "month": "2025/04", "n": 2}
+    ).json()
+
+    assert [(entry["rank"], entry["rep"]) for entry in body["entries"]] == [(1, "r2"), (2, "r1")]
+    assert client.get("/api/leaderboard", params={"metric": "nope"}).status_code == 400
+
+
+def test_incremental_leaderboards_match_full_build():
+    prev = DrilldownIndex(_aggregate(COUNTS))
+    counts = dict(COUNTS)
+    counts[("2025/04", "B", "r3")] = [30, 30, 0, 0, 0]
+    del counts[("2025/04", "A", "r2")]
+
+    incremental = DrilldownIndex(_aggregate(counts), prev=prev)
+    full = DrilldownIndex(_aggregate(counts))
+
+    assert incremental.leaderboards.keys() == full.leaderboards.keys()
+    for key, board in full.leaderboards.items():
+        assert incremental.leaderboards[key].top(10) == board.top(10)
+    # 変化のない月のリーダーボードは共有し、前回のものは書き換えない
+    assert incremental.leaderboards[("2025/05", "通電率")] is prev.leaderboards[
+        ("2025/05", "通電率")
+    ]
+    assert [rep for _, (_, rep) in prev.leaderboards[("2025/04", "通電率")].top(10)] == [
+        "r2",
+        "r1",
+        "r3",
+    ]
@@ -0,0 +1,112 @@
+import csv
+import io
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.export import negotiate_format
+from app.routers import export as export_router
+from tests.sheets import SHEET_ROWS, FakeSheet
+
+
+@pytest.fixture
+def sheet():
+    return FakeSheet()
+
+
+@pytest.fixture
+def store(sheet):
+    return sheet.store(history_size=2)
+
+
+@pytest.fixture
+def client(store, monkeypatch):
+    monkeypatch.setattr(export_router, "store", store)
+    app = FastAPI()
+    app.include_router(export_router.router)
+    return TestClient(app)
+
+
+class TestNegotiateFormat:
+    def test_format_param_wins_over_accept(self):
+        assert negotiate_format("parquet", "text/csv") == "parquet"
+
+    def test_unknown_format(self):
+        with pytest.raises(ValueError):
+            negotiate_format("xlsx", "")
+
+    def test_accept_header(self):
+        accept = "text/html, application/vnd.apache.arrow.stream;q=0.9, */*;q=0.1"
+        assert negotiate_format("", accept) == "arrow"
+        assert negotiate_format("", "application/x-parquet") == "parquet"
+
+    def test_defaults_to_csv(self):
+        assert negotiate_format("", "") == "csv"
+        assert negotiate_format("", "application/json") == "csv"
+
+
+def test_csv(client, store):
+    res = client.get("/api/export", params={"start": "2025/05", "end": "2025/05"})
+
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(res.text)))
+    assert len(rows) == len(SHEET_ROWS)
+    assert {row["month"] for row in rows} == {"2025/05"}
+    assert {row["snapshot_version"] for row in rows} == {str(store.current().version)}
+    by_metric = {row["metric"]: row["value"] for row in rows}
+    assert float(by_metric["実績：通電数"]) == 325
+    assert float(by_metric["実績：通電率"]) == pytest.approx(0.52)
+
+
+def test_arrow(client):
+    pa = pytest.importorskip("pyarrow")
+
+    res = client.get("/api/export", headers={"Accept": "application/vnd.apache.arrow.stream"})
+
+    assert res.status_code == 200
+    assert res.headers["content-disposition"].endswith('.arrows"')
+    table = pa.ipc.open_stream(res.content).read_all()
+    assert table.column_names == ["snapshot_version", "metric", "month", "value"]
+    assert table.num_rows == len(SHEET_ROWS) * 3
+
+
+def test_parquet_matches_csv(client):
+    pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    parquet = pq.read_table(io.BytesIO(client.get("/api/export?format=parquet").content))
+    rows = list(csv.DictReader(io.StringIO(client.get("/api/export?format=csv").text)))
+
+    assert parquet.num_rows == len(rows)
+    assert parquet.column("metric").to_pylist() == [row["metric"] for row in rows]
+    assert parquet.column("value").to_pylist() == [float(row["value"]) for row in rows]
+
+
+def test_unknown_format_is_400(client):
+    assert client.get("/api/export?format=xlsx").status_code == 400
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"start": "2025-01"},
+        {"end": "2025/6"},
+        {"start": "2025/13"},
+        {"start": "2025/06", "end": "2025/05"},
+    ],
+)
+def test_invalid_month_range_is_400(client, params):
+    assert client.get("/api/export", params=params).status_code == 400
+
+
+def test_evicted_version_is_404(client, sheet, store):
+    first = store.current().version
+    for value in ("1", "2"):
+        sheet.set("実績：通電数", "2025/06", value)
+        store.current()
+
+    assert client.get("/api/export", params={"version": first}).status_code == 404
+    res = client.get("/api/export", params={"version": store.current().version})
+    assert res.status_code == 200
@@ -0,0 +1,140 @@
+import json
+
+import pytest
+
+from app.ingest import ActivityAggregate, month_of
+from app.parser import parse_dashboard
+
+HEADER = "called_at,team,rep,connected,appointment,appointment_held,deal\n"
+
+
+def _write(path, *lines: str) -> None:
+    with path.open("a", encoding="utf-8") as f:
+        f.write("".join(lines))
+
+
+@pytest.mark.parametrize(
+    "called_at, month",
+    [
+        ("2025-04-03", "2025/04"),
+        ("2025-04-30 23:30:00", "2025/04"),
+        # UTC の 4/30 16:00 は JST の 5/1 01:00
+        ("2025-04-30T16:00:00Z", "2025/05"),
+        ("2025-04-30T14:59:59+00:00", "2025/04"),
+        ("2025-05-01T00:30:00+09:00", "2025/05"),
+        (" 2025-04-03 ", "2025/04"),
+        ("", None),
+        ("2025/4/3", None),
+        ("2025-13-01", None),
+        ("yesterday", None),
+    ],
+)
+def test_month_of(called_at, month):
+    assert month_of(called_at) == month
+
+
+def test_ingest_counts_per_month_team_rep(tmp_path):
+    log = tmp_path / "calls.csv"
+    _write(
+        log,
+        HEADER,
+        "2025-04-01T10:00:00+09:00,A,r1,1,1,0,0\n",
+        "2025-04-02T10:00:00+09:00,A,r1,true,0,0,0\n",
+        "2025-04-02T10:00:00+09:00,A,r2,0,0,0,0\n",
+        "2025-04-30T16:00:00Z,B,r3,1,1,1,1\n",
+    )
+    agg = ActivityAggregate()
+
+    assert agg.ingest_file(log) == (4, 0)
+    assert agg.counts == {
+        ("2025/04", "A", "r1"): [2, 2, 1, 0, 0],
+        ("2025/04", "A", "r2"): [1, 0, 0, 0, 0],
+        ("2025/05", "B", "r3"): [1, 1, 1, 1, 1],
+    }
+
+
+def test_bad_rows_are_skipped(tmp_path):
+    log = tmp_path / "calls.csv"
+    _write(
+        log,
+        HEADER,
+        ",A,r1,1,0,0,0\n",
+        "2025/4/3,A,r1,1,0,0,0\n",
+        "2025-04-03\n",
+        "2025-04-03,A,r1,1,0,0,0\n",
+    )
+    agg = ActivityAggregate()
+
+    assert agg.ingest_file(log) == (1, 3)
+    assert list(agg.counts) == [("2025/04", "A", "r1")]
+    assert agg.files[str(log.resolve())]["skipped"] == 3
+    assert parse_dashboard(agg.to_sheet_rows()).available_months == ["2025/04"]
+
+
+def test_appended_lines_only_are_ingested(tmp_path):
+    log = tmp_path / "calls.csv"
+    state = tmp_path / "state.json"
+    _write(log, HEADER, "2025-04-01,A,r1,1,0,0,0\n", "2025-04-01,A,r1,0,0,0,0\n")
+    agg = ActivityAggregate()
+    assert agg.ingest_file(log) == (2, 0)
+    agg.save(state)
+
+    # 追記途中の最終行（改行なし）は次回に回す
+    _write(log, "2025-05-01,A,r1,1,0,0,0\n", "2025-05-02,A,r")
+    agg = ActivityAggregate.load(state)
+    assert agg.ingest_file(log) == (1, 0)
+
+    _write(log, "1,1,0,0,0\n")
+    assert agg.ingest_file(log) == (1, 0)
+    assert agg.ingest_file(log) == (0, 0)
+    assert agg.counts == {
+        ("2025/04", "A", "r1"): [2, 1, 0, 0, 0],
+        ("2025/05", "A", "r1"): [2, 2, 0, 0, 0],
+    }
+
+
+def test_shrunk_file_is_rejected(tmp_path):
+    log = tmp_path / "calls.csv"
+    _write(log, HEADER, "2025-04-01,A,r1,1,0,0,0\n")
+    agg = ActivityAggregate()
+    agg.ingest_file(log)
+
+    log.write_text(HEADER, encoding="utf-8")
+    with pytest.raises(ValueError):
+        agg.ingest_file(log)
+
+
+def test_missing_columns(tmp_path):
+    log = tmp_path / "calls.csv"
+    _write(log, "called_at,team\n", "2025-04-01,A\n")
+
+    with pytest.raises(ValueError, match="rep"):
+        ActivityAggregate().ingest_file(log)
+
+
+def test_load_drops_invalid_month_keys(tmp_path):
+    state = tmp_path / "state.json"
+    state.write_text(
+        json.dumps({
+            "files": {},
+            "counts": [["/", "A", "r2", 1, 0, 0, 0, 0], ["2025/04", "A", "r1", 3, 1, 0, 0, 0]],
+        }),
+        encoding="utf-8",
+    )
+
+    agg = ActivityAggregate.load(state)
+
+    assert list(agg.counts) == [("2025/04", "A", "r1")]
+    assert agg.to_sheet_rows()[0] == ["指標", "2025年4月"]
+
+
+def test_sheet_rows_rates(tmp_path):
+    log = tmp_path / "calls.csv"
+    _write(log, HEADER, *(f"2025-04-01,A,r{i},{int(i < 3)},{int(i < 1)},0,0\n" for i in range(6)))
+    agg = ActivityAggregate()
+    agg.ingest_file(log)
+
+    response = parse_dashboard(agg.to_sheet_rows())
+    funnel = {stage.label: stage for stage in response.funnel_stages}
+    assert funnel["通電率"].actual == pytest.approx(3 / 6)
+    assert funnel["アポ獲得率"].actual == pytest.approx(1 / 3)
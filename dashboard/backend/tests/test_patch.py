@@ -0,0 +1,99 @@
+import copy
+
+import pytest
+
+from app.patch import make_patch
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def apply_patch(doc, ops):
+    """テスト用の JSON Patch 適用（add / remove / replace のみ）。"""
+    doc = copy.deepcopy(doc)
+    for op in ops:
+        tokens = [_unescape(t) for t in op["path"].split("/")[1:]]
+        if not tokens:
+            doc = op["value"]
+            continue
+        parent = doc
+        for token in tokens[:-1]:
+            parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+        last = tokens[-1]
+        if isinstance(parent, list):
+            index = int(last)
+            if op["op"] == "add":
+                parent.insert(index, op["value"])
+            elif op["op"] == "remove":
+                del parent[index]
+            else:
+                parent[index] = op["value"]
+        elif op["op"] == "remove":
+            del parent[last]
+        else:
+            parent[last] = op["value"]
+    return doc
+
+
+OLD = {
+    "selected_month": "2025/06",
+    "available_months": ["2025/04", "2025/05", "2025/06"],
+    "section_apo_kakutoku": [
+        {"metric": "実績：アポ獲得数", "columns": {"2025/05": 52.0, "2025/06": 30.0}},
+        {"metric": "実績：通電数", "columns": {"2025/05": 325.0, "2025/06": None}},
+    ],
+}
+
+
+@pytest.mark.parametrize(
+    "new",
+    [
+        OLD,
+        {**OLD, "selected_month": "2025/05"},
+        # 月キーの '/' と '~' はエスケープされる
+        {
+            **OLD,
+            "section_apo_kakutoku": [
+                {"metric": "実績：アポ獲得数", "columns": {"2025/05": 52.0, "2025/06": 31.0}},
+                {"metric": "実績：通電数", "columns": {"2025/05": 325.0, "2025/06": 250.0}},
+            ],
+        },
+        {**OLD, "a~b/c": 1},
+        # list の伸長・短縮
+        {**OLD, "available_months": ["2025/04", "2025/05", "2025/06", "2025/07", "2025/08"]},
+        {**OLD, "available_months": ["2025/06"]},
+        {**OLD, "section_apo_kakutoku": []},
+        # 型の変化とキーの削除
+        {**OLD, "selected_month": None},
+        {key: value for key, value in OLD.items() if key != "selected_month"},
+    ],
+)
+def test_round_trip(new):
+    patch = make_patch(OLD, new)
+
+    assert apply_patch(OLD, patch) == new
+    if new == OLD:
+        assert patch == []
+
+
+def test_month_keys_are_escaped():
+    old = {"columns": {"2025/06": 1.0}}
+    new = {"columns": {"2025/06": 2.0, "a~b": 3.0}}
+
+    assert make_patch(old, new) == [
+        {"op": "replace", "path": "/columns/2025~106", "value": 2.0},
+        {"op": "add", "path": "/columns/a~0b", "value": 3.0},
+    ]
+
+
+def test_list_shrink_removes_from_the_end():
+    assert make_patch([1, 2, 3, 4], [1, 9]) == [
+        {"op": "replace", "path": "/1", "value": 9},
+        {"op": "remove", "path": "/3"},
+        {"op": "remove", "path": "/2"},
+    ]
+
+
+def test_int_and_float_are_distinct():
+    assert make_patch({"v": 1}, {"v": 1.0}) == [{"op": "replace", "path": "/v", "value": 1.0}]
@@ -0,0 +1,147 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main, sheets_client
+from app import warmup as warmup_module
+from app.snapshot import SnapshotStore, load_snapshot, save_snapshot
+from app.warmup import Warmup
+from tests.sheets import FakeSheet
+
+
+class GatedSheet(FakeSheet):
+    """gate が開くまで取得を待たせる（fail=True なら開いた後に失敗する）シート。"""
+
+    def __init__(self):
+        super().__init__()
+        self.gate = threading.Event()
+        self.fail = False
+
+    def fetch(self) -> list[list[str]]:
+        self.gate.wait(5)
+        if self.fail:
+            raise RuntimeError("sheets unavailable")
+        return self.raw
+
+    def store(self, history_size: int = 16) -> SnapshotStore:
+        return SnapshotStore(fetcher=self.fetch, ttl_seconds=0, history_size=history_size)
+
+
+@pytest.fixture
+def sheet():
+    sheet = GatedSheet()
+    yield sheet
+    sheet.gate.set()
+
+
+@pytest.fixture
+def store(sheet, monkeypatch):
+    store = sheet.store()
+    monkeypatch.setattr(warmup_module, "store", store)
+    monkeypatch.setattr(sheets_client, "warm", lambda: None)
+    return store
+
+
+@pytest.fixture
+def cache_path(tmp_path, monkeypatch):
+    path = tmp_path / "snapshot_cache.json"
+    monkeypatch.setenv("SNAPSHOT_CACHE_PATH", str(path))
+    monkeypatch.setenv("WARMUP_TIMEOUT_SECONDS", "0.05")
+    return path
+
+
+def _persist(path) -> None:
+    save_snapshot(FakeSheet().store().current(), path)
+
+
+async def _until(predicate, timeout: float = 5.0) -> None:
+    async with asyncio.timeout(timeout):
+        while not predicate():
+            await asyncio.sleep(0.01)
+
+
+def test_ready_is_503_until_warmup_finishes(sheet, store, cache_path, monkeypatch):
+    warmup = Warmup()
+    monkeypatch.setattr(main.app.state, "warmup", warmup, raising=False)
+    client = TestClient(main.app)
+
+    res = client.get("/ready")
+    assert res.status_code == 503
+    assert res.json()["status"] == "warming"
+
+    sheet.gate.set()
+    asyncio.run(warmup.run())
+
+    res = client.get("/ready")
+    assert res.status_code == 200
+    assert res.json()["status"] == "ready"
+    assert res.json()["source"] == "live"
+    assert res.json()["version"] == store._current.version
+    # 全月分のレスポンスをエンコード済み
+    encoded = {key[1] for key in store._current._memo if key[0] == "dashboard_json"}
+    assert encoded == {"2025/04", "2025/05", "2025/06"}
+
+
+def test_timeout_falls_back_to_persisted_then_switches_to_live(sheet, store, cache_path):
+    _persist(cache_path)
+    sheet.set("実績：アポ数", "2025/06", "31")
+    warmup = Warmup()
+    assert warmup.timeout == 0.05
+
+    async def scenario():
+        await warmup.run()
+        assert warmup.state()["status"] == "ready"
+        assert warmup.state()["source"] == "persisted"
+        assert "timed out" in warmup.error
+        persisted = warmup.version
+        assert not store._current.live
+
+        sheet.gate.set()
+        await _until(lambda: warmup.source == "live")
+        assert warmup.error is None
+        assert warmup.version != persisted
+        assert warmup.version == store._current.version
+
+    asyncio.run(scenario())
+
+
+def test_timeout_without_persisted_snapshot_is_degraded(sheet, store, cache_path):
+    warmup = Warmup()
+
+    async def scenario():
+        await warmup.run()
+        assert warmup.state()["status"] == "degraded"
+        assert warmup.state()["source"] is None
+        assert warmup.ready
+        sheet.gate.set()
+        await _until(lambda: warmup.source == "live")
+
+    asyncio.run(scenario())
+
+
+def test_fetch_failure_falls_back_to_persisted(sheet, store, cache_path):
+    _persist(cache_path)
+    sheet.fail = True
+    sheet.gate.set()
+    warmup = Warmup()
+
+    asyncio.run(warmup.run())
+
+    assert warmup.state()["source"] == "persisted"
+    assert warmup.error == "sheets unavailable"
+
+
+def test_snapshot_cache_round_trip(tmp_path):
+    path = tmp_path / "snapshot_cache.json"
+    snapshot = FakeSheet().store().current()
+
+    assert load_snapshot(path) is None
+    save_snapshot(snapshot, path)
+
+    assert load_snapshot(path) == snapshot.raw
+    assert [p.name for p in tmp_path.iterdir()] == ["snapshot_cache.json"]
+
+    path.write_text("{", encoding="utf-8")
+    assert load_snapshot(path) is None
@@ -1,10 +1,22 @@
-import type { DashboardResponse } from './types'
+import type { DashboardPatchResponse, DashboardResponse } from './types'
 
 const API_BASE = import.meta.env.VITE_API_BASE_URL ?? ''
 
-export async function fetchDashboard(month: string = ''): Promise<DashboardResponse> {
-  const params = month ? `?month=${encodeURIComponent(month)}` : ''
-  const res = await fetch(`${API_BASE}/api/dashboard${params}`)
+export async function fetchDashboard(
+  month: string = '',
+  since?: string,
+): Promise<DashboardResponse | DashboardPatchResponse> {
+  const params = new URLSearchParams()
+  if (month) params.set('month', month)
+  if (since !== undefined) params.set('since', since)
+  const query = params.toString()
+  const res = await fetch(`${API_BASE}/api/dashboard${query ? `?${query}` : ''}`)
   if (!res.ok) throw new Error(`API error: ${res.status}`)
   return res.json()
 }
+
+export function isPatchResponse(
+  res: DashboardResponse | DashboardPatchResponse,
+): res is DashboardPatchResponse {
+  return 'patch' in res
+}
@@ -1,16 +1,34 @@
-import { useState, useEffect, useCallback } from 'react'
-import { fetchDashboard } from '../api'
+import { useState, useEffect, useCallback, useRef } from 'react'
+import { fetchDashboard, isPatchResponse } from '../api'
 import type { DashboardResponse } from '../types'
+import { applyPatch } from '../utils/jsonPatch'
 
 export function useDashboard(selectedMonth: string) {
   const [data, setData] = useState<DashboardResponse | null>(null)
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState<string | null>(null)
+  // 差分取得のベース（同じ月で最後に受け取ったレスポンス）
+  const baseRef = useRef<{ month: string; data: DashboardResponse } | null>(null)
 
   const load = useCallback(async () => {
     try {
-      const result = await fetchDashboard(selectedMonth)
-      setData(result)
+      const base = baseRef.current?.month === selectedMonth ? baseRef.current.data : null
+      const result = await fetchDashboard(selectedMonth, base?.version)
+      let next: DashboardResponse
+      if (!isPatchResponse(result)) {
+        next = result
+      } else if (base && result.base_version === base.version) {
+        if (result.patch.length === 0) {
+          setError(null)
+          return
+        }
+        next = applyPatch(structuredClone(base), result.patch)
+      } else {
+        // ベースが食い違う場合は全体を取り直す
+        next = (await fetchDashboard(selectedMonth)) as DashboardResponse
+      }
+      baseRef.current = { month: selectedMonth, data: next }
+      setData(next)
       setError(null)
     } catch (e) {
       setError(e instanceof Error ? e.message : 'Unknown error')
@@ -27,4 +27,17 @@ export interface DashboardResponse {
   section_apo_kakutoku: MonthlyRow[]
   section_lead_kakutoku: MonthlyRow[]
   last_updated: string
+  version?: string
+}
+
+export interface JsonPatchOperation {
+  op: 'add' | 'remove' | 'replace'
+  path: string
+  value?: unknown
+}
+
+export interface DashboardPatchResponse {
+  version: string
+  base_version: string
+  patch: JsonPatchOperation[]
 }
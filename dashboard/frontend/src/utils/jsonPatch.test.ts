@@ -0,0 +1,76 @@
+import assert from 'node:assert/strict'
+import { test } from 'node:test'
+import type { JsonPatchOperation } from '../types'
+import { applyPatch } from './jsonPatch.ts'
+
+// バックエンド（app/patch.py の make_patch）が返す形の差分
+const base = () => ({
+  available_months: ['2025/04', '2025/05', '2025/06'],
+  selected_month: '2025/06',
+  section_apo_kakutoku: [
+    { metric: '実績：アポ獲得数', columns: { '2025/05': 52, '2025/06': 30 } as Record<string, number | null> },
+    { metric: '実績：通電数', columns: { '2025/05': 325, '2025/06': null } as Record<string, number | null> },
+  ],
+})
+
+test('replaces month keys escaped with ~1', () => {
+  const doc = applyPatch(base(), [
+    { op: 'replace', path: '/section_apo_kakutoku/0/columns/2025~106', value: 31 },
+    { op: 'replace', path: '/section_apo_kakutoku/1/columns/2025~106', value: 250 },
+  ])
+
+  assert.equal(doc.section_apo_kakutoku[0].columns['2025/06'], 31)
+  assert.equal(doc.section_apo_kakutoku[1].columns['2025/06'], 250)
+  assert.equal('2025~106' in doc.section_apo_kakutoku[0].columns, false)
+})
+
+test('unescapes ~01 to ~1, not /', () => {
+  const doc = applyPatch<Record<string, unknown>>({}, [{ op: 'add', path: '/a~01b', value: 1 }])
+
+  assert.deepEqual(doc, { 'a~1b': 1 })
+})
+
+test('grows and shrinks lists', () => {
+  const grown = applyPatch(base(), [
+    { op: 'add', path: '/available_months/3', value: '2025/07' },
+    { op: 'add', path: '/available_months/4', value: '2025/08' },
+  ])
+  assert.deepEqual(grown.available_months, ['2025/04', '2025/05', '2025/06', '2025/07', '2025/08'])
+
+  // 末尾から削除される
+  const shrunk = applyPatch(base(), [
+    { op: 'replace', path: '/available_months/0', value: '2025/06' },
+    { op: 'remove', path: '/available_months/2' },
+    { op: 'remove', path: '/available_months/1' },
+  ])
+  assert.deepEqual(shrunk.available_months, ['2025/06'])
+})
+
+test('adds and removes object keys', () => {
+  const ops: JsonPatchOperation[] = [
+    { op: 'remove', path: '/section_apo_kakutoku/1/columns/2025~105' },
+    { op: 'add', path: '/section_apo_kakutoku/1/columns/2025~107', value: 10 },
+  ]
+  const doc = applyPatch(base(), ops)
+
+  assert.deepEqual(doc.section_apo_kakutoku[1].columns, { '2025/06': null, '2025/07': 10 })
+})
+
+test('round trip: applying to a clone leaves the base untouched', () => {
+  const original = base()
+  const next = applyPatch(structuredClone(original), [
+    { op: 'replace', path: '/selected_month', value: '2025/05' },
+  ])
+
+  assert.equal(next.selected_month, '2025/05')
+  assert.deepEqual(original, base())
+})
+
+test('empty patch returns the same document', () => {
+  const doc = base()
+  assert.equal(applyPatch(doc, []), doc)
+})
+
+test('root replace', () => {
+  assert.deepEqual(applyPatch(base(), [{ op: 'replace', path: '', value: { a: 1 } }]), { a: 1 })
+})
@@ -0,0 +1,35 @@
+import type { JsonPatchOperation } from '../types'
+
+type Container = Record<string, unknown> | unknown[]
+
+// RFC 6901: '~1' → '/', '~0' → '~'（月キー 'YYYY/MM' は '~1' でエスケープされている）
+function unescapeToken(token: string): string {
+  return token.replace(/~1/g, '/').replace(/~0/g, '~')
+}
+
+/** JSON Patch (add / remove / replace) を doc に直接適用する。 */
+export function applyPatch<T>(doc: T, ops: JsonPatchOperation[]): T {
+  for (const op of ops) {
+    const tokens = op.path.split('/').slice(1).map(unescapeToken)
+    if (tokens.length === 0) {
+      doc = op.value as T
+      continue
+    }
+    let parent = doc as Container
+    for (const token of tokens.slice(0, -1)) {
+      parent = (Array.isArray(parent) ? parent[Number(token)] : parent[token]) as Container
+    }
+    const last = tokens[tokens.length - 1]
+    if (Array.isArray(parent)) {
+      const index = last === '-' ? parent.length : Number(last)
+      if (op.op === 'add') parent.splice(index, 0, op.value)
+      else if (op.op === 'remove') parent.splice(index, 1)
+      else parent[index] = op.value
+    } else if (op.op === 'remove') {
+      delete parent[last]
+    } else {
+      parent[last] = op.value
+    }
+  }
+  return doc
+}
@@ -8,18 +8,257 @@
 
 """OpenAI Agents SDK-based agent (bundled)."""
 
+import asyncio
+import copy
+import os
+import re
+import time
 import httpx
+import argparse
 import json
 import sys
 
-from typing import Protocol
-from agents import function_tool
-from agents import Agent, Runner
+from typing import Any, Optional, Protocol, AsyncIterator, Awaitable, Callable
+from agents import function_tool, Agent, Runner
+from collections import OrderedDict
 
 # ========== Functions ==========
+"""Dashboard query function backed by a cached, pre-summarized snapshot."""
+
+
+# parse_dashboard の月別明細セクション（全月分の値とベンチマーク行を含む）
+DASHBOARD_SECTIONS = ("section_ankenjika", "section_apo_kakutoku", "section_lead_kakutoku")
+
+# "目標：案件化率（40%）" のようなベンチマーク表記を取り除いて実績行と対応付ける
+_BENCHMARK_SUFFIX = re.compile(r"（\d+(?:\.\d+)?%）$")
+
+
+def _metric_name(label: str) -> tuple[str, str]:
+    """行ラベルを (種別, 指標名) に分解する. 種別は "actual" / "target"."""
+    if label.startswith("目標："):
+        return "target", _BENCHMARK_SUFFIX.sub("", label.removeprefix("目標："))
+    return "actual", label.removeprefix("実績：")
+
+
+def _round(value: Optional[float], digits: int) -> Optional[float]:
+    return None if value is None else round(value, digits)
+
+
+def summarize_dashboard(response: dict) -> dict[str, dict]:
+    """DashboardResponse（JSON）から月ごとのコンパクトな要約を事前計算する.
+
+    Args:
+        response: /api/dashboard のレスポンス（section_* を含む）
+
+    Returns:
+        {YYYY/MM: summary} 。summary は counts（件数: 実績・目標・達成率・前月差）と
+        rates（率: 実績・ベンチマーク・差・前月差）を持つ
+    """
+    months = response["available_months"]
+    series: dict[str, dict[str, dict[str, Optional[float]]]] = {}
+    for section in DASHBOARD_SECTIONS:
+        for row in response.get(section) or []:
+            kind, name = _metric_name(row["metric"])
+            series.setdefault(name, {})[kind] = row["columns"]
+
+    summaries: dict[str, dict] = {}
+    for i, month in enumerate(months):
+        prev_month = months[i - 1] if i > 0 else None
+        counts, rates = [], []
+        for name, columns in series.items():
+            actual_cols = columns.get("actual")
+            if actual_cols is None:
+                continue
+            actual = actual_cols.get(month)
+            prev = actual_cols.get(prev_month) if prev_month else None
+            mom_delta = (actual - prev) if (actual is not None and prev is not None) else None
+            target = (columns.get("target") or {}).get(month)
+            if "率" in name:
+                rates.append({
+                    "name": name,
+                    "actual": _round(actual, 4),
+                    "benchmark": target,
+                    "vs_benchmark": _round(actual - target, 4)
+                    if (actual is not None and target is not None) else None,
+                    "mom_delta": _round(mom_delta, 4),
+                })
+            else:
+                counts.append({
+                    "name": name,
+                    "actual": actual,
+                    "target": target,
+                    "achievement_rate": _round(actual / target, 3)
+                    if (actual is not None and target) else None,
+                    "mom_delta": mom_delta,
+                })
+        summaries[month] = {
+            "month": month,
+            "prev_month": prev_month,
+            "counts": counts,
+            "rates": rates,
+        }
+    return summaries
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def apply_patch(doc: Any, ops: list[dict]) -> Any:
+    """JSON Patch（/api/dashboard の since= が返す add / remove / replace）を適用した複製を返す."""
+    doc = copy.deepcopy(doc)
+    for op in ops:
+        tokens = [_unescape(token) for token in op["path"].split("/")[1:]]
+        if not tokens:
+            doc = op["value"]
+            continue
+        parent = doc
+        for token in tokens[:-1]:
+            parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+        last = tokens[-1]
+        if isinstance(parent, list):
+            index = int(last)
+            if op["op"] == "add":
+                parent.insert(index, op["value"])
+            elif op["op"] == "remove":
+                del parent[index]
+            else:
+                parent[index] = op["value"]
+        elif op["op"] == "remove":
+            del parent[last]
+        else:
+            parent[last] = op["value"]
+    return doc
+
+
+class DashboardSnapshotCache:
+    """ダッシュボード API のスナップショットと要約を TTL 付きでキャッシュする.
+
+    TTL 切れ後は保持しているバージョンを ?since= で送り、返ってきた差分を
+    保持しているレスポンスに適用する（空の差分なら要約をそのまま使い続ける）。
+    同時に期限切れを検知したタスクの取得は1回にまとめる。
+    """
+
+    def __init__(
+        self,
+        api_url: Optional[str] = None,
+        ttl: float = 60.0,
+        http_client: Optional[httpx.AsyncClient] = None,
+        clock=time.monotonic,
+    ):
+        self.api_url = api_url
+        self.ttl = ttl
+        self._http_client = http_client
+        self._clock = clock
+        self._version: Optional[str] = None
+        self._data: Optional[dict] = None
+        self._available_months: list[str] = []
+        self._summaries: dict[str, dict] = {}
+        self._expires_at = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _endpoint(self) -> str:
+        base = self.api_url or os.environ.get("DASHBOARD_API_URL")
+        if not base:
+            raise ValueError("DASHBOARD_API_URL is not set")
+        return base.rstrip("/") + "/api/dashboard"
+
+    async def _get(self, params: dict) -> dict:
+        if self._http_client is not None:
+            response = await self._http_client.get(self._endpoint(), params=params)
+        else:
+            async with httpx.AsyncClient(timeout=10.0) as client:
+                response = await client.get(self._endpoint(), params=params)
+        response.raise_for_status()
+        return response.json()
+
+    def _refresh_lock(self) -> asyncio.Lock:
+        """取得をまとめるロック（Runner.run_sync のようにループが変わったら作り直す）."""
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    async def refresh(self) -> None:
+        """必要ならスナップショットを取得し直して要約を作り直す."""
+        if self._clock() < self._expires_at:
+            return
+        async with self._refresh_lock():
+            # ロック待ちの間に他のタスクが取得していれば使い回す
+            if self._clock() < self._expires_at:
+                return
+            params = {"fields": ",".join(DASHBOARD_SECTIONS)}
+            if self._data is None:
+                self._update(await self._get(params))
+            else:
+                data = await self._get({**params, "since": self._version})
+                if "patch" not in data:
+                    # 保持しているバージョンが古すぎる（またはサーバーが再起動した）
+                    self._update(data)
+                elif data["patch"]:
+                    self._update(apply_patch(self._data, data["patch"]), data["version"])
+            self._expires_at = self._clock() + self.ttl
+
+    def _update(self, data: dict, version: Optional[str] = None) -> None:
+        self._data = data
+        self._version = version or data.get("version")
+        self._available_months = data["available_months"]
+        self._summaries = summarize_dashboard(data)
+
+    async def summary(self, month: str = "") -> dict:
+        """指定月（省略時は最新月）の要約を返す."""
+        await self.refresh()
+        if not self._available_months:
+            raise ValueError("ダッシュボードにデータがありません")
+        if month and month not in self._summaries:
+            raise ValueError(
+                f"{month} のデータはありません（{self._available_months[0]}〜"
+                f"{self._available_months[-1]}）"
+            )
+        return {
+            **self._summaries[month or self._available_months[-1]],
+            "available_months": self._available_months,
+        }
+
+
+_dashboard_cache = DashboardSnapshotCache()
+
+
+async def get_dashboard_summary_impl(month: str = "", cache=None) -> dict:
+    """Get a compact dashboard summary for a month (implementation).
+
+    Args:
+        month: Target month in YYYY/MM format (defaults to the latest month)
+        cache: Optional snapshot cache (defaults to the shared DashboardSnapshotCache)
+
+    Returns:
+        Summary with counts (actual, target, achievement rate, month-over-month delta)
+        and rates (actual, benchmark, gap to benchmark, month-over-month delta)
+    """
+    if cache is None:
+        cache = _dashboard_cache
+    return await cache.summary(month)
+
+
+@function_tool
+async def get_dashboard_summary(month: str = "") -> dict:
+    """Get inside-sales dashboard numbers for a month.
+
+    Args:
+        month: Target month in YYYY/MM format. Empty for the latest month.
+
+    Returns:
+        Counts (案件化数, アポ獲得数, 通電数, リード数 etc.) with targets, achievement rates and
+        month-over-month deltas, and conversion rates with their benchmarks
+    """
+    return await get_dashboard_summary_impl(month)
+
 """Example function with weather data retrieval."""
 
 
+
 class WeatherClient(Protocol):
     """Weather API client protocol."""
 
@@ -29,48 +268,148 @@ class WeatherClient(Protocol):
 
 
 class OpenMeteoWeatherClient:
-    """Open-Meteo API based weather client."""
+    """Open-Meteo API based weather client.
+
+    - HTTP接続はクライアント内で共有（イベントループごとに1つの httpx.AsyncClient）
+    - 都市名 → 緯度経度 は変わらないため LRU キャッシュ
+    - 現在の天気は短い TTL でキャッシュ（件数の上限付き）
+    - 同じ都市への同時リクエストは1回のAPI呼び出しにまとめる
+    """
 
-    def __init__(self):
+    def __init__(
+        self,
+        http_client: Optional[httpx.AsyncClient] = None,
+        geocode_cache_size: int = 256,
+        weather_ttl: float = 300.0,
+        weather_cache_size: int = 256,
+        clock=time.monotonic,
+    ):
         self.geocoding_url = "https://geocoding-api.open-meteo.com/v1/search"
         self.weather_url = "https://api.open-meteo.com/v1/forecast"
+        self.geocode_cache_size = geocode_cache_size
+        self.weather_ttl = weather_ttl
+        self.weather_cache_size = weather_cache_size
+        self._clock = clock
+        self._http_client = http_client
+        self._owns_http_client = http_client is None
+        self._http_client_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._geocode_cache: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._weather_cache: OrderedDict[tuple[float, float], tuple[float, dict]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    def _client(self) -> httpx.AsyncClient:
+        """共有 httpx.AsyncClient を返す（接続プールを使い回す）。
+
+        AsyncClient はイベントループに紐づくため、Runner.run_sync のように
+        ループが作り直された場合は古いものを手放して新しく作る。
+        """
+        if not self._owns_http_client:
+            return self._http_client
+        loop = asyncio.get_running_loop()
+        stale = self._http_client is None or self._http_client.is_closed
+        if stale or self._http_client_loop is not loop:
+            self._discard_http_client()
+            self._http_client = httpx.AsyncClient(timeout=10.0)
+            self._http_client_loop = loop
+        return self._http_client
+
+    def _discard_http_client(self) -> None:
+        """別のループで作ったクライアントを手放す.
+
+        元のループがまだ動いていればそのループ上で閉じる。終了したループの接続は
+        そのループでしか閉じられないため、参照を外して破棄に任せる。
+        """
+        old, old_loop = self._http_client, self._http_client_loop
+        self._http_client = None
+        self._http_client_loop = None
+        if old is None or old.is_closed or old_loop is None:
+            return
+        if old_loop.is_running() and not old_loop.is_closed():
+            asyncio.run_coroutine_threadsafe(old.aclose(), old_loop)
+
+    async def aclose(self) -> None:
+        """自前で作った HTTP クライアントを閉じる."""
+        if self._owns_http_client and self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
 
     async def get_weather(self, city: str) -> dict:
         """Fetch weather data from Open-Meteo API."""
-        async with httpx.AsyncClient() as client:
-            # 都市名から緯度経度を取得
-            geo_response = await client.get(
-                self.geocoding_url,
-                params={"name": city, "count": 1, "language": "ja"},
-            )
-            geo_response.raise_for_status()
-            geo_data = geo_response.json()
-
-            if not geo_data.get("results"):
-                raise ValueError(f"City not found: {city}")
-
-            location = geo_data["results"][0]
-            latitude = location["latitude"]
-            longitude = location["longitude"]
-
-            # 天気情報を取得
-            weather_response = await client.get(
-                self.weather_url,
-                params={
-                    "latitude": latitude,
-                    "longitude": longitude,
-                    "current_weather": "true",
-                },
-            )
-            weather_response.raise_for_status()
-            weather_data = weather_response.json()
-
-            current = weather_data["current_weather"]
-            return {
-                "city": city,
-                "temperature": current["temperature"],
-                "condition": self._get_weather_description(current["weathercode"]),
-            }
+        # 同じ都市の同時リクエストは進行中のものに相乗りする
+        inflight = self._inflight.get(city)
+        if inflight is not None and inflight.get_loop() is asyncio.get_running_loop():
+            return await asyncio.shield(inflight)
+
+        task = asyncio.ensure_future(self._fetch_weather(city))
+        self._inflight[city] = task
+        task.add_done_callback(
+            lambda t: self._inflight.pop(city) if self._inflight.get(city) is t else None
+        )
+        return await asyncio.shield(task)
+
+    async def _fetch_weather(self, city: str) -> dict:
+        latitude, longitude = await self._geocode(city)
+
+        cached = self._weather_cache.get((latitude, longitude))
+        if cached is not None and cached[0] > self._clock():
+            return {**cached[1], "city": city}
+
+        # 天気情報を取得
+        weather_response = await self._client().get(
+            self.weather_url,
+            params={
+                "latitude": latitude,
+                "longitude": longitude,
+                "current_weather": "true",
+            },
+        )
+        weather_response.raise_for_status()
+        weather_data = weather_response.json()
+
+        current = weather_data["current_weather"]
+        result = {
+            "city": city,
+            "temperature": current["temperature"],
+            "condition": self._get_weather_description(current["weathercode"]),
+        }
+        self._cache_weather((latitude, longitude), result)
+        return result
+
+    def _cache_weather(self, coordinates: tuple[float, float], result: dict) -> None:
+        """天気をキャッシュし、期限切れと上限を超えた分を古いものから捨てる."""
+        now = self._clock()
+        self._weather_cache.pop(coordinates, None)
+        self._weather_cache[coordinates] = (now + self.weather_ttl, result)
+        # TTL は一定なので、先頭（古いもの）ほど先に期限切れになる
+        while self._weather_cache:
+            expires_at, _ = next(iter(self._weather_cache.values()))
+            if expires_at > now and len(self._weather_cache) <= self.weather_cache_size:
+                break
+            self._weather_cache.popitem(last=False)
+
+    async def _geocode(self, city: str) -> tuple[float, float]:
+        """都市名から緯度経度を取得（LRU キャッシュ付き）."""
+        cached = self._geocode_cache.get(city)
+        if cached is not None:
+            self._geocode_cache.move_to_end(city)
+            return cached
+
+        geo_response = await self._client().get(
+            self.geocoding_url,
+            params={"name": city, "count": 1, "language": "ja"},
+        )
+        geo_response.raise_for_status()
+        geo_data = geo_response.json()
+
+        if not geo_data.get("results"):
+            raise ValueError(f"City not found: {city}")
+
+        location = geo_data["results"][0]
+        coordinates = (location["latitude"], location["longitude"])
+        self._geocode_cache[city] = coordinates
+        if len(self._geocode_cache) > self.geocode_cache_size:
+            self._geocode_cache.popitem(last=False)
+        return coordinates
 
     def _get_weather_description(self, code: int) -> str:
         """WMO Weather interpretation codes を日本語に変換."""
@@ -100,18 +439,22 @@ class OpenMeteoWeatherClient:
         return descriptions.get(code, f"不明 (コード: {code})")
 
 
+# ツール呼び出し間でキャッシュと接続プールを共有するデフォルトクライアント
+_default_weather_client = OpenMeteoWeatherClient()
+
+
 async def get_weather_data_impl(city: str, client=None) -> dict:
     """Get weather data for a city (implementation).
 
     Args:
         city: City name
-        client: Optional weather client (defaults to OpenMeteoWeatherClient)
+        client: Optional weather client (defaults to the shared OpenMeteoWeatherClient)
 
     Returns:
         Weather data including temperature and condition
     """
     if client is None:
-        client = OpenMeteoWeatherClient()
+        client = _default_weather_client
     return await client.get_weather(city)
 
 
@@ -127,10 +470,60 @@ async def get_weather_data(city: str) -> dict:
     """
     return await get_weather_data_impl(city)
 
+
+# バッチ取得時の同時リクエスト数の上限
+BATCH_MAX_CONCURRENCY = 8
+
+
+async def get_weather_data_batch_impl(
+    cities: list[str], client=None, max_concurrency: int = BATCH_MAX_CONCURRENCY
+) -> dict:
+    """Get weather data for multiple cities concurrently (implementation).
+
+    Args:
+        cities: City names (duplicates are fetched once)
+        client: Optional weather client (defaults to the shared OpenMeteoWeatherClient)
+        max_concurrency: Maximum number of cities fetched at the same time
+
+    Returns:
+        {"results": [...], "errors": [{"city": ..., "error": ...}]}
+        一部の都市が失敗しても、成功した都市の結果は返す
+    """
+    if client is None:
+        client = _default_weather_client
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def fetch(city: str) -> tuple[str, Optional[dict], Optional[str]]:
+        async with semaphore:
+            try:
+                return city, await client.get_weather(city), None
+            except Exception as e:
+                return city, None, str(e) or type(e).__name__
+
+    outcomes = await asyncio.gather(*(fetch(city) for city in dict.fromkeys(cities)))
+    return {
+        "results": [weather for _, weather, error in outcomes if error is None],
+        "errors": [{"city": city, "error": error} for city, _, error in outcomes if error],
+    }
+
+
+@function_tool
+async def get_weather_data_batch(cities: list[str]) -> dict:
+    """Get weather data for several cities in one call.
+
+    Args:
+        cities: City names
+
+    Returns:
+        Weather data for each city, plus errors for cities that could not be fetched
+    """
+    return await get_weather_data_batch_impl(cities)
+
 # ========== Agent ==========
 """Agent definition."""
 
 
+
 def create_agent() -> Agent:
     """Create OpenAI Agents SDK agent.
 
@@ -144,19 +537,209 @@ def create_agent() -> Agent:
         name="Example Agent",
         instructions=(
             "あなたは親切なアシスタントです。\n"
-            "天気情報が必要な場合は、get_weather_data関数を使用してください。"
+            "天気情報が必要な場合は、get_weather_data関数を使用してください。\n"
+            "複数の都市の天気が必要な場合は、get_weather_data_batch関数で"
+            "全ての都市をまとめて1回で取得してください。\n"
+            "インサイドセールスの実績（案件化数・アポ獲得数・通電率など）や目標達成状況を"
+            "聞かれた場合は、get_dashboard_summary関数を使用してください。"
         ),
-        tools=[get_weather_data],
+        tools=[get_weather_data, get_weather_data_batch, get_dashboard_summary],
     )
 
 # ========== Main ==========
 """Agent entry point."""
 
 
+
+# --serve 時に同時実行するメッセージ数の既定値
+DEFAULT_MAX_CONCURRENCY = int(os.environ.get("AGENT_MAX_CONCURRENCY", "4"))
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    """Parse command line options.
+
+    Args:
+        argv: Command line arguments (without program name)
+
+    Returns:
+        Parsed options
+    """
+    parser = argparse.ArgumentParser(description="OpenAI Agents SDK-based agent")
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="常駐モード: stdin の改行区切り JSON を順に処理し、1行ずつ結果を出力する",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="ストリーミング出力: イベントを改行区切り JSON で逐次出力し、最終行に結果を出力する",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=DEFAULT_MAX_CONCURRENCY,
+        help="常駐モードで同時に処理するメッセージ数",
+    )
+    return parser.parse_args(argv)
+
+
+async def _stdin_lines() -> AsyncIterator[str]:
+    """stdin を1行ずつ非同期に読む."""
+    loop = asyncio.get_running_loop()
+    while True:
+        line = await loop.run_in_executor(None, sys.stdin.readline)
+        if not line:
+            return
+        yield line
+
+
+async def serve_ndjson(
+    lines: AsyncIterator[str],
+    run_message: Callable[[str], Awaitable[str]],
+    write: Callable[[str], None],
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+) -> None:
+    """改行区切り JSON のリクエストを並行に処理し、入力と同じ順序で結果を書き出す.
+
+    各行は input_schema.json に従う {"message": ...}。出力は単発実行と同じ
+    {"result": ...}（失敗時は {"error": ...}）を1行ずつ。
+
+    Args:
+        lines: 入力行
+        run_message: メッセージを受け取り最終出力を返す関数
+        write: 1行分の出力関数
+        max_concurrency: 同時に実行するメッセージ数の上限
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    # 読み込みが処理より先行しすぎないよう、未出力のリクエスト数を制限する
+    pending: asyncio.Queue = asyncio.Queue(maxsize=max_concurrency * 2)
+
+    async def handle(line: str) -> dict:
+        try:
+            input_data = json.loads(line)
+        except json.JSONDecodeError as e:
+            return {"error": f"invalid JSON: {e}"}
+        async with semaphore:
+            try:
+                return {"result": await run_message(input_data.get("message", ""))}
+            except Exception as e:
+                return {"error": str(e) or type(e).__name__}
+
+    async def writer() -> None:
+        while True:
+            task = await pending.get()
+            if task is None:
+                return
+            write(json.dumps(await task, ensure_ascii=False))
+
+    writer_task = asyncio.create_task(writer())
+    async for line in lines:
+        if line.strip():
+            await pending.put(asyncio.create_task(handle(line)))
+    await pending.put(None)
+    await writer_task
+
+
+def _raw_field(raw_item: Any, key: str) -> Any:
+    """raw_item（pydantic モデルまたは dict）からフィールドを取り出す."""
+    if isinstance(raw_item, dict):
+        return raw_item.get(key)
+    return getattr(raw_item, key, None)
+
+
+async def stream_run_events(result, clock=time.perf_counter) -> AsyncIterator[dict]:
+    """Runner.run_streamed の結果を改行区切り JSON 用のイベントに変換する.
+
+    イベント:
+        {"type": "text_delta", "delta": ..., "t_ms": ...}
+        {"type": "tool_call_started", "tool": ..., "call_id": ..., "t_ms": ...}
+        {"type": "tool_call_finished", "tool": ..., "call_id": ..., "duration_ms": ..., "t_ms": ...}
+        {"result": ...}  最終行（単発実行の出力と同じ形）
+
+    Args:
+        result: Runner.run_streamed の戻り値
+        clock: 経過時間の計測に使う時計
+
+    Yields:
+        イベントの dict
+    """
+    started_at = clock()
+    tool_calls: dict[str, tuple[str, float]] = {}  # call_id -> (tool name, 開始時刻)
+
+    def elapsed_ms(since: float) -> float:
+        return round((clock() - since) * 1000, 1)
+
+    async for event in result.stream_events():
+        if event.type == "raw_response_event":
+            if getattr(event.data, "type", None) == "response.output_text.delta":
+                yield {
+                    "type": "text_delta",
+                    "delta": event.data.delta,
+                    "t_ms": elapsed_ms(started_at),
+                }
+        elif event.type == "run_item_stream_event":
+            raw_item = event.item.raw_item
+            call_id = _raw_field(raw_item, "call_id")
+            if event.name == "tool_called":
+                tool = _raw_field(raw_item, "name")
+                tool_calls[call_id] = (tool, clock())
+                yield {
+                    "type": "tool_call_started",
+                    "tool": tool,
+                    "call_id": call_id,
+                    "t_ms": elapsed_ms(started_at),
+                }
+            elif event.name == "tool_output":
+                tool, tool_started_at = tool_calls.pop(call_id, (None, None))
+                yield {
+                    "type": "tool_call_finished",
+                    "tool": tool,
+                    "call_id": call_id,
+                    "duration_ms": elapsed_ms(tool_started_at) if tool_started_at else None,
+                    "t_ms": elapsed_ms(started_at),
+                }
+
+    yield {"result": result.final_output}
+
+
+async def run_streamed(message: str) -> None:
+    """ストリーミングモード: イベントを発生順に stdout へ1行ずつ出力する."""
+    agent = create_agent()
+    result = Runner.run_streamed(agent, message)
+    async for event in stream_run_events(result):
+        _write_line(json.dumps(event, ensure_ascii=False))
+
+
+def _write_line(line: str) -> None:
+    print(line, flush=True)
+
+
+async def serve(max_concurrency: int) -> None:
+    """常駐モード: Agent を一度だけ構築し、stdin のメッセージを処理し続ける."""
+    agent = create_agent()
+
+    async def run_message(message: str) -> str:
+        result = await Runner.run(agent, message)
+        return result.final_output
+
+    await serve_ndjson(_stdin_lines(), run_message, _write_line, max_concurrency)
+
+
 if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+
+    if args.serve:
+        asyncio.run(serve(args.max_concurrency))
+        sys.exit(0)
+
     # stdin読み込み
     input_data = json.loads(sys.stdin.read())
 
+    if args.stream:
+        asyncio.run(run_streamed(input_data.get("message", "")))
+        sys.exit(0)
+
     # Agent実行
     agent = create_agent()
     result = Runner.run_sync(agent, input_data.get("message", ""))
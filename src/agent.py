@@ -1,6 +1,8 @@
 """Agent definition."""
-from agents import Agent, Runner
-from .functions.example import get_weather_data
+from agents import Agent
+
+from .functions.dashboard import get_dashboard_summary
+from .functions.example import get_weather_data, get_weather_data_batch
 
 
 def create_agent() -> Agent:
@@ -16,7 +18,11 @@ def create_agent() -> Agent:
         name="Example Agent",
         instructions=(
             "あなたは親切なアシスタントです。\n"
-            "天気情報が必要な場合は、get_weather_data関数を使用してください。"
+            "天気情報が必要な場合は、get_weather_data関数を使用してください。\n"
+            "複数の都市の天気が必要な場合は、get_weather_data_batch関数で"
+            "全ての都市をまとめて1回で取得してください。\n"
+            "インサイドセールスの実績（案件化数・アポ獲得数・通電率など）や目標達成状況を"
+            "聞かれた場合は、get_dashboard_summary関数を使用してください。"
         ),
-        tools=[get_weather_data],
+        tools=[get_weather_data, get_weather_data_batch, get_dashboard_summary],
     )
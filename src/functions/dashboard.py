@@ -0,0 +1,239 @@
+"""Dashboard query function backed by a cached, pre-summarized snapshot."""
+import asyncio
+import copy
+import os
+import re
+import time
+from typing import Any, Optional
+
+import httpx
+from agents import function_tool
+
+# parse_dashboard の月別明細セクション（全月分の値とベンチマーク行を含む）
+DASHBOARD_SECTIONS = ("section_ankenjika", "section_apo_kakutoku", "section_lead_kakutoku")
+
+# "目標：案件化率（40%）" のようなベンチマーク表記を取り除いて実績行と対応付ける
+_BENCHMARK_SUFFIX = re.compile(r"（\d+(?:\.\d+)?%）$")
+
+
+def _metric_name(label: str) -> tuple[str, str]:
+    """行ラベルを (種別, 指標名) に分解する. 種別は "actual" / "target"."""
+    if label.startswith("目標："):
+        return "target", _BENCHMARK_SUFFIX.sub("", label.removeprefix("目標："))
+    return "actual", label.removeprefix("実績：")
+
+
+def _round(value: Optional[float], digits: int) -> Optional[float]:
+    return None if value is None else round(value, digits)
+
+
+def summarize_dashboard(response: dict) -> dict[str, dict]:
+    """DashboardResponse（JSON）から月ごとのコンパクトな要約を事前計算する.
+
+    Args:
+        response: /api/dashboard のレスポンス（section_* を含む）
+
+    Returns:
+        {YYYY/MM: summary} 。summary は counts（件数: 実績・目標・達成率・前月差）と
+        rates（率: 実績・ベンチマーク・差・前月差）を持つ
+    """
+    months = response["available_months"]
+    series: dict[str, dict[str, dict[str, Optional[float]]]] = {}
+    for section in DASHBOARD_SECTIONS:
+        for row in response.get(section) or []:
+            kind, name = _metric_name(row["metric"])
+            series.setdefault(name, {})[kind] = row["columns"]
+
+    summaries: dict[str, dict] = {}
+    for i, month in enumerate(months):
+        prev_month = months[i - 1] if i > 0 else None
+        counts, rates = [], []
+        for name, columns in series.items():
+            actual_cols = columns.get("actual")
+            if actual_cols is None:
+                continue
+            actual = actual_cols.get(month)
+            prev = actual_cols.get(prev_month) if prev_month else None
+            mom_delta = (actual - prev) if (actual is not None and prev is not None) else None
+            target = (columns.get("target") or {}).get(month)
+            if "率" in name:
+                rates.append({
+                    "name": name,
+                    "actual": _round(actual, 4),
+                    "benchmark": target,
+                    "vs_benchmark": _round(actual - target, 4)
+                    if (actual is not None and target is not None) else None,
+                    "mom_delta": _round(mom_delta, 4),
+                })
+            else:
+                counts.append({
+                    "name": name,
+                    "actual": actual,
+                    "target": target,
+                    "achievement_rate": _round(actual / target, 3)
+                    if (actual is not None and target) else None,
+                    "mom_delta": mom_delta,
+                })
+        summaries[month] = {
+            "month": month,
+            "prev_month": prev_month,
+            "counts": counts,
+            "rates": rates,
+        }
+    return summaries
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def apply_patch(doc: Any, ops: list[dict]) -> Any:
+    """JSON Patch（/api/dashboard の since= が返す add / remove / replace）を適用した複製を返す."""
+    doc = copy.deepcopy(doc)
+    for op in ops:
+        tokens = [_unescape(token) for token in op["path"].split("/")[1:]]
+        if not tokens:
+            doc = op["value"]
+            continue
+        parent = doc
+        for token in tokens[:-1]:
+            parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+        last = tokens[-1]
+        if isinstance(parent, list):
+            index = int(last)
+            if op["op"] == "add":
+                parent.insert(index, op["value"])
+            elif op["op"] == "remove":
+                del parent[index]
+            else:
+                parent[index] = op["value"]
+        elif op["op"] == "remove":
+            del parent[last]
+        else:
+            parent[last] = op["value"]
+    return doc
+
+
+class DashboardSnapshotCache:
+    """ダッシュボード API のスナップショットと要約を TTL 付きでキャッシュする.
+
+    TTL 切れ後は保持しているバージョンを ?since= で送り、返ってきた差分を
+    保持しているレスポンスに適用する（空の差分なら要約をそのまま使い続ける）。
+    同時に期限切れを検知したタスクの取得は1回にまとめる。
+    """
+
+    def __init__(
+        self,
+        api_url: Optional[str] = None,
+        ttl: float = 60.0,
+        http_client: Optional[httpx.AsyncClient] = None,
+        clock=time.monotonic,
+    ):
+        self.api_url = api_url
+        self.ttl = ttl
+        self._http_client = http_client
+        self._clock = clock
+        self._version: Optional[str] = None
+        self._data: Optional[dict] = None
+        self._available_months: list[str] = []
+        self._summaries: dict[str, dict] = {}
+        self._expires_at = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _endpoint(self) -> str:
+        base = self.api_url or os.environ.get("DASHBOARD_API_URL")
+        if not base:
+            raise ValueError("DASHBOARD_API_URL is not set")
+        return base.rstrip("/") + "/api/dashboard"
+
+    async def _get(self, params: dict) -> dict:
+        if self._http_client is not None:
+            response = await self._http_client.get(self._endpoint(), params=params)
+        else:
+            async with httpx.AsyncClient(timeout=10.0) as client:
+                response = await client.get(self._endpoint(), params=params)
+        response.raise_for_status()
+        return response.json()
+
+    def _refresh_lock(self) -> asyncio.Lock:
+        """取得をまとめるロック（Runner.run_sync のようにループが変わったら作り直す）."""
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    async def refresh(self) -> None:
+        """必要ならスナップショットを取得し直して要約を作り直す."""
+        if self._clock() < self._expires_at:
+            return
+        async with self._refresh_lock():
+            # ロック待ちの間に他のタスクが取得していれば使い回す
+            if self._clock() < self._expires_at:
+                return
+            params = {"fields": ",".join(DASHBOARD_SECTIONS)}
+            if self._data is None:
+                self._update(await self._get(params))
+            else:
+                data = await self._get({**params, "since": self._version})
+                if "patch" not in data:
+                    # 保持しているバージョンが古すぎる（またはサーバーが再起動した）
+                    self._update(data)
+                elif data["patch"]:
+                    self._update(apply_patch(self._data, data["patch"]), data["version"])
+            self._expires_at = self._clock() + self.ttl
+
+    def _update(self, data: dict, version: Optional[str] = None) -> None:
+        self._data = data
+        self._version = version or data.get("version")
+        self._available_months = data["available_months"]
+        self._summaries = summarize_dashboard(data)
+
+    async def summary(self, month: str = "") -> dict:
+        """指定月（省略時は最新月）の要約を返す."""
+        await self.refresh()
+        if not self._available_months:
+            raise ValueError("ダッシュボードにデータがありません")
+        if month and month not in self._summaries:
+            raise ValueError(
+                f"{month} のデータはありません（{self._available_months[0]}〜"
+                f"{self._available_months[-1]}）"
+            )
+        return {
+            **self._summaries[month or self._available_months[-1]],
+            "available_months": self._available_months,
+        }
+
+
+_dashboard_cache = DashboardSnapshotCache()
+
+
+async def get_dashboard_summary_impl(month: str = "", cache=None) -> dict:
+    """Get a compact dashboard summary for a month (implementation).
+
+    Args:
+        month: Target month in YYYY/MM format (defaults to the latest month)
+        cache: Optional snapshot cache (defaults to the shared DashboardSnapshotCache)
+
+    Returns:
+        Summary with counts (actual, target, achievement rate, month-over-month delta)
+        and rates (actual, benchmark, gap to benchmark, month-over-month delta)
+    """
+    if cache is None:
+        cache = _dashboard_cache
+    return await cache.summary(month)
+
+
+@function_tool
+async def get_dashboard_summary(month: str = "") -> dict:
+    """Get inside-sales dashboard numbers for a month.
+
+    Args:
+        month: Target month in YYYY/MM format. Empty for the latest month.
+
+    Returns:
+        Counts (案件化数, アポ獲得数, 通電数, リード数 etc.) with targets, achievement rates and
+        month-over-month deltas, and conversion rates with their benchmarks
+    """
+    return await get_dashboard_summary_impl(month)
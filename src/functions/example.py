@@ -1,5 +1,9 @@
 """Example function with weather data retrieval."""
-from typing import Protocol
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Optional, Protocol
+
 import httpx
 from agents import function_tool
 
@@ -13,48 +17,148 @@ class WeatherClient(Protocol):
 
 
 class OpenMeteoWeatherClient:
-    """Open-Meteo API based weather client."""
+    """Open-Meteo API based weather client.
+
+    - HTTP接続はクライアント内で共有（イベントループごとに1つの httpx.AsyncClient）
+    - 都市名 → 緯度経度 は変わらないため LRU キャッシュ
+    - 現在の天気は短い TTL でキャッシュ（件数の上限付き）
+    - 同じ都市への同時リクエストは1回のAPI呼び出しにまとめる
+    """
 
-    def __init__(self):
+    def __init__(
+        self,
+        http_client: Optional[httpx.AsyncClient] = None,
+        geocode_cache_size: int = 256,
+        weather_ttl: float = 300.0,
+        weather_cache_size: int = 256,
+        clock=time.monotonic,
+    ):
         self.geocoding_url = "https://geocoding-api.open-meteo.com/v1/search"
         self.weather_url = "https://api.open-meteo.com/v1/forecast"
+        self.geocode_cache_size = geocode_cache_size
+        self.weather_ttl = weather_ttl
+        self.weather_cache_size = weather_cache_size
+        self._clock = clock
+        self._http_client = http_client
+        self._owns_http_client = http_client is None
+        self._http_client_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._geocode_cache: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._weather_cache: OrderedDict[tuple[float, float], tuple[float, dict]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    def _client(self) -> httpx.AsyncClient:
+        """共有 httpx.AsyncClient を返す（接続プールを使い回す）。
+
+        AsyncClient はイベントループに紐づくため、Runner.run_sync のように
+        ループが作り直された場合は古いものを手放して新しく作る。
+        """
+        if not self._owns_http_client:
+            return self._http_client
+        loop = asyncio.get_running_loop()
+        stale = self._http_client is None or self._http_client.is_closed
+        if stale or self._http_client_loop is not loop:
+            self._discard_http_client()
+            self._http_client = httpx.AsyncClient(timeout=10.0)
+            self._http_client_loop = loop
+        return self._http_client
+
+    def _discard_http_client(self) -> None:
+        """別のループで作ったクライアントを手放す.
+
+        元のループがまだ動いていればそのループ上で閉じる。終了したループの接続は
+        そのループでしか閉じられないため、参照を外して破棄に任せる。
+        """
+        old, old_loop = self._http_client, self._http_client_loop
+        self._http_client = None
+        self._http_client_loop = None
+        if old is None or old.is_closed or old_loop is None:
+            return
+        if old_loop.is_running() and not old_loop.is_closed():
+            asyncio.run_coroutine_threadsafe(old.aclose(), old_loop)
+
+    async def aclose(self) -> None:
+        """自前で作った HTTP クライアントを閉じる."""
+        if self._owns_http_client and self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
 
     async def get_weather(self, city: str) -> dict:
         """Fetch weather data from Open-Meteo API."""
-        async with httpx.AsyncClient() as client:
-            # 都市名から緯度経度を取得
-            geo_response = await client.get(
-                self.geocoding_url,
-                params={"name": city, "count": 1, "language": "ja"},
-            )
-            geo_response.raise_for_status()
-            geo_data = geo_response.json()
-
-            if not geo_data.get("results"):
-                raise ValueError(f"City not found: {city}")
-
-            location = geo_data["results"][0]
-            latitude = location["latitude"]
-            longitude = location["longitude"]
-
-            # 天気情報を取得
-            weather_response = await client.get(
-                self.weather_url,
-                params={
-                    "latitude": latitude,
-                    "longitude": longitude,
-                    "current_weather": "true",
-                },
-            )
-            weather_response.raise_for_status()
-            weather_data = weather_response.json()
-
-            current = weather_data["current_weather"]
-            return {
-                "city": city,
-                "temperature": current["temperature"],
-                "condition": self._get_weather_description(current["weathercode"]),
-            }
+        # 同じ都市の同時リクエストは進行中のものに相乗りする
+        inflight = self._inflight.get(city)
+        if inflight is not None and inflight.get_loop() is asyncio.get_running_loop():
+            return await asyncio.shield(inflight)
+
+        task = asyncio.ensure_future(self._fetch_weather(city))
+        self._inflight[city] = task
+        task.add_done_callback(
+            lambda t: self._inflight.pop(city) if self._inflight.get(city) is t else None
+        )
+        return await asyncio.shield(task)
+
+    async def _fetch_weather(self, city: str) -> dict:
+        latitude, longitude = await self._geocode(city)
+
+        cached = self._weather_cache.get((latitude, longitude))
+        if cached is not None and cached[0] > self._clock():
+            return {**cached[1], "city": city}
+
+        # 天気情報を取得
+        weather_response = await self._client().get(
+            self.weather_url,
+            params={
+                "latitude": latitude,
+                "longitude": longitude,
+                "current_weather": "true",
+            },
+        )
+        weather_response.raise_for_status()
+        weather_data = weather_response.json()
+
+        current = weather_data["current_weather"]
+        result = {
+            "city": city,
+            "temperature": current["temperature"],
+            "condition": self._get_weather_description(current["weathercode"]),
+        }
+        self._cache_weather((latitude, longitude), result)
+        return result
+
+    def _cache_weather(self, coordinates: tuple[float, float], result: dict) -> None:
+        """天気をキャッシュし、期限切れと上限を超えた分を古いものから捨てる."""
+        now = self._clock()
+        self._weather_cache.pop(coordinates, None)
+        self._weather_cache[coordinates] = (now + self.weather_ttl, result)
+        # TTL は一定なので、先頭（古いもの）ほど先に期限切れになる
+        while self._weather_cache:
+            expires_at, _ = next(iter(self._weather_cache.values()))
+            if expires_at > now and len(self._weather_cache) <= self.weather_cache_size:
+                break
+            self._weather_cache.popitem(last=False)
+
+    async def _geocode(self, city: str) -> tuple[float, float]:
+        """都市名から緯度経度を取得（LRU キャッシュ付き）."""
+        cached = self._geocode_cache.get(city)
+        if cached is not None:
+            self._geocode_cache.move_to_end(city)
+            return cached
+
+        geo_response = await self._client().get(
+            self.geocoding_url,
+            params={"name": city, "count": 1, "language": "ja"},
+        )
+        geo_response.raise_for_status()
+        geo_data = geo_response.json()
+
+        if not geo_data.get("results"):
+            raise ValueError(f"City not found: {city}")
+
+        location = geo_data["results"][0]
+        coordinates = (location["latitude"], location["longitude"])
+        self._geocode_cache[city] = coordinates
+        if len(self._geocode_cache) > self.geocode_cache_size:
+            self._geocode_cache.popitem(last=False)
+        return coordinates
 
     def _get_weather_description(self, code: int) -> str:
         """WMO Weather interpretation codes を日本語に変換."""
@@ -84,18 +188,22 @@ class OpenMeteoWeatherClient:
         return descriptions.get(code, f"不明 (コード: {code})")
 
 
+# ツール呼び出し間でキャッシュと接続プールを共有するデフォルトクライアント
+_default_weather_client = OpenMeteoWeatherClient()
+
+
 async def get_weather_data_impl(city: str, client=None) -> dict:
     """Get weather data for a city (implementation).
 
     Args:
         city: City name
-        client: Optional weather client (defaults to OpenMeteoWeatherClient)
+        client: Optional weather client (defaults to the shared OpenMeteoWeatherClient)
 
     Returns:
         Weather data including temperature and condition
     """
     if client is None:
-        client = OpenMeteoWeatherClient()
+        client = _default_weather_client
     return await client.get_weather(city)
 
 
@@ -110,3 +218,52 @@ async def get_weather_data(city: str) -> dict:
         Weather data including temperature and condition
     """
     return await get_weather_data_impl(city)
+
+
+# バッチ取得時の同時リクエスト数の上限
+BATCH_MAX_CONCURRENCY = 8
+
+
+async def get_weather_data_batch_impl(
+    cities: list[str], client=None, max_concurrency: int = BATCH_MAX_CONCURRENCY
+) -> dict:
+    """Get weather data for multiple cities concurrently (implementation).
+
+    Args:
+        cities: City names (duplicates are fetched once)
+        client: Optional weather client (defaults to the shared OpenMeteoWeatherClient)
+        max_concurrency: Maximum number of cities fetched at the same time
+
+    Returns:
+        {"results": [...], "errors": [{"city": ..., "error": ...}]}
+        一部の都市が失敗しても、成功した都市の結果は返す
+    """
+    if client is None:
+        client = _default_weather_client
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def fetch(city: str) -> tuple[str, Optional[dict], Optional[str]]:
+        async with semaphore:
+            try:
+                return city, await client.get_weather(city), None
+            except Exception as e:
+                return city, None, str(e) or type(e).__name__
+
+    outcomes = await asyncio.gather(*(fetch(city) for city in dict.fromkeys(cities)))
+    return {
+        "results": [weather for _, weather, error in outcomes if error is None],
+        "errors": [{"city": city, "error": error} for city, _, error in outcomes if error],
+    }
+
+
+@function_tool
+async def get_weather_data_batch(cities: list[str]) -> dict:
+    """Get weather data for several cities in one call.
+
+    Args:
+        cities: City names
+
+    Returns:
+        Weather data for each city, plus errors for cities that could not be fetched
+    """
+    return await get_weather_data_batch_impl(cities)
@@ -1,13 +1,205 @@
 """Agent entry point."""
+import argparse
+import asyncio
 import json
+import os
 import sys
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable
+
+from agents import Runner
+
 from .agent import create_agent
 
+# --serve 時に同時実行するメッセージ数の既定値
+DEFAULT_MAX_CONCURRENCY = int(os.environ.get("AGENT_MAX_CONCURRENCY", "4"))
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    """Parse command line options.
+
+    Args:
+        argv: Command line arguments (without program name)
+
+    Returns:
+        Parsed options
+    """
+    parser = argparse.ArgumentParser(description="OpenAI Agents SDK-based agent")
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="常駐モード: stdin の改行区切り JSON を順に処理し、1行ずつ結果を出力する",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="ストリーミング出力: イベントを改行区切り JSON で逐次出力し、最終行に結果を出力する",
+    )
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=DEFAULT_MAX_CONCURRENCY,
+        help="常駐モードで同時に処理するメッセージ数",
+    )
+    return parser.parse_args(argv)
+
+
+async def _stdin_lines() -> AsyncIterator[str]:
+    """stdin を1行ずつ非同期に読む."""
+    loop = asyncio.get_running_loop()
+    while True:
+        line = await loop.run_in_executor(None, sys.stdin.readline)
+        if not line:
+            return
+        yield line
+
+
+async def serve_ndjson(
+    lines: AsyncIterator[str],
+    run_message: Callable[[str], Awaitable[str]],
+    write: Callable[[str], None],
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+) -> None:
+    """改行区切り JSON のリクエストを並行に処理し、入力と同じ順序で結果を書き出す.
+
+    各行は input_schema.json に従う {"message": ...}。出力は単発実行と同じ
+    {"result": ...}（失敗時は {"error": ...}）を1行ずつ。
+
+    Args:
+        lines: 入力行
+        run_message: メッセージを受け取り最終出力を返す関数
+        write: 1行分の出力関数
+        max_concurrency: 同時に実行するメッセージ数の上限
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    # 読み込みが処理より先行しすぎないよう、未出力のリクエスト数を制限する
+    pending: asyncio.Queue = asyncio.Queue(maxsize=max_concurrency * 2)
+
+    async def handle(line: str) -> dict:
+        try:
+            input_data = json.loads(line)
+        except json.JSONDecodeError as e:
+            return {"error": f"invalid JSON: {e}"}
+        async with semaphore:
+            try:
+                return {"result": await run_message(input_data.get("message", ""))}
+            except Exception as e:
+                return {"error": str(e) or type(e).__name__}
+
+    async def writer() -> None:
+        while True:
+            task = await pending.get()
+            if task is None:
+                return
+            write(json.dumps(await task, ensure_ascii=False))
+
+    writer_task = asyncio.create_task(writer())
+    async for line in lines:
+        if line.strip():
+            await pending.put(asyncio.create_task(handle(line)))
+    await pending.put(None)
+    await writer_task
+
+
+def _raw_field(raw_item: Any, key: str) -> Any:
+    """raw_item（pydantic モデルまたは dict）からフィールドを取り出す."""
+    if isinstance(raw_item, dict):
+        return raw_item.get(key)
+    return getattr(raw_item, key, None)
+
+
+async def stream_run_events(result, clock=time.perf_counter) -> AsyncIterator[dict]:
+    """Runner.run_streamed の結果を改行区切り JSON 用のイベントに変換する.
+
+    イベント:
+        {"type": "text_delta", "delta": ..., "t_ms": ...}
+        {"type": "tool_call_started", "tool": ..., "call_id": ..., "t_ms": ...}
+        {"type": "tool_call_finished", "tool": ..., "call_id": ..., "duration_ms": ..., "t_ms": ...}
+        {"result": ...}  最終行（単発実行の出力と同じ形）
+
+    Args:
+        result: Runner.run_streamed の戻り値
+        clock: 経過時間の計測に使う時計
+
+    Yields:
+        イベントの dict
+    """
+    started_at = clock()
+    tool_calls: dict[str, tuple[str, float]] = {}  # call_id -> (tool name, 開始時刻)
+
+    def elapsed_ms(since: float) -> float:
+        return round((clock() - since) * 1000, 1)
+
+    async for event in result.stream_events():
+        if event.type == "raw_response_event":
+            if getattr(event.data, "type", None) == "response.output_text.delta":
+                yield {
+                    "type": "text_delta",
+                    "delta": event.data.delta,
+                    "t_ms": elapsed_ms(started_at),
+                }
+        elif event.type == "run_item_stream_event":
+            raw_item = event.item.raw_item
+            call_id = _raw_field(raw_item, "call_id")
+            if event.name == "tool_called":
+                tool = _raw_field(raw_item, "name")
+                tool_calls[call_id] = (tool, clock())
+                yield {
+                    "type": "tool_call_started",
+                    "tool": tool,
+                    "call_id": call_id,
+                    "t_ms": elapsed_ms(started_at),
+                }
+            elif event.name == "tool_output":
+                tool, tool_started_at = tool_calls.pop(call_id, (None, None))
+                yield {
+                    "type": "tool_call_finished",
+                    "tool": tool,
+                    "call_id": call_id,
+                    "duration_ms": elapsed_ms(tool_started_at) if tool_started_at else None,
+                    "t_ms": elapsed_ms(started_at),
+                }
+
+    yield {"result": result.final_output}
+
+
+async def run_streamed(message: str) -> None:
+    """ストリーミングモード: イベントを発生順に stdout へ1行ずつ出力する."""
+    agent = create_agent()
+    result = Runner.run_streamed(agent, message)
+    async for event in stream_run_events(result):
+        _write_line(json.dumps(event, ensure_ascii=False))
+
+
+def _write_line(line: str) -> None:
+    print(line, flush=True)
+
+
+async def serve(max_concurrency: int) -> None:
+    """常駐モード: Agent を一度だけ構築し、stdin のメッセージを処理し続ける."""
+    agent = create_agent()
+
+    async def run_message(message: str) -> str:
+        result = await Runner.run(agent, message)
+        return result.final_output
+
+    await serve_ndjson(_stdin_lines(), run_message, _write_line, max_concurrency)
+
 
 if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+
+    if args.serve:
+        asyncio.run(serve(args.max_concurrency))
+        sys.exit(0)
+
     # stdin読み込み
     input_data = json.loads(sys.stdin.read())
 
+    if args.stream:
+        asyncio.run(run_streamed(input_data.get("message", "")))
+        sys.exit(0)
+
     # Agent実行
     agent = create_agent()
     result = Runner.run_sync(agent, input_data.get("message", ""))
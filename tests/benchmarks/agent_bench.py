@@ -0,0 +1,289 @@
+"""エージェントのオフラインベンチマーク。
+
+tests/fixtures/agent_conversations.json に記録したモデル応答とツールの HTTP 応答を
+respx で再生し、OpenAI API や外部 API に接続せずに多数の会話をプロセス内で並行実行する。
+会話ごとに次のフェーズの所要時間を計測し、パーセンタイルとスループットを表示する。
+
+- construct: create_agent() によるエージェント構築
+- model:     モデル呼び出し（on_llm_start〜on_llm_end。再生モックと --model-latency-ms を含む）
+- tool:      ツール実行（on_tool_start〜on_tool_end。並列呼び出しは重なりを除いた区間長）
+- sdk:       Runner.run の所要時間から model と tool を除いた SDK 自体のオーバーヘッド
+
+再生内容は決定的で、最終出力とツール呼び出しの列が記録と一致しない会話は
+mismatches として数え、終了コード 1 を返す。SDK 更新時の回帰確認に使う。
+
+使い方（リポジトリルートで実行）:
+    uv run python -m tests.benchmarks.agent_bench [--conversations 500] [--concurrency 50]
+        [--model-latency-ms 0] [--json]
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Optional
+
+import httpx
+import respx
+from agents import RunConfig, RunHooks, Runner
+from agents.models.openai_provider import OpenAIProvider
+
+from src.agent import create_agent
+from src.functions import dashboard, example
+from tests.mocks.openai_mock import mock_openai_responses
+
+FIXTURES_DIR = Path(__file__).resolve().parent.parent / "fixtures"
+CONVERSATIONS_PATH = FIXTURES_DIR / "agent_conversations.json"
+DASHBOARD_RESPONSE_PATH = FIXTURES_DIR / "dashboard_response.json"
+DASHBOARD_API_URL = "http://dashboard.bench"
+PHASES = ("construct", "model", "tool", "sdk", "total")
+
+
+def _covered(intervals: list[tuple[float, float]]) -> float:
+    """区間の和集合の長さ（並列に走ったツールを二重に数えない）."""
+    covered = 0.0
+    end = float("-inf")
+    for start, stop in sorted(intervals):
+        if stop <= end:
+            continue
+        covered += stop - max(start, end)
+        end = stop
+    return covered
+
+
+class PhaseHooks(RunHooks):
+    """1会話分のモデル呼び出しとツール実行の区間を記録する."""
+
+    def __init__(self):
+        self.model_intervals: list[tuple[float, float]] = []
+        self.tool_intervals: list[tuple[float, float]] = []
+        self._llm_started = 0.0
+        self._tool_started: dict[str, float] = {}
+
+    async def on_llm_start(self, context, agent, system_prompt, input_items) -> None:
+        self._llm_started = time.perf_counter()
+
+    async def on_llm_end(self, context, agent, response) -> None:
+        self.model_intervals.append((self._llm_started, time.perf_counter()))
+
+    async def on_tool_start(self, context, agent, tool) -> None:
+        call_id = getattr(context, "tool_call_id", tool.name)
+        self._tool_started[call_id] = time.perf_counter()
+
+    async def on_tool_end(self, context, agent, tool, result) -> None:
+        call_id = getattr(context, "tool_call_id", tool.name)
+        self.tool_intervals.append((self._tool_started.pop(call_id), time.perf_counter()))
+
+
+@dataclass
+class ConversationResult:
+    """1会話分の計測結果（秒）."""
+
+    name: str
+    construct: float
+    model: float
+    tool: float
+    sdk: float
+    total: float
+    matched: bool
+
+
+@dataclass
+class BenchmarkReport:
+    """ベンチマーク全体の集計結果."""
+
+    conversations: int
+    concurrency: int
+    model_latency_ms: float
+    wall_seconds: float
+    throughput: float
+    mismatches: int
+    # フェーズ名 -> {"mean", "p50", "p95", "p99"}（ミリ秒）
+    phases: dict[str, dict[str, float]] = field(default_factory=dict)
+    # 記録された会話名 -> 実行回数
+    by_conversation: dict[str, int] = field(default_factory=dict)
+
+
+def load_recordings(path: Path = CONVERSATIONS_PATH) -> dict:
+    """記録済みの会話とツール応答を読み込む."""
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def _expected_tool_calls(conversation: dict) -> list[str]:
+    return [call["name"] for turn in conversation["turns"] for call in turn.get("tool_calls", ())]
+
+
+def _mock_tool_apis(router: respx.Router, recordings: dict) -> None:
+    """Open-Meteo とダッシュボード API の応答を記録から返す."""
+    geocoding = recordings["geocoding"]
+    forecast = recordings["forecast"]
+    dashboard_response = json.loads(DASHBOARD_RESPONSE_PATH.read_text(encoding="utf-8"))
+
+    def geocode(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=geocoding.get(request.url.params["name"], {}))
+
+    def weather(request: httpx.Request) -> httpx.Response:
+        params = request.url.params
+        return httpx.Response(200, json=forecast[f"{params['latitude']},{params['longitude']}"])
+
+    router.get("https://geocoding-api.open-meteo.com/v1/search").mock(side_effect=geocode)
+    router.get("https://api.open-meteo.com/v1/forecast").mock(side_effect=weather)
+    router.get(f"{DASHBOARD_API_URL}/api/dashboard").mock(
+        return_value=httpx.Response(200, json=dashboard_response)
+    )
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _summarize(values: list[float]) -> dict[str, float]:
+    ordered = sorted(values)
+    return {
+        "mean": statistics.fmean(ordered) * 1000,
+        "p50": _percentile(ordered, 0.50) * 1000,
+        "p95": _percentile(ordered, 0.95) * 1000,
+        "p99": _percentile(ordered, 0.99) * 1000,
+    }
+
+
+async def _run_conversation(conversation: dict, run_config: RunConfig) -> ConversationResult:
+    started = time.perf_counter()
+    agent = create_agent()
+    constructed = time.perf_counter()
+
+    hooks = PhaseHooks()
+    result = await Runner.run(
+        agent, conversation["message"], hooks=hooks, run_config=run_config
+    )
+    finished = time.perf_counter()
+
+    model = _covered(hooks.model_intervals)
+    tool = _covered(hooks.tool_intervals)
+    run = finished - constructed
+    tool_calls = [
+        item.raw_item.name for item in result.new_items if item.type == "tool_call_item"
+    ]
+    matched = (
+        result.final_output == conversation["turns"][-1]["text"]
+        and tool_calls == _expected_tool_calls(conversation)
+    )
+    return ConversationResult(
+        name=conversation["name"],
+        construct=constructed - started,
+        model=model,
+        tool=tool,
+        sdk=max(0.0, run - model - tool),
+        total=finished - started,
+        matched=matched,
+    )
+
+
+async def run_benchmark(
+    conversations: int = 500,
+    concurrency: int = 50,
+    model_latency_ms: float = 0.0,
+    recordings: Optional[dict] = None,
+) -> tuple[BenchmarkReport, list[ConversationResult]]:
+    """記録済み会話を繰り返し並行実行して計測する.
+
+    Args:
+        conversations: Number of conversations to run (recordings are used round-robin)
+        concurrency: Maximum number of conversations in flight
+        model_latency_ms: Simulated model latency per call in milliseconds
+        recordings: Recorded conversations and tool responses (defaults to the fixture)
+
+    Returns:
+        Aggregated report and the per-conversation results in submission order
+    """
+    if recordings is None:
+        recordings = load_recordings()
+    scripts = recordings["conversations"]
+
+    # 実行ごとに同じ状態から始めるため、ツールの共有キャッシュを作り直す（終了後に戻す）
+    saved = (example._default_weather_client, dashboard._dashboard_cache)
+    example._default_weather_client = example.OpenMeteoWeatherClient()
+    dashboard._dashboard_cache = dashboard.DashboardSnapshotCache(api_url=DASHBOARD_API_URL)
+
+    run_config = RunConfig(
+        model_provider=OpenAIProvider(api_key="bench-key", use_responses=True),
+        tracing_disabled=True,
+    )
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(conversation: dict) -> ConversationResult:
+        async with semaphore:
+            return await _run_conversation(conversation, run_config)
+
+    router = respx.mock(assert_all_called=False)
+    try:
+        with router:
+            mock_openai_responses(scripts, latency=model_latency_ms / 1000, router=router)
+            _mock_tool_apis(router, recordings)
+            started = time.perf_counter()
+            results = await asyncio.gather(
+                *(bounded(scripts[i % len(scripts)]) for i in range(conversations))
+            )
+            wall = time.perf_counter() - started
+    finally:
+        await example._default_weather_client.aclose()
+        example._default_weather_client, dashboard._dashboard_cache = saved
+
+    by_conversation: dict[str, int] = {}
+    for r in results:
+        by_conversation[r.name] = by_conversation.get(r.name, 0) + 1
+    report = BenchmarkReport(
+        conversations=conversations,
+        concurrency=concurrency,
+        model_latency_ms=model_latency_ms,
+        wall_seconds=wall,
+        throughput=conversations / wall if wall else 0.0,
+        mismatches=sum(1 for r in results if not r.matched),
+        phases={phase: _summarize([getattr(r, phase) for r in results]) for phase in PHASES},
+        by_conversation=by_conversation,
+    )
+    return report, results
+
+
+def format_report(report: BenchmarkReport) -> str:
+    """表形式のテキストに整形する."""
+    lines = [
+        f"conversations: {report.conversations}  concurrency: {report.concurrency}  "
+        f"model latency: {report.model_latency_ms:g}ms",
+        f"wall: {report.wall_seconds:.3f}s  throughput: {report.throughput:.1f} conv/s  "
+        f"mismatches: {report.mismatches}",
+        "",
+        f"{'phase':<10}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}  (ms)",
+    ]
+    for phase, stats in report.phases.items():
+        values = "".join(f"{stats[key]:>10.2f}" for key in ("mean", "p50", "p95", "p99"))
+        lines.append(f"{phase:<10}{values}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--conversations", type=int, default=500, help="実行する会話数")
+    parser.add_argument("--concurrency", type=int, default=50, help="同時に実行する会話数")
+    parser.add_argument(
+        "--model-latency-ms", type=float, default=0.0, help="モデル呼び出し1回あたりの疑似遅延"
+    )
+    parser.add_argument("--json", action="store_true", help="結果を JSON で出力する")
+    args = parser.parse_args(argv)
+
+    report, _ = asyncio.run(
+        run_benchmark(args.conversations, args.concurrency, args.model_latency_ms)
+    )
+    if args.json:
+        print(json.dumps(asdict(report), ensure_ascii=False, indent=2))
+    else:
+        print(format_report(report))
+    return 1 if report.mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+"""build.py のベンチマーク。
+
+一時ディレクトリに数百個のツールモジュールを持つ src/functions/ を生成し、次を計測する。
+
+- cold:      キャッシュなしのフルビルド（全ファイルを解析）
+- no-op:     ディスク上のキャッシュのみで再ビルド（解析も main.py の書き込みもしない）
+- touch:     1ファイルの mtime だけ更新（ハッシュ一致で解析を省く）
+- edit:      1ファイルを書き換えて再ビルド（そのファイルだけ解析し直す）
+
+生成するモジュールには未使用の import も含め、統合・削除後に残る import 文の数も表示する。
+
+使い方（リポジトリルートで実行）:
+    uv run python -m tests.benchmarks.build_bench [--modules 300] [--runs 5]
+"""
+import argparse
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from build import CACHE_FILENAME, Bundler, merge_imports
+
+ROOT = Path(__file__).resolve().parent.parent.parent
+
+TOOL_MODULE = '''"""Generated tool {index}."""
+from typing import Any, Optional
+from dataclasses import dataclass
+import re
+import asyncio
+import json
+import httpx
+from agents import function_tool
+
+
+async def tool_{index}_impl(query: str, client: Optional[httpx.AsyncClient] = None) -> dict:
+    """Look up {index}.
+
+    Args:
+        query: Query string
+        client: Optional HTTP client
+
+    Returns:
+        Result payload
+    """
+    await asyncio.sleep(0)
+    return {{"tool": {index}, "query": query}}
+
+
+@function_tool
+async def tool_{index}(query: str) -> dict:
+    """Generated tool {index}.
+
+    Args:
+        query: Query string
+
+    Returns:
+        Result payload
+    """
+    return await tool_{index}_impl(query)
+'''
+
+
+def generate_project(root: Path, modules: int) -> None:
+    """root に src/（functions/tool_XXX.py × modules, agent.py, main_template.py）を作る."""
+    functions = root / "src" / "functions"
+    functions.mkdir(parents=True)
+    (root / "src" / "__init__.py").write_text("", encoding="utf-8")
+    (functions / "__init__.py").write_text("", encoding="utf-8")
+    for i in range(modules):
+        (functions / f"tool_{i:04d}.py").write_text(TOOL_MODULE.format(index=i), encoding="utf-8")
+
+    imports = "\n".join(
+        f"from .functions.tool_{i:04d} import tool_{i}" for i in range(modules)
+    )
+    tools = ", ".join(f"tool_{i}" for i in range(modules))
+    (root / "src" / "agent.py").write_text(
+        '"""Agent definition."""\n'
+        "from agents import Agent, Runner\n"
+        f"{imports}\n\n\n"
+        "def create_agent() -> Agent:\n"
+        f'    return Agent(name="Bench Agent", instructions="bench", tools=[{tools}])\n',
+        encoding="utf-8",
+    )
+    shutil.copy(ROOT / "src" / "main_template.py", root / "src" / "main_template.py")
+    shutil.copy(ROOT / "pyproject.toml", root / "pyproject.toml")
+
+
+def _timed(fn) -> float:
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def run(modules: int, runs: int) -> dict[str, list[float]]:
+    """各シナリオの所要時間（秒）を runs 回ずつ計測する."""
+    timings: dict[str, list[float]] = {"cold": [], "no-op": [], "touch": [], "edit": []}
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        generate_project(root, modules)
+        src_dir, output, cache = root / "src", root / "main.py", root / CACHE_FILENAME
+        target = src_dir / "functions" / "tool_0000.py"
+
+        for i in range(runs):
+            cache.unlink(missing_ok=True)
+            output.unlink(missing_ok=True)
+            timings["cold"].append(_timed(lambda: Bundler(src_dir, output, cache).build()))
+            timings["no-op"].append(_timed(lambda: Bundler(src_dir, output, cache).build()))
+
+            st = target.stat()
+            os.utime(target, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+            timings["touch"].append(_timed(lambda: Bundler(src_dir, output, cache).build()))
+
+            target.write_text(
+                target.read_text(encoding="utf-8") + f"\n# edit {i}\n", encoding="utf-8"
+            )
+            timings["edit"].append(_timed(lambda: Bundler(src_dir, output, cache).build()))
+
+        bundler = Bundler(src_dir, output, cache)
+        function_files, agent_file, main_template = bundler.source_files()
+        parsed = [bundler.module(p) for p in (*function_files, agent_file, main_template)]
+        for prune in (False, True):
+            standard, from_lines = merge_imports(parsed, prune_unused=prune)
+            key = "pruned" if prune else "merged"
+            print(f"imports ({key}): {len(standard)} import + {len(from_lines)} from")
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="build.py benchmark")
+    parser.add_argument("--modules", type=int, default=300, help="生成するツールモジュール数")
+    parser.add_argument("--runs", type=int, default=5, help="各シナリオの計測回数")
+    args = parser.parse_args()
+
+    timings = run(args.modules, args.runs)
+    print(f"\n{args.modules} modules, median of {args.runs} runs")
+    for scenario, values in timings.items():
+        print(f"  {scenario:<6} {statistics.median(values) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""エージェントのコールドスタートベンチマーク。
+
+bundled main.py と `python build.py --zipapp` の dist/agent.pyz を、それぞれ新しいプロセスで
+起動して stdin に1件のメッセージを渡し、stdout に結果が出て終了するまでの時間を比べる。
+モデルはローカルの Responses API スタブ（tests/fixtures/agent_conversations.json の
+ツールを呼ばない会話を再生）に向けるため、OpenAI API キーやネットワークは不要。
+
+使い方（リポジトリルートで実行。先に build.py と build.py --zipapp を実行しておく）:
+    uv run python -m tests.benchmarks.startup_bench [--runs 10] [--uv]
+
+--uv を付けると `uv run main.py`（PEP 723 の依存解決を含む）も計測する。
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from tests.benchmarks.agent_bench import load_recordings
+from tests.mocks.openai_mock import _response_body, _turn_output
+
+ROOT = Path(__file__).resolve().parent.parent.parent
+
+
+def _start_stub(conversation: dict) -> ThreadingHTTPServer:
+    """POST /v1/responses に記録済みの最終応答を返すスタブサーバーを起動する."""
+    body = json.dumps(
+        _response_body(f"resp_{conversation['name']}", _turn_output(conversation, 0))
+    ).encode("utf-8")
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def measure(command: list[str], message: str, env: dict[str, str]) -> tuple[float, str]:
+    """プロセス起動から終了までの秒数と stdout を返す."""
+    payload = json.dumps({"message": message}, ensure_ascii=False)
+    started = time.perf_counter()
+    proc = subprocess.run(
+        command, input=payload, capture_output=True, text=True, env=env, cwd=ROOT, timeout=120
+    )
+    elapsed = time.perf_counter() - started
+    if proc.returncode != 0:
+        raise RuntimeError(f"{' '.join(command)} failed:\n{proc.stderr}")
+    return elapsed, proc.stdout.strip()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Agent cold-start benchmark")
+    parser.add_argument("--runs", type=int, default=10, help="各対象の起動回数")
+    parser.add_argument("--uv", action="store_true", help="uv run main.py も計測する")
+    args = parser.parse_args()
+
+    targets = {
+        "main.py": [sys.executable, str(ROOT / "main.py")],
+        "agent.pyz": [sys.executable, str(ROOT / "dist" / "agent.pyz")],
+    }
+    if args.uv and shutil.which("uv"):
+        targets["uv run main.py"] = ["uv", "run", "--quiet", str(ROOT / "main.py")]
+    for name, command in targets.items():
+        if not Path(command[-1]).exists():
+            print(f"✗ {command[-1]} not found (run build.py / build.py --zipapp first)")
+            return 1
+
+    conversation = next(
+        c for c in load_recordings()["conversations"] if "text" in c["turns"][0]
+    )
+    expected = json.dumps({"result": conversation["turns"][0]["text"]}, ensure_ascii=False)
+    server = _start_stub(conversation)
+    env = {
+        **os.environ,
+        "OPENAI_API_KEY": "bench-key",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{server.server_port}/v1",
+        "OPENAI_AGENTS_DISABLE_TRACING": "1",
+    }
+
+    results: dict[str, list[float]] = {name: [] for name in targets}
+    try:
+        # 1回目はディスクキャッシュを温めるため捨てる
+        for name, command in targets.items():
+            measure(command, conversation["message"], env)
+        for _ in range(args.runs):
+            for name, command in targets.items():
+                elapsed, stdout = measure(command, conversation["message"], env)
+                if stdout != expected:
+                    print(f"✗ {name}: unexpected output {stdout!r}")
+                    return 1
+                results[name].append(elapsed)
+    finally:
+        server.shutdown()
+
+    baseline = statistics.median(results["main.py"])
+    print(f"cold start, median of {args.runs} runs (stdout verified)")
+    for name, values in results.items():
+        median = statistics.median(values)
+        print(f"  {name:<16} {median * 1000:8.1f} ms  (min {min(values) * 1000:.1f} ms, "
+              f"{median / baseline:.2f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,32 @@
+"""Smoke tests for the offline agent benchmark harness."""
+from src.functions import dashboard, example
+from tests.benchmarks.agent_bench import PHASES, format_report, load_recordings, run_benchmark
+
+
+async def test_run_benchmark_replays_every_conversation():
+    """全ての記録済み会話が記録どおりに再生され、各フェーズが集計される."""
+    recordings = load_recordings()
+    n = len(recordings["conversations"]) * 4
+
+    report, results = await run_benchmark(conversations=n, concurrency=8, recordings=recordings)
+
+    assert report.mismatches == 0
+    assert len(results) == n
+    assert report.by_conversation == {c["name"]: 4 for c in recordings["conversations"]}
+    assert set(report.phases) == set(PHASES)
+    assert report.throughput > 0
+    # ツールを呼ばない会話はツール時間が 0
+    assert all(r.tool == 0 for r in results if r.name == "chitchat")
+    assert "mismatches: 0" in format_report(report)
+
+
+async def test_run_benchmark_restores_shared_tool_clients():
+    """ベンチマーク後はツールの共有クライアントが元に戻る."""
+    weather_client = example._default_weather_client
+    dashboard_cache = dashboard._dashboard_cache
+
+    await run_benchmark(conversations=5, concurrency=5)
+
+    assert example._default_weather_client is weather_client
+    assert dashboard._dashboard_cache is dashboard_cache
+
@@ -1,6 +1,11 @@
 """OpenAI API mocks using respx."""
+import asyncio
+import json
+
 import respx
-from httpx import Response
+from httpx import Request, Response
+
+RESPONSES_URL = "https://api.openai.com/v1/responses"
 
 
 def mock_openai_chat_completion(content: str = "Mocked response"):
@@ -34,3 +39,95 @@ def mock_openai_chat_completion(content: str = "Mocked response"):
             }
         )
     )
+
+
+def _response_body(response_id: str, output: list) -> dict:
+    return {
+        "id": response_id,
+        "object": "response",
+        "created_at": 0,
+        "model": "gpt-replay",
+        "output": output,
+        "status": "completed",
+        "parallel_tool_calls": True,
+        "tool_choice": "auto",
+        "tools": [],
+        "usage": {
+            "input_tokens": 10,
+            "output_tokens": 5,
+            "total_tokens": 15,
+            "input_tokens_details": {"cached_tokens": 0},
+            "output_tokens_details": {"reasoning_tokens": 0},
+        },
+    }
+
+
+def _turn_output(conversation: dict, turn_index: int) -> list:
+    turn = conversation["turns"][turn_index]
+    prefix = f"{conversation['name']}_{turn_index}"
+    if "text" in turn:
+        return [{
+            "type": "message",
+            "id": f"msg_{prefix}",
+            "role": "assistant",
+            "status": "completed",
+            "content": [{"type": "output_text", "text": turn["text"], "annotations": []}],
+        }]
+    return [
+        {
+            "type": "function_call",
+            "id": f"fc_{prefix}_{i}",
+            "call_id": f"call_{prefix}_{i}",
+            "name": call["name"],
+            "arguments": json.dumps(call["arguments"], ensure_ascii=False),
+            "status": "completed",
+        }
+        for i, call in enumerate(turn["tool_calls"])
+    ]
+
+
+def mock_openai_responses(conversations: list[dict], latency: float = 0.0, router=respx):
+    """Mock the Responses API by replaying recorded conversations.
+
+    会話は最初のユーザーメッセージで特定し、入力に含まれる function_call の数から
+    何ターン目かを求める。状態を持たないため、同じ会話を何本並行に流しても
+    毎回同じ応答が返る。
+
+    Args:
+        conversations: Recorded conversations. Each has "name", "message" and "turns";
+            a turn is either {"tool_calls": [{"name", "arguments"}, ...]} or {"text": ...}
+        latency: Simulated model latency per call in seconds
+        router: respx router to register the route on (defaults to the global one)
+
+    Returns:
+        respx route
+    """
+    by_message = {conversation["message"]: conversation for conversation in conversations}
+
+    async def replay(request: Request) -> Response:
+        items = json.loads(request.content)["input"]
+        message = next(
+            item["content"] for item in items
+            if isinstance(item, dict) and item.get("role") == "user"
+        )
+        conversation = by_message.get(message)
+        if conversation is None:
+            return Response(400, json={"error": {"message": f"No recording for: {message}"}})
+
+        # 既に返した function_call の数から次のターンを決める
+        calls_seen = sum(1 for item in items if item.get("type") == "function_call")
+        turn_index = 0
+        for turn in conversation["turns"]:
+            if calls_seen <= 0:
+                break
+            calls_seen -= len(turn.get("tool_calls", ()))
+            turn_index += 1
+
+        if latency:
+            await asyncio.sleep(latency)
+        response_id = f"resp_{conversation['name']}_{turn_index}"
+        return Response(
+            200, json=_response_body(response_id, _turn_output(conversation, turn_index))
+        )
+
+    return router.post(RESPONSES_URL).mock(side_effect=replay)
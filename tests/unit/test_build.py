@@ -0,0 +1,200 @@
+"""Unit tests for the incremental bundler."""
+import json
+import os
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+from build import Bundler, analyze_source, build_zipapp, locked_requirements, merge_imports
+
+TEMPLATE = '''\
+"""Agent entry point."""
+import asyncio
+import json
+from agents import Runner
+from .agent import create_agent
+
+
+async def main():
+    return json.dumps(await Runner.run(create_agent(), "hi"))
+'''
+
+
+def _write(path: Path, content: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(textwrap.dedent(content), encoding="utf-8")
+
+
+@pytest.fixture
+def project(tmp_path):
+    """functions 2つ + agent + main_template の最小構成."""
+    src = tmp_path / "src"
+    _write(src / "functions" / "__init__.py", "")
+    for name in ("alpha", "beta"):
+        _write(src / "functions" / f"{name}.py", f'''\
+            """{name} tool."""
+            from typing import Optional
+            from agents import function_tool
+
+
+            @function_tool
+            async def {name}(x: Optional[str] = None) -> str:
+                return "{name}"
+        ''')
+    _write(src / "agent.py", '''\
+        """Agent definition."""
+        from agents import Agent, Runner
+        from .functions.alpha import alpha
+        from .functions.beta import beta
+
+
+        def create_agent() -> Agent:
+            return Agent(name="a", tools=[alpha, beta])
+    ''')
+    (src / "main_template.py").write_text(TEMPLATE, encoding="utf-8")
+    return tmp_path
+
+
+def test_analyze_source_strips_multiline_imports():
+    """複数行の import は丸ごと除き、内部モジュールからの import は集めない."""
+    info = analyze_source(textwrap.dedent('''\
+        from typing import (
+            Any,
+            Optional,
+        )
+        from .agent import create_agent
+        import os.path as osp
+
+        VALUE: "Optional[int]" = None
+    '''))
+
+    assert info.code == 'VALUE: "Optional[int]" = None'
+    assert info.from_imports == [("typing", "Any", None), ("typing", "Optional", None)]
+    assert info.imports == [("os.path", "osp")]
+    assert "Optional" in info.used_names
+
+
+def test_merge_imports_groups_and_prunes_unused():
+    """同じモジュールの from import は1行にまとめ、未使用の名前は落とす."""
+    modules = [
+        analyze_source("from agents import Agent, Runner\nAgent\n"),
+        analyze_source("from __future__ import annotations\nimport asyncio\nimport os\n"
+                       "from agents import Runner, function_tool\nRunner, function_tool, os\n"),
+    ]
+
+    standard, from_lines = merge_imports(modules)
+
+    assert standard == ["import os"]
+    assert from_lines == [
+        "from __future__ import annotations",
+        "from agents import Agent, Runner, function_tool",
+    ]
+
+
+def test_bundler_rebuilds_only_changed_modules(project):
+    """2回目以降は変更されたファイルだけ解析し、出力が同じなら書き込まない."""
+    output = project / "main.py"
+    cache = project / ".build_cache.json"
+
+    assert Bundler(project / "src", output, cache).build() is True
+    bundle = output.read_text(encoding="utf-8")
+    assert bundle.count("from agents import") == 1
+    assert "from agents import function_tool, Agent, Runner" in bundle
+    assert "import asyncio" not in bundle
+    compile(bundle, str(output), "exec")
+
+    # 新しいプロセス相当: ディスク上のキャッシュだけで何も解析しない
+    bundler = Bundler(project / "src", output, cache)
+    mtime = output.stat().st_mtime_ns
+    assert bundler.build() is False
+    assert bundler.analyzed == []
+    assert output.stat().st_mtime_ns == mtime
+
+    beta = project / "src" / "functions" / "beta.py"
+    beta.write_text(beta.read_text(encoding="utf-8").replace('"beta"', '"BETA"'), "utf-8")
+    os.utime(beta, ns=(mtime + 10**9, mtime + 10**9))
+    assert bundler.build() is True
+    assert bundler.analyzed == ["functions/beta.py"]
+    assert 'return "BETA"' in output.read_text(encoding="utf-8")
+
+
+def test_build_zipapp_keeps_stdin_stdout_contract_with_lazy_tools(project):
+    """zipapp は stdin の JSON を読んで stdout に結果を返し、ツール実装は呼ばれるまで読まない."""
+    _write(project / "pyproject.toml", """\
+        [project]
+        name = "zipapp-test"
+        version = "0.1.0"
+    """)
+    _write(project / "src" / "main_template.py", '''\
+        """Agent entry point."""
+        import json
+        import sys
+        from .agent import create_agent
+
+        if __name__ == "__main__":
+            message = json.loads(sys.stdin.read())["message"]
+            agent = create_agent()
+            loaded = sorted(m for m in sys.modules if m.startswith("app._tools."))
+            print(json.dumps({"result": message, "tools": [t.name for t in agent.tools],
+                              "loaded": loaded, "schema": agent.tools[0].params_json_schema}))
+    ''')
+
+    target = build_zipapp(project / "src", project / "dist")
+
+    proc = subprocess.run(
+        [sys.executable, str(target)], input=json.dumps({"message": "hi"}),
+        capture_output=True, text=True, check=True,
+    )
+    output = json.loads(proc.stdout)
+    assert output["result"] == "hi"
+    assert output["tools"] == ["alpha", "beta"]
+    assert output["loaded"] == []
+    assert output["schema"]["properties"]["x"]["anyOf"][0] == {"type": "string"}
+
+
+def test_locked_requirements_follows_runtime_dependencies(tmp_path):
+    """dev extras を除いた実行時依存だけを、経路上のマーカーとハッシュ付きで固定する."""
+    lock = tmp_path / "uv.lock"
+    lock.write_text(textwrap.dedent("""\
+        version = 1
+
+        [[package]]
+        name = "my-agent"
+        version = "0.1.0"
+        source = { virtual = "." }
+        dependencies = [
+            { name = "httpx" },
+            { name = "colorama", marker = "sys_platform == 'win32'" },
+        ]
+
+        [package.optional-dependencies]
+        dev = [{ name = "pytest" }]
+
+        [[package]]
+        name = "httpx"
+        version = "0.28.1"
+        dependencies = [{ name = "anyio", marker = "python_version < '3.13'" }]
+        wheels = [{ url = "https://example.test/httpx.whl", hash = "sha256:aaa" }]
+
+        [[package]]
+        name = "anyio"
+        version = "4.12.1"
+
+        [[package]]
+        name = "colorama"
+        version = "0.4.6"
+
+        [[package]]
+        name = "pytest"
+        version = "8.0.0"
+    """), encoding="utf-8")
+
+    assert locked_requirements(lock, "My_Agent") == [
+        "anyio==4.12.1 ; (python_version < '3.13')",
+        "colorama==0.4.6 ; (sys_platform == 'win32')",
+        "httpx==0.28.1 \\",
+        "    --hash=sha256:aaa",
+    ]
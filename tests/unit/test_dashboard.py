@@ -0,0 +1,180 @@
+"""Unit tests for dashboard summary function."""
+import asyncio
+import json
+from pathlib import Path
+
+import httpx
+import pytest
+
+from src.functions.dashboard import (
+    DashboardSnapshotCache,
+    apply_patch,
+    get_dashboard_summary_impl,
+    summarize_dashboard,
+)
+
+API_URL = "http://dashboard.test"
+FIXTURE = Path(__file__).parent.parent / "fixtures" / "dashboard_response.json"
+
+
+@pytest.fixture
+def dashboard_response():
+    """parse_dashboard がフィクスチャシートから生成したレスポンス."""
+    return json.loads(FIXTURE.read_text(encoding="utf-8"))
+
+
+def _by_name(items):
+    return {item["name"]: item for item in items}
+
+
+def test_summarize_dashboard_counts_and_rates(dashboard_response):
+    """件数は目標達成率と前月差、率はベンチマークとの差を計算する."""
+    summary = summarize_dashboard(dashboard_response)["2025/06"]
+
+    assert summary["prev_month"] == "2025/05"
+    counts = _by_name(summary["counts"])
+    assert counts["案件化数"] == {
+        "name": "案件化数", "actual": 10.0, "target": 25.0,
+        "achievement_rate": 0.4, "mom_delta": -12.0,
+    }
+    assert counts["通電数"]["target"] is None
+    rates = _by_name(summary["rates"])
+    assert rates["案件化率"]["benchmark"] == 0.4
+    assert rates["案件化率"]["vs_benchmark"] == -0.15
+    assert rates["通電率"]["mom_delta"] == -0.03
+
+
+def test_summarize_dashboard_first_month_has_no_delta(dashboard_response):
+    """最初の月は前月差なし."""
+    summary = summarize_dashboard(dashboard_response)["2025/04"]
+    assert summary["prev_month"] is None
+    assert all(c["mom_delta"] is None for c in summary["counts"])
+
+
+@pytest.mark.asyncio
+async def test_snapshot_cache_reuses_summary_within_ttl(respx_mock, dashboard_response):
+    """TTL内はAPIを呼ばず、TTL後は since= で差分が無ければ要約を使い続ける."""
+    route = respx_mock.get(f"{API_URL}/api/dashboard").mock(
+        side_effect=[
+            httpx.Response(200, json=dashboard_response),
+            httpx.Response(
+                200, json={"version": "3f9a2c1e-7", "base_version": "3f9a2c1e-7", "patch": []}
+            ),
+        ]
+    )
+    now = [0.0]
+    cache = DashboardSnapshotCache(api_url=API_URL, ttl=60, clock=lambda: now[0])
+
+    latest = await get_dashboard_summary_impl(cache=cache)
+    may = await get_dashboard_summary_impl("2025/05", cache=cache)
+    assert route.call_count == 1
+
+    now[0] = 61.0
+    again = await get_dashboard_summary_impl(cache=cache)
+
+    assert latest["month"] == "2025/06"
+    assert may["month"] == "2025/05"
+    assert again == latest
+    assert route.call_count == 2
+    assert route.calls[1].request.url.params["since"] == "3f9a2c1e-7"
+
+
+@pytest.mark.asyncio
+async def test_snapshot_cache_unknown_month(respx_mock, dashboard_response):
+    """存在しない月は ValueError."""
+    respx_mock.get(f"{API_URL}/api/dashboard").mock(
+        return_value=httpx.Response(200, json=dashboard_response)
+    )
+    cache = DashboardSnapshotCache(api_url=API_URL)
+
+    with pytest.raises(ValueError, match="2024/01"):
+        await get_dashboard_summary_impl("2024/01", cache=cache)
+
+
+@pytest.mark.asyncio
+async def test_snapshot_cache_applies_patch(respx_mock, dashboard_response):
+    """差分が返れば保持しているレスポンスに適用し、全体を取り直さない."""
+    patch = [
+        {"op": "replace", "path": "/section_ankenjika/1/columns/2025~106", "value": 20.0},
+        {"op": "replace", "path": "/version", "value": "3f9a2c1e-8"},
+    ]
+    route = respx_mock.get(f"{API_URL}/api/dashboard").mock(
+        side_effect=[
+            httpx.Response(200, json=dashboard_response),
+            httpx.Response(
+                200, json={"version": "3f9a2c1e-8", "base_version": "3f9a2c1e-7", "patch": patch}
+            ),
+            httpx.Response(
+                200, json={"version": "3f9a2c1e-8", "base_version": "3f9a2c1e-8", "patch": []}
+            ),
+        ]
+    )
+    now = [0.0]
+    cache = DashboardSnapshotCache(api_url=API_URL, ttl=60, clock=lambda: now[0])
+    await get_dashboard_summary_impl(cache=cache)
+
+    now[0] = 61.0
+    june = await get_dashboard_summary_impl(cache=cache)
+    now[0] = 122.0
+    await get_dashboard_summary_impl(cache=cache)
+
+    counts = _by_name(june["counts"])
+    assert counts["案件化数"]["actual"] == 20.0
+    assert counts["案件化数"]["mom_delta"] == -2.0
+    assert route.call_count == 3
+    assert route.calls[2].request.url.params["since"] == "3f9a2c1e-8"
+    assert dashboard_response["section_ankenjika"][1]["columns"]["2025/06"] == 10.0
+
+
+@pytest.mark.asyncio
+async def test_snapshot_cache_replaces_data_for_unknown_version(respx_mock, dashboard_response):
+    """保持しているバージョンをサーバーが知らなければ、返った全体をそのまま使う."""
+    updated = {**dashboard_response, "version": "9b1d0e44-1", "available_months": ["2025/04"]}
+    route = respx_mock.get(f"{API_URL}/api/dashboard").mock(
+        side_effect=[
+            httpx.Response(200, json=dashboard_response),
+            httpx.Response(200, json=updated),
+        ]
+    )
+    now = [0.0]
+    cache = DashboardSnapshotCache(api_url=API_URL, ttl=60, clock=lambda: now[0])
+    await get_dashboard_summary_impl(cache=cache)
+
+    now[0] = 61.0
+    summary = await get_dashboard_summary_impl(cache=cache)
+
+    assert summary["month"] == "2025/04"
+    assert route.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_snapshot_cache_coalesces_concurrent_refreshes(respx_mock, dashboard_response):
+    """同時に期限切れを検知しても取得は1回."""
+    async def respond(request):
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json=dashboard_response)
+
+    route = respx_mock.get(f"{API_URL}/api/dashboard").mock(side_effect=respond)
+    cache = DashboardSnapshotCache(api_url=API_URL)
+
+    results = await asyncio.gather(*(get_dashboard_summary_impl(cache=cache) for _ in range(5)))
+
+    assert all(result["month"] == "2025/06" for result in results)
+    assert route.call_count == 1
+
+
+@pytest.mark.parametrize(
+    "doc, ops, expected",
+    [
+        ({"a": {"2025/06": 1}}, [{"op": "replace", "path": "/a/2025~106", "value": 2}],
+         {"a": {"2025/06": 2}}),
+        ({"a~b": 1}, [{"op": "remove", "path": "/a~0b"}], {}),
+        ({"m": [1, 2, 3]}, [{"op": "remove", "path": "/m/2"}, {"op": "remove", "path": "/m/1"}],
+         {"m": [1]}),
+        ({"m": [1]}, [{"op": "add", "path": "/m/1", "value": 2}], {"m": [1, 2]}),
+        ({"m": [1]}, [{"op": "replace", "path": "", "value": {"x": 1}}], {"x": 1}),
+    ],
+)
+def test_apply_patch(doc, ops, expected):
+    """'/' と '~' のエスケープ、list の伸縮、ルートの置換."""
+    assert apply_patch(doc, ops) == expected
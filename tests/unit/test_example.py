@@ -1,7 +1,17 @@
 """Unit tests for example function."""
-import pytest
+import asyncio
+import threading
+import time
 from unittest.mock import AsyncMock
-from src.functions.example import get_weather_data_impl
+
+import httpx
+import pytest
+
+from src.functions.example import (
+    OpenMeteoWeatherClient,
+    get_weather_data_batch_impl,
+    get_weather_data_impl,
+)
 
 
 @pytest.mark.asyncio
@@ -44,3 +54,181 @@ async def test_get_weather_different_city():
 
     assert result["city"] == "Osaka"
     assert result["temperature"] == 20
+
+
+GEOCODING_URL = "https://geocoding-api.open-meteo.com/v1/search"
+WEATHER_URL = "https://api.open-meteo.com/v1/forecast"
+
+
+def _mock_open_meteo(respx_mock, temperature=25.0):
+    """Open-Meteo の geocoding / forecast エンドポイントをモック."""
+    geo_route = respx_mock.get(GEOCODING_URL).mock(
+        return_value=httpx.Response(
+            200, json={"results": [{"latitude": 35.68, "longitude": 139.69}]}
+        )
+    )
+    weather_route = respx_mock.get(WEATHER_URL).mock(
+        return_value=httpx.Response(
+            200, json={"current_weather": {"temperature": temperature, "weathercode": 0}}
+        )
+    )
+    return geo_route, weather_route
+
+
+@pytest.mark.asyncio
+async def test_open_meteo_client_caches_geocoding_and_weather(respx_mock):
+    """同じ都市の2回目の呼び出しはAPIを呼ばない."""
+    geo_route, weather_route = _mock_open_meteo(respx_mock)
+    client = OpenMeteoWeatherClient()
+
+    first = await client.get_weather("Tokyo")
+    second = await client.get_weather("Tokyo")
+
+    assert first == second == {"city": "Tokyo", "temperature": 25.0, "condition": "快晴"}
+    assert geo_route.call_count == 1
+    assert weather_route.call_count == 1
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_open_meteo_client_weather_ttl_expires(respx_mock):
+    """天気キャッシュはTTL経過後に再取得し、geocodingはキャッシュを使い続ける."""
+    geo_route, weather_route = _mock_open_meteo(respx_mock)
+    now = [0.0]
+    client = OpenMeteoWeatherClient(weather_ttl=60, clock=lambda: now[0])
+
+    await client.get_weather("Tokyo")
+    now[0] = 61.0
+    await client.get_weather("Tokyo")
+
+    assert geo_route.call_count == 1
+    assert weather_route.call_count == 2
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_open_meteo_client_coalesces_concurrent_requests(respx_mock):
+    """同じ都市への同時リクエストは1回のAPI呼び出しにまとめる."""
+    geo_route, weather_route = _mock_open_meteo(respx_mock)
+    client = OpenMeteoWeatherClient()
+
+    results = await asyncio.gather(*(client.get_weather("Tokyo") for _ in range(5)))
+
+    assert all(r["temperature"] == 25.0 for r in results)
+    assert geo_route.call_count == 1
+    assert weather_route.call_count == 1
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_open_meteo_client_city_not_found(respx_mock):
+    """geocoding結果が空の場合は ValueError."""
+    respx_mock.get(GEOCODING_URL).mock(return_value=httpx.Response(200, json={}))
+    client = OpenMeteoWeatherClient()
+
+    with pytest.raises(ValueError, match="City not found"):
+        await client.get_weather("Nowhere")
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_open_meteo_client_bounds_weather_cache(respx_mock):
+    """天気キャッシュは件数上限を超えた分と期限切れを古いものから捨てる."""
+    coordinates = {"Tokyo": (35.68, 139.69), "Osaka": (34.69, 135.5), "Sapporo": (43.06, 141.35)}
+
+    def geocode(request):
+        latitude, longitude = coordinates[request.url.params["name"]]
+        location = {"latitude": latitude, "longitude": longitude}
+        return httpx.Response(200, json={"results": [location]})
+
+    respx_mock.get(GEOCODING_URL).mock(side_effect=geocode)
+    weather_route = respx_mock.get(WEATHER_URL).mock(
+        return_value=httpx.Response(
+            200, json={"current_weather": {"temperature": 20.0, "weathercode": 0}}
+        )
+    )
+    now = [0.0]
+    client = OpenMeteoWeatherClient(weather_ttl=60, weather_cache_size=2, clock=lambda: now[0])
+
+    for city in coordinates:
+        await client.get_weather(city)
+    assert list(client._weather_cache) == [coordinates["Osaka"], coordinates["Sapporo"]]
+
+    now[0] = 61.0
+    await client.get_weather("Tokyo")
+    assert list(client._weather_cache) == [coordinates["Tokyo"]]
+    assert weather_route.call_count == 4
+    await client.aclose()
+
+
+def test_open_meteo_client_replaces_http_client_per_loop(respx_mock):
+    """ループが変わると古い HTTP クライアントを手放し、動いているループのものは閉じる."""
+    _mock_open_meteo(respx_mock)
+    client = OpenMeteoWeatherClient(weather_ttl=0)
+    background = asyncio.new_event_loop()
+    thread = threading.Thread(target=background.run_forever, daemon=True)
+    thread.start()
+    try:
+        asyncio.run_coroutine_threadsafe(client.get_weather("Tokyo"), background).result(5)
+        first = client._http_client
+
+        asyncio.run(client.get_weather("Tokyo"))
+        second = client._http_client
+        assert second is not first
+        deadline = time.monotonic() + 5
+        while not first.is_closed and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert first.is_closed
+
+        # 終了したループのクライアントは参照を外して作り直す
+        asyncio.run(client.get_weather("Tokyo"))
+        assert client._http_client is not second
+    finally:
+        background.call_soon_threadsafe(background.stop)
+        thread.join()
+        background.close()
+
+
+@pytest.mark.asyncio
+async def test_get_weather_batch_returns_partial_errors():
+    """一部の都市が失敗しても他の都市の結果を返す."""
+    async def get_weather(city):
+        if city == "Atlantis":
+            raise ValueError(f"City not found: {city}")
+        return {"city": city, "temperature": 20, "condition": "晴れ"}
+
+    mock_client = AsyncMock()
+    mock_client.get_weather.side_effect = get_weather
+
+    result = await get_weather_data_batch_impl(
+        ["Tokyo", "Atlantis", "Osaka", "Tokyo"], client=mock_client
+    )
+
+    assert [r["city"] for r in result["results"]] == ["Tokyo", "Osaka"]
+    assert result["errors"] == [{"city": "Atlantis", "error": "City not found: Atlantis"}]
+    assert mock_client.get_weather.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_get_weather_batch_bounds_concurrency():
+    """同時実行数が max_concurrency を超えない."""
+    in_flight = 0
+    peak = 0
+
+    async def get_weather(city):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return {"city": city, "temperature": 20, "condition": "晴れ"}
+
+    mock_client = AsyncMock()
+    mock_client.get_weather.side_effect = get_weather
+
+    result = await get_weather_data_batch_impl(
+        [f"city{i}" for i in range(10)], client=mock_client, max_concurrency=3
+    )
+
+    assert len(result["results"]) == 10
+    assert peak == 3
@@ -0,0 +1,144 @@
+"""Unit tests for the agent entry point."""
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from src.main_template import parse_args, serve_ndjson, stream_run_events
+
+
+async def _lines(items):
+    for item in items:
+        yield item
+
+
+@pytest.mark.asyncio
+async def test_serve_ndjson_preserves_input_order():
+    """並行に処理しても出力は入力と同じ順序になる."""
+    async def run_message(message):
+        # 後の行ほど早く終わるようにする
+        await asyncio.sleep(0.05 / (1 + int(message)))
+        return f"echo {message}"
+
+    output = []
+    lines = [json.dumps({"message": str(i)}) + "\n" for i in range(5)]
+
+    await serve_ndjson(_lines(lines), run_message, output.append, max_concurrency=5)
+
+    assert [json.loads(line) for line in output] == [
+        {"result": f"echo {i}"} for i in range(5)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_serve_ndjson_bounds_concurrency():
+    """同時実行数が max_concurrency を超えない."""
+    in_flight = 0
+    peak = 0
+
+    async def run_message(message):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return message
+
+    output = []
+    lines = [json.dumps({"message": f"m{i}"}) for i in range(10)]
+
+    await serve_ndjson(_lines(lines), run_message, output.append, max_concurrency=2)
+
+    assert len(output) == 10
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_serve_ndjson_reports_errors_per_line():
+    """不正な行や失敗したメッセージはその行だけエラーになる."""
+    async def run_message(message):
+        if message == "boom":
+            raise RuntimeError("model failure")
+        return "ok"
+
+    output = []
+    lines = ["not json\n", "\n", json.dumps({"message": "boom"}), json.dumps({"message": "hi"})]
+
+    await serve_ndjson(_lines(lines), run_message, output.append)
+
+    results = [json.loads(line) for line in output]
+    assert "invalid JSON" in results[0]["error"]
+    assert results[1] == {"error": "model failure"}
+    assert results[2] == {"result": "ok"}
+
+
+def test_parse_args_defaults_to_single_shot():
+    """引数なしの場合は従来の単発実行."""
+    args = parse_args([])
+    assert args.serve is False
+
+
+class _FakeStreamedResult:
+    """Runner.run_streamed の戻り値の代わり."""
+
+    def __init__(self, events, final_output):
+        self._events = events
+        self.final_output = final_output
+
+    async def stream_events(self):
+        for event in self._events:
+            yield event
+
+
+@pytest.mark.asyncio
+async def test_stream_run_events_emits_deltas_tools_and_result():
+    """テキスト差分・ツール呼び出し開始/終了・最終結果の順に出力する."""
+    events = [
+        SimpleNamespace(
+            type="run_item_stream_event",
+            name="tool_called",
+            item=SimpleNamespace(raw_item=SimpleNamespace(name="get_weather_data", call_id="c1")),
+        ),
+        SimpleNamespace(
+            type="run_item_stream_event",
+            name="tool_output",
+            item=SimpleNamespace(raw_item={"call_id": "c1", "output": "{}"}),
+        ),
+        SimpleNamespace(
+            type="raw_response_event",
+            data=SimpleNamespace(type="response.output_text.delta", delta="晴れ"),
+        ),
+        SimpleNamespace(
+            type="raw_response_event",
+            data=SimpleNamespace(type="response.completed"),
+        ),
+        SimpleNamespace(type="agent_updated_stream_event", new_agent=None),
+    ]
+    ticks = iter([0.0, 0.1, 0.1, 0.4, 0.4, 0.5])
+
+    output = [
+        event
+        async for event in stream_run_events(
+            _FakeStreamedResult(events, "東京は晴れです"), clock=lambda: next(ticks)
+        )
+    ]
+
+    assert [e.get("type") for e in output] == [
+        "tool_call_started", "tool_call_finished", "text_delta", None
+    ]
+    assert output[0]["tool"] == "get_weather_data"
+    assert output[1] == {
+        "type": "tool_call_finished",
+        "tool": "get_weather_data",
+        "call_id": "c1",
+        "duration_ms": 300.0,
+        "t_ms": 400.0,
+    }
+    assert output[2]["delta"] == "晴れ"
+    assert output[-1] == {"result": "東京は晴れです"}
+
+
+def test_parse_args_stream_flag():
+    """--stream でストリーミング出力."""
+    assert parse_args(["--stream"]).stream is True